@@ -35,6 +35,10 @@ Shortcuts are provided to the following classes defined in submodules:
    :noindex:
 .. class:: ModelMT
    :noindex:
+.. class:: ModelArray
+   :noindex:
+.. class:: ModelCollection
+   :noindex:
 .. class:: Controller
    :noindex:
 .. class:: View
@@ -49,7 +53,7 @@ identifiers with the module name:
 """
 
 __all__ = ["Model", "TreeStoreModel", "ListStoreModel", "TextBufferModel",
-           "ModelMT",
+           "ModelMT", "ModelArray", "ModelCollection",
            "Controller", "View", "Observer",
            "Observable",
            "observable", "observer", "adapters", # packages
@@ -60,6 +64,8 @@ __version = (1,0,0)
 # visible classes
 from gtkmvc3.model import Model, TreeStoreModel, ListStoreModel, TextBufferModel
 from gtkmvc3.model_mt import ModelMT
+from gtkmvc3.model_array import ModelArray
+from gtkmvc3.model_collection import ModelCollection
 from gtkmvc3.controller import Controller
 from gtkmvc3.view import View
 from gtkmvc3.observer import Observer
@@ -27,6 +27,7 @@ import types
 import time
 
 from gtkmvc3.support.utils import cast_value
+from gtkmvc3.support import hooks
 from gtkmvc3.adapters.default import *
 from gtkmvc3.observer import Observer
 from gtkmvc3 import Model
@@ -340,6 +341,10 @@ class Adapter (Observer):
                 val = self._prop_write(val)
 
             self._itsme = True
+            if hooks.enabled:
+                hooks.emit("adapter_sync", adapter=self,
+                           prop_name=self._prop_name, direction="model",
+                           value=val)
             self._set_property(val, *args)
 
         except ValueError:
@@ -374,6 +379,10 @@ class Adapter (Observer):
             setter = self._wid_info[self._wid][1]
             wtype = self._wid_info[self._wid][2]
             if setter:
+                if hooks.enabled:
+                    hooks.emit("adapter_sync", adapter=self,
+                               prop_name=self._prop_name,
+                               direction="widget", value=val)
                 if wtype is not None:
                     setter(self._wid, self._cast_value(val, wtype))
                 else:
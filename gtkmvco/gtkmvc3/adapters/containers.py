@@ -282,3 +282,52 @@ class watch_items_in_tree(Observer):
         else:
             item.unregister_observer(self)
             del self.rows[item]
+
+class watch_live_list(Observer):
+    def __init__(self, live, store, column=0):
+        """
+        Keep the rows of a list store equal to the items of a live list,
+        applying its deltas instead of filling the store again.
+
+        *live* is a :class:`gtkmvc3.live_list.LiveList` instance.
+
+        *store* is a :class:`Gtk.ListStore` instance, which is filled
+        with the items of *live*.
+
+        *column* is an integer adressing the column of *store* holding
+        the items.
+        """
+        Observer.__init__(self)
+        self.live = live
+        self.store = store
+        self.column = column
+        self.fill()
+        self.observe_model(live)
+
+    def fill(self):
+        self.store.clear()
+        for item in self.live:
+            self.insert(-1, item)
+
+    def insert(self, index, item):
+        it = self.store.insert(index)
+        self.store.set_value(it, self.column, item)
+
+    @Observer.observe('changed', signal=True)
+    def on_delta(self, live, prop_name, info):
+        delta = info.arg
+        if delta[0] == "insert":
+            self.insert(delta[1], delta[2])
+        elif delta[0] == "remove":
+            self.store.remove(self.store.get_iter(delta[1]))
+        elif delta[0] == "replace":
+            self.store.set_value(self.store.get_iter(delta[1]), self.column,
+                                 delta[3])
+        elif delta[0] == "update":
+            path = Gtk.TreePath(delta[1])
+            self.store.row_changed(path, self.store.get_iter(path))
+        elif delta[0] == "move":
+            self.store.remove(self.store.get_iter(delta[1]))
+            self.insert(delta[2], self.live[delta[2]])
+        else:
+            self.fill()
@@ -30,6 +30,7 @@ from gi.repository import Gtk
 
 from gtkmvc3.observer import Observer
 from gtkmvc3.support.log import logger
+from gtkmvc3.support import hooks
 from gtkmvc3.support.utils import cast_value
 from gtkmvc3.support.exceptions import TooManyCandidatesError
 from gtkmvc3.adapters.basic import Adapter, RoUserClassAdapter
@@ -360,8 +361,9 @@ class Controller (Observer):
                         logger.warn("No widget candidates match property '%s'"
                             % prop_name)
                 else:
-                    logger.debug("Auto-adapting property %s and widget %s" % \
-                                     (prop_name, wid_name))
+                    if hooks.enabled:
+                        hooks.emit("adapt", controller=self,
+                                   prop_name=prop_name, wid_name=wid_name)
                     adapters += self.__create_adapters__(prop_name, wid_name, flavour)
 
         elif n == 1: #one argument
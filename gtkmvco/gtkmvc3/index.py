@@ -0,0 +1,195 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+import bisect
+
+from gtkmvc3.observer import Observer
+from gtkmvc3.support.log import logger
+
+
+class Index (Observer):
+    """
+    Finds the members of a
+    :class:`~gtkmvc3.model_collection.ModelCollection` by the value
+    of property *prop_name*, without scanning the members. The index
+    is updated when members are added, removed, or the property is
+    assigned. Members not having the property are not indexed, and
+    values have to be hashable.
+
+    If *unique* is True, :exc:`ValueError` is raised when two members
+    hold the same value at creation. Later the index is updated from
+    notifications, which cannot be refused: values held by more than
+    one member are logged as warnings and returned by
+    :meth:`conflicts`. Call :meth:`check` before assigning a value
+    to refuse it instead.
+
+    If *ordered* is True, values are also kept sorted, and
+    :meth:`range` finds members by an interval of values. Values then
+    have to be comparable.
+
+    To stop updating the index, call :meth:`relieve_model` with the
+    collection.
+    """
+
+    def __init__(self, collection, prop_name, unique=False, ordered=False):
+        Observer.__init__(self)
+        self.prop_name = prop_name
+        self.unique = unique
+
+        self.__buckets = {}  # value --> members, in a dict used as a set
+        self.__keys = {}  # member --> value it is indexed by
+        self.__values = [] if ordered else None  # sorted values
+        self.__conflicts = set()  # values held by several members
+
+        self.__collection = collection
+        # change detectors of the members may hide changes: the
+        # index is kept in sync with the assigned values instead
+        self.observe(self.__member_changed, "*.%s" % prop_name,
+                     assign=True, spurious=True)
+        for member in collection:
+            self.__insert(member)
+        if self.__conflicts:
+            raise ValueError("Values %s of property '%s' are not unique" %
+                             (", ".join(map(repr, self.__conflicts)),
+                              prop_name))
+        self.observe_model(collection)
+
+    def __len__(self):
+        """Number of distinct values"""
+        return len(self.__buckets)
+
+    def __contains__(self, value):
+        return value in self.__buckets
+
+    def get(self, value, default=None):
+        """
+        Return the member holding *value*, or *default* if there is
+        none. If several members hold *value*, the first indexed is
+        returned.
+        """
+        for member in self.__buckets.get(value, ()):
+            return member
+        return default
+
+    def find(self, value):
+        """
+        Return the list of members holding *value*.
+        """
+        return list(self.__buckets.get(value, ()))
+
+    def check(self, value, member=None):
+        """
+        Raise :exc:`ValueError` if *value* is held by a member other
+        than *member*, if the index is unique. Call this before
+        assigning *value* to *member*, or before adding a member
+        holding it.
+        """
+        if not self.unique: return
+        for other in self.__buckets.get(value, ()):
+            if other is not member:
+                raise ValueError("Value %r of property '%s' is not unique" %
+                                 (value, self.prop_name))
+
+    def conflicts(self):
+        """
+        Return the list of the values held by more than one member,
+        if the index is unique.
+        """
+        return list(self.__conflicts)
+
+    def values(self):
+        """
+        Return the list of the distinct values, sorted if the index is
+        ordered.
+        """
+        if self.__values is not None:
+            return list(self.__values)
+        return list(self.__buckets)
+
+    def range(self, low=None, high=None):
+        """
+        Iterate over the members whose value is at least *low* and less
+        than *high*, in the order of the values. None means no bound.
+        Only ordered indexes support this.
+        """
+        if self.__values is None:
+            raise ValueError("Index of '%s' is not ordered" % self.prop_name)
+
+        start = (0 if low is None else
+                 bisect.bisect_left(self.__values, low))
+        stop = (len(self.__values) if high is None else
+                bisect.bisect_left(self.__values, high))
+        for value in self.__values[start:stop]:
+            for member in self.__buckets[value]:
+                yield member
+
+    def __insert(self, member, value=None, has_value=False):
+        if not has_value:
+            if self.prop_name not in member.get_properties(): return
+            value = getattr(member, self.prop_name)
+
+        self.__keys[member] = value
+        bucket = self.__buckets.get(value)
+        if bucket is None:
+            bucket = self.__buckets[value] = {}
+            if self.__values is not None:
+                bisect.insort(self.__values, value)
+        bucket[member] = None
+
+        if self.unique and len(bucket) > 1 and value not in self.__conflicts:
+            self.__conflicts.add(value)
+            logger.warning("Value %r of property '%s' is not unique",
+                           value, self.prop_name)
+
+    def __delete(self, member):
+        try: value = self.__keys.pop(member)
+        except KeyError: return  # not indexed
+
+        bucket = self.__buckets[value]
+        del bucket[member]
+        if len(bucket) < 2:
+            self.__conflicts.discard(value)
+        if not bucket:
+            del self.__buckets[value]
+            if self.__values is not None:
+                del self.__values[bisect.bisect_left(self.__values, value)]
+
+    @Observer.observe("added", signal=True)
+    def _member_added(self, model, name, info):
+        if model is self.__collection:
+            self.__insert(info.arg)
+
+    @Observer.observe("removed", signal=True)
+    def _member_removed(self, model, name, info):
+        if model is self.__collection:
+            self.__delete(info.arg)
+
+    def __member_changed(self, model, name, info):
+        if model is not self.__collection: return
+        if info.member in self.__keys:
+            old = self.__keys[info.member]
+            if old is info.new or old == info.new:
+                return  # spurious
+        self.__delete(info.member)
+        self.__insert(info.member, info.new, True)
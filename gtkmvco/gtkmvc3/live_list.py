@@ -0,0 +1,599 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+"""
+Lists derived from a list property of a model, or from the members of
+a :class:`~gtkmvc3.model_collection.ModelCollection`, and kept up to
+date incrementally: ::
+
+ live = LiveList.from_collection(rows)
+ cheap = live.filtered(lambda row: row.price < 10).sorted(
+     key=lambda row: row.name)
+
+Each change of a list is described by a *delta*, which is emitted by
+its signal ``changed`` and is one of:
+
+``("insert", index, item)``
+   *item* was inserted at *index*.
+
+``("remove", index, item)``
+   *item* was removed from *index*.
+
+``("replace", index, old, new)``
+   The item at *index* was replaced.
+
+``("update", index, item)``
+   *item* at *index* changed, e.g. a property of a member was
+   assigned.
+
+``("move", old_index, new_index)``
+   The item at *old_index* was removed and inserted again at
+   *new_index*.
+
+``("reset",)``
+   The list changed completely.
+
+Derived lists are updated from the deltas of the list they are
+derived from, without evaluating the functions they are given on
+the items which did not change. Use
+:class:`~gtkmvc3.adapters.containers.watch_live_list` to show a list
+in a :class:`Gtk.TreeView`.
+"""
+
+import bisect
+import itertools
+
+from gtkmvc3.model import Model
+from gtkmvc3.observable import Signal
+from gtkmvc3.observer import Observer
+from gtkmvc3.support import metaclasses
+
+
+class LiveList (Model):
+    """
+    Base class of live lists. The items are accessed like in a
+    list, which must not be changed directly.
+    """
+
+    changed = None
+    __observables__ = ("changed",)
+
+    def __init__(self):
+        Model.__init__(self)
+        self.changed = Signal()
+        self._items = []
+
+    @classmethod
+    def from_collection(cls, collection):
+        """
+        Return a live list of the members of *collection*, in the
+        order they were added. Assignments to the properties of
+        members, and changes of their containers, are deltas
+        ``update``.
+        """
+        return _CollectionSource(collection)
+
+    @classmethod
+    def from_property(cls, model, prop_name):
+        """
+        Return a live list of the items of the list held by property
+        *prop_name* of *model*.
+        """
+        return _PropertySource(model, prop_name)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self._items)
+
+    def filtered(self, pred):
+        """
+        Return a live list of the items for which *pred* returns
+        True.
+        """
+        return _Filtered(self, pred)
+
+    def sorted(self, key=None, reverse=False):
+        """
+        Return a live list of the items sorted as by :func:`sorted`.
+        Items with equal keys are kept in the order they arrived.
+        """
+        return _Sorted(self, key, reverse)
+
+    def mapped(self, fn):
+        """
+        Return a live list of the values of *fn* for each item.
+        """
+        return _Mapped(self, fn)
+
+    def sliced(self, start, stop=None):
+        """
+        Return a live list of the items from index *start* (included)
+        to *stop* (excluded, None for the end), which must not be
+        negative.
+        """
+        return _Sliced(self, start, stop)
+
+    def _emit(self, *delta):
+        self.changed.emit(delta)
+
+
+# ----------------------------------------------------------------------
+class _Flags (object):
+    """A list of booleans, which counts the true ones before an index
+    in about the square root of its length. The booleans are kept in
+    blocks, with the count of each block."""
+
+    BLOCK = 512
+
+    def __init__(self, flags=()):
+        flags = [bool(flag) for flag in flags]
+        self.__blocks = [flags[i:i + self.BLOCK]
+                         for i in range(0, len(flags), self.BLOCK)] or [[]]
+        self.__counts = [sum(block) for block in self.__blocks]
+        self.__len = len(flags)
+
+    def __len__(self):
+        return self.__len
+
+    def __find(self, index):
+        """Returns the block holding index, its position among the
+        blocks, and the index in the block"""
+        for pos, block in enumerate(self.__blocks):
+            if index < len(block) or pos == len(self.__blocks) - 1:
+                return block, pos, index
+            index -= len(block)
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.__blocks)
+
+    def __getitem__(self, index):
+        block, pos, index = self.__find(index)
+        return block[index]
+
+    def __setitem__(self, index, flag):
+        block, pos, index = self.__find(index)
+        self.__counts[pos] += bool(flag) - block[index]
+        block[index] = bool(flag)
+
+    def insert(self, index, flag):
+        block, pos, index = self.__find(index)
+        block.insert(index, bool(flag))
+        self.__counts[pos] += bool(flag)
+        self.__len += 1
+        if len(block) > 2 * self.BLOCK:
+            self.__blocks[pos:pos + 1] = [block[:self.BLOCK],
+                                          block[self.BLOCK:]]
+            self.__counts[pos:pos + 1] = [sum(block[:self.BLOCK]),
+                                          sum(block[self.BLOCK:])]
+
+    def pop(self, index):
+        block, pos, index = self.__find(index)
+        flag = block.pop(index)
+        self.__counts[pos] -= flag
+        self.__len -= 1
+        if not block and len(self.__blocks) > 1:
+            del self.__blocks[pos]
+            del self.__counts[pos]
+        return flag
+
+    def count(self, index):
+        """Returns the number of true booleans before index"""
+        res = 0
+        for pos, block in enumerate(self.__blocks):
+            if index <= len(block):
+                return res + sum(block[:index])
+            res += self.__counts[pos]
+            index -= len(block)
+        return res
+
+
+# ----------------------------------------------------------------------
+class _CollectionSource (LiveList):
+    def __init__(self, collection):
+        LiveList.__init__(self)
+        self.__collection = collection
+        self._items.extend(collection)
+        # each member has a sequence number, and the sorted list of
+        # them gives the index of a member by bisection
+        self.__counter = itertools.count()
+        self.__seqs = list(itertools.islice(self.__counter,
+                                            len(self._items)))
+        self.__seq_of = dict(zip(self._items, self.__seqs))
+        self.observe_model(collection)
+
+    def __index(self, member):
+        return bisect.bisect_left(self.__seqs, self.__seq_of[member])
+
+    @Observer.observe("added", signal=True)
+    def _member_added(self, model, name, info):
+        if model is self.__collection:
+            seq = self.__seq_of[info.arg] = next(self.__counter)
+            self.__seqs.append(seq)
+            self._items.append(info.arg)
+            self._emit("insert", len(self._items) - 1, info.arg)
+
+    @Observer.observe("removed", signal=True)
+    def _member_removed(self, model, name, info):
+        if model is self.__collection:
+            index = self.__index(info.arg)
+            del self.__seq_of[info.arg]
+            del self.__seqs[index]
+            del self._items[index]
+            self._emit("remove", index, info.arg)
+
+    # change detectors of the members may hide changes deciding the
+    # inclusion or the order of members, which are checked by equality
+    @Observer.observe("*", assign=True, after=True, spurious=True)
+    def _member_changed(self, model, name, info):
+        if model is not self.__collection or "member" not in info:
+            return
+        if "assign" in info and not metaclasses.DEFAULT_CHANGE_DETECTOR(
+                info.old, info.new):
+            return
+        self._emit("update", self.__index(info.member), info.member)
+
+
+# ----------------------------------------------------------------------
+class _PropertySource (LiveList):
+    def __init__(self, model, prop_name):
+        LiveList.__init__(self)
+        self.__model = model
+        self._items.extend(getattr(model, prop_name))
+        self.observe(self.__assigned, prop_name, assign=True)
+        self.observe(self.__mutated, prop_name, after=True)
+        self.observe_model(model)
+
+    def __assigned(self, model, name, info):
+        if model is self.__model:
+            self._items[:] = info.new
+            self._emit("reset")
+
+    def __mutated(self, model, name, info):
+        if model is not self.__model: return
+
+        items = self._items
+        name, args = info.method_name, info.args
+        if name == "append":
+            items.append(args[0])
+            self._emit("insert", len(items) - 1, args[0])
+        elif name == "insert":
+            # the index where list.insert puts the item
+            index = min(max(args[0] + len(items) if args[0] < 0 else args[0],
+                            0), len(items))
+            items.insert(index, args[1])
+            self._emit("insert", index, args[1])
+        elif name in ("pop", "remove", "__delitem__") and not (
+            args and isinstance(args[0], slice)):
+            if name == "remove":
+                index = items.index(args[0])
+            else:
+                index = range(len(items))[args[0] if args else -1]
+            item = items.pop(index)
+            self._emit("remove", index, item)
+        elif name == "__setitem__" and not isinstance(args[0], slice):
+            index = range(len(items))[args[0]]
+            old, items[index] = items[index], args[1]
+            self._emit("replace", index, old, args[1])
+        else:
+            # slices, sort, reverse, extend: everything may have moved
+            items[:] = info.instance
+            self._emit("reset")
+
+
+# ----------------------------------------------------------------------
+class _Derived (LiveList):
+    """Base class of lists derived from another live list"""
+
+    def __init__(self, source):
+        LiveList.__init__(self)
+        self._source = source
+        self._reset()
+        self.observe_model(source)
+
+    @Observer.observe("changed", signal=True)
+    def _source_changed(self, model, name, info):
+        if model is not self._source: return
+        delta = info.arg
+        if delta[0] == "reset":
+            self._reset()
+            self._emit("reset")
+        else:
+            getattr(self, "_on_" + delta[0])(*delta[1:])
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def _on_update(self, index, item):
+        self._on_replace(index, item, item)
+
+
+class _Filtered (_Derived):
+    # fraction of the items above which set_predicate resets
+    RESET_FRACTION = 0.1
+
+    def __init__(self, source, pred):
+        self.__pred = pred
+        _Derived.__init__(self, source)
+
+    def set_predicate(self, pred):
+        """
+        Change the predicate. Only the items whose inclusion changed
+        are notified, as deltas ``insert`` and ``remove``, unless they
+        are more than :attr:`RESET_FRACTION` of the items of the
+        source, then a delta ``reset`` is emitted.
+        """
+        self.__pred = pred
+        olds = list(self.__passes)
+        passes = [bool(pred(item)) for item in self._source]
+        self.__passes = _Flags(passes)
+        changed = [pos for pos, (old, new) in enumerate(zip(olds, passes))
+                   if old != new]
+        if len(changed) > self.RESET_FRACTION * len(passes):
+            self._items[:] = itertools.compress(self._source, passes)
+            self._emit("reset")
+            return
+
+        # the items before pos already follow the new predicate
+        for pos in changed:
+            index = self.__passes.count(pos)
+            if passes[pos]:
+                self._items.insert(index, self._source[pos])
+                self._emit("insert", index, self._source[pos])
+            else:
+                item = self._items.pop(index)
+                self._emit("remove", index, item)
+
+    def _reset(self):
+        passes = [bool(self.__pred(item)) for item in self._source]
+        self.__passes = _Flags(passes)
+        self._items[:] = itertools.compress(self._source, passes)
+
+    def __index(self, source_index):
+        """Returns the index in self of the item at the given index
+        in the source, or where it would be"""
+        return self.__passes.count(source_index)
+
+    def _on_insert(self, index, item):
+        passes = bool(self.__pred(item))
+        self.__passes.insert(index, passes)
+        if passes:
+            pos = self.__index(index)
+            self._items.insert(pos, item)
+            self._emit("insert", pos, item)
+
+    def _on_remove(self, index, item):
+        if self.__passes.pop(index):
+            pos = self.__index(index)
+            del self._items[pos]
+            self._emit("remove", pos, item)
+
+    def _on_replace(self, index, old, new):
+        passed = self.__passes[index]
+        passes = self.__passes[index] = bool(self.__pred(new))
+        pos = self.__index(index)
+        if passed and passes:
+            self._items[pos] = new
+            if new is old: self._emit("update", pos, new)
+            else: self._emit("replace", pos, old, new)
+        elif passed:
+            del self._items[pos]
+            self._emit("remove", pos, old)
+        elif passes:
+            self._items.insert(pos, new)
+            self._emit("insert", pos, new)
+
+    def _on_move(self, old_index, new_index):
+        passes = self.__passes.pop(old_index)
+        old_pos = self.__index(old_index)
+        self.__passes.insert(new_index, passes)
+        if passes:
+            new_pos = self.__index(new_index)
+            self._items.insert(new_pos, self._items.pop(old_pos))
+            if new_pos != old_pos: self._emit("move", old_pos, new_pos)
+
+
+class _Sorted (_Derived):
+    def __init__(self, source, key, reverse):
+        self.__key = key or (lambda item: item)
+        self.__reverse = reverse
+        self.__counter = itertools.count()
+        _Derived.__init__(self, source)
+
+    def _reset(self):
+        # entries are sorted triples (key, sequence number, item). The
+        # sequence numbers tell apart items with equal keys, and are
+        # kept in the order of the source in __seqs.
+        self.__seqs = [next(self.__counter) for item in self._source]
+        self.__keys = dict((seq, self.__key(item))
+                           for seq, item in zip(self.__seqs, self._source))
+        self.__entries = sorted((self.__keys[seq], seq, item)
+                                for seq, item in zip(self.__seqs,
+                                                     self._source))
+        self._items[:] = (entry[2] for entry in self.__entries)
+        if self.__reverse: self._items.reverse()
+
+    def __pos(self, index, length):
+        """Converts between indices of entries and of items"""
+        return length - 1 - index if self.__reverse else index
+
+    def __add(self, seq, item):
+        key = self.__keys[seq] = self.__key(item)
+        index = bisect.bisect_left(self.__entries, (key, seq))
+        self.__entries.insert(index, (key, seq, item))
+        pos = self.__pos(index, len(self.__entries))
+        self._items.insert(pos, item)
+        return pos
+
+    def __discard(self, seq):
+        key = self.__keys.pop(seq)
+        index = bisect.bisect_left(self.__entries, (key, seq))
+        pos = self.__pos(index, len(self.__entries))
+        del self.__entries[index]
+        del self._items[pos]
+        return pos
+
+    def _on_insert(self, index, item):
+        seq = next(self.__counter)
+        self.__seqs.insert(index, seq)
+        self._emit("insert", self.__add(seq, item), item)
+
+    def _on_remove(self, index, item):
+        self._emit("remove", self.__discard(self.__seqs.pop(index)), item)
+
+    def _on_replace(self, index, old, new):
+        seq = self.__seqs[index]
+        old_pos = self.__discard(seq)
+        new_pos = self.__add(seq, new)
+        if new is not old:
+            if new_pos == old_pos:
+                self._emit("replace", new_pos, old, new)
+            else:
+                self._emit("remove", old_pos, old)
+                self._emit("insert", new_pos, new)
+        else:
+            if new_pos != old_pos: self._emit("move", old_pos, new_pos)
+            self._emit("update", new_pos, new)
+
+    def _on_move(self, old_index, new_index):
+        self.__seqs.insert(new_index, self.__seqs.pop(old_index))
+
+
+class _Mapped (_Derived):
+    def __init__(self, source, fn):
+        self.__fn = fn
+        _Derived.__init__(self, source)
+
+    def _reset(self):
+        self._items[:] = map(self.__fn, self._source)
+
+    def _on_insert(self, index, item):
+        value = self.__fn(item)
+        self._items.insert(index, value)
+        self._emit("insert", index, value)
+
+    def _on_remove(self, index, item):
+        self._emit("remove", index, self._items.pop(index))
+
+    def _on_replace(self, index, old, new):
+        old_value, value = self._items[index], self.__fn(new)
+        self._items[index] = value
+        if value is old_value:
+            self._emit("update", index, value)
+        elif value != old_value:
+            self._emit("replace", index, old_value, value)
+
+    def _on_move(self, old_index, new_index):
+        self._items.insert(new_index, self._items.pop(old_index))
+        self._emit("move", old_index, new_index)
+
+
+class _Sliced (_Derived):
+    def __init__(self, source, start, stop):
+        if start < 0 or (stop is not None and stop < 0):
+            raise ValueError("Live slices cannot have negative indices")
+        self.__start = start
+        self.__stop = stop
+        _Derived.__init__(self, source)
+
+    def _reset(self):
+        self._items[:] = self._source._items[self.__start:self.__stop]
+
+    def __outside(self, index):
+        """True if the item at the given index of the source is after
+        the slice, or if the slice is always empty"""
+        stop = self.__stop
+        return stop is not None and (index >= stop or stop <= self.__start)
+
+    def __inserted(self, index, item, get, length):
+        """Shifts the slice after item was inserted at index of the
+        source, which now has length items returned by get"""
+        if self.__outside(index): return
+        if index < self.__start:
+            # the item before the slice enters it
+            if length <= self.__start: return
+            index, item = self.__start, get(self.__start)
+        if self.__stop is not None and length > self.__stop:
+            # the last item leaves it
+            self._emit("remove", len(self._items) - 1, self._items.pop())
+        pos = index - self.__start
+        self._items.insert(pos, item)
+        self._emit("insert", pos, item)
+
+    def __removed(self, index, item, get, length):
+        """Shifts the slice after item was removed from index of the
+        source, which now has length items returned by get"""
+        if self.__outside(index): return
+        if index < self.__start:
+            # the first item leaves the slice
+            if not self._items: return
+            index, item = self.__start, self._items[0]
+        pos = index - self.__start
+        del self._items[pos]
+        self._emit("remove", pos, item)
+        if self.__stop is not None and length >= self.__stop:
+            # the item after it enters
+            item = get(self.__stop - 1)
+            self._items.append(item)
+            self._emit("insert", len(self._items) - 1, item)
+
+    def _on_insert(self, index, item):
+        source = self._source._items
+        self.__inserted(index, item, source.__getitem__, len(source))
+
+    def _on_remove(self, index, item):
+        source = self._source._items
+        self.__removed(index, item, source.__getitem__, len(source))
+
+    def _on_move(self, old_index, new_index):
+        start = self.__start
+        stop = len(self._source) if self.__stop is None else self.__stop
+        inside = [start <= index < stop for index in (old_index, new_index)]
+        if all(inside):
+            old_pos, new_pos = old_index - start, new_index - start
+            self._items.insert(new_pos, self._items.pop(old_pos))
+            self._emit("move", old_pos, new_pos)
+        elif any(inside) or (old_index < start) != (new_index < start):
+            # moved across a bound: removed, then inserted
+            source = self._source._items
+            def get_removed(index):
+                return source[index if index < new_index else index + 1]
+            item = source[new_index]
+            self.__removed(old_index, item, get_removed, len(source) - 1)
+            self.__inserted(new_index, item, source.__getitem__,
+                            len(source))
+
+    def _on_replace(self, index, old, new):
+        if self.__outside(index) or index < self.__start: return
+        pos = index - self.__start
+        self._items[pos] = new
+        if new is old: self._emit("update", pos, new)
+        else: self._emit("replace", pos, old, new)
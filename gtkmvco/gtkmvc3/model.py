@@ -25,16 +25,21 @@
 import inspect
 import types
 import functools
+import copy
+import itertools
+import weakref
 
 from gi.repository import Gtk
 
 from gtkmvc3.support import metaclasses
 from gtkmvc3.support.porting import with_metaclass, add_metaclass
-from gtkmvc3.support.wrappers import ObsWrapperBase
+from gtkmvc3.support.wrappers import (ObsWrapperBase, ObsContainerDefault,
+                                      ObsSeqWrapper, ARRAY_TYPES)
 from gtkmvc3.observer import Observer, NTInfo
 from gtkmvc3.observable import Signal
 from gtkmvc3.support.log import logger
 from gtkmvc3.support import decorators
+from gtkmvc3.support import hooks
 from gtkmvc3.support.utils import getmembers
 
 
@@ -55,6 +60,58 @@ def count_leaves(x):
     return 1
 
 
+def _parse_path(path):
+    """Returns the pairs (property name, True if starred) of the
+    segments of the given path dependency, like ``child.price`` or
+    ``items[*].qty``, or None if the path is malformed"""
+    res = []
+    for segment in path.split("."):
+        star = segment.endswith("[*]")
+        if star: segment = segment[:-3]
+        if not segment: return None
+        res.append((segment, star))
+    if res[-1][1]: return None  # the last property has to be a value
+    return res
+
+
+class _PathChange (object):
+    """Collected before a change of a property a path dependency goes
+    through, and passed to the model owning the logical property
+    afterwards (see Model._path_changed)"""
+    __slots__ = ("old", "observed", "resubscribe")
+
+    def __init__(self, old=None, observed=False, resubscribe=False):
+        self.old = old
+        self.observed = observed
+        self.resubscribe = resubscribe
+
+
+def _link_callback(model, prop_name):
+    """Returns the callback of the weak reference to the owner of a
+    link to the given property of model, which drops the link when
+    the owner is gone"""
+    model_ref = weakref.ref(model)
+    def callback(owner_ref):
+        model = model_ref()
+        if model is not None: model._prune_path_links(prop_name)
+    return callback
+
+
+class _PathState (object):
+    """The state of a model about path dependencies"""
+    __slots__ = ("links", "olds", "subs")
+
+    def __init__(self):
+        # property name --> links (weak reference to owner, logical
+        # name, is_leaf) of the models depending on it through a path
+        self.links = {}
+        # property name --> changes collected before a mutation
+        self.olds = {}
+        # index of path dependency --> {(id(model), property name):
+        # (model, property name, link)}, for models owning paths
+        self.subs = {}
+
+
 @add_metaclass(metaclasses.ObservablePropertyMeta)
 class Model (Observer):
     """
@@ -69,10 +126,41 @@ class Model (Observer):
 
        *Logical properties* require a getter and may have a setter method in
        the class.
+
+       Instead of a name string, an element can be a pair ``(name,
+       detector)`` selecting how changes of the value are detected when
+       filtering spurious notifications. *name* may contain wildcards.
+       *detector* is one of ``"eq"`` (the default, comparing with
+       ``!=``), ``"identity"``, ``"hash"``, ``"always"`` (every
+       assignment is a change) or a callable taking the old and the new
+       value and returning True if the value changed.
+
+    .. attribute:: __compact__
+
+       Class attribute. If True, values of concrete properties and
+       the internal state of instances are stored in slots. This saves
+       memory when many instances are
+       kept, but compact models cannot observe models (including
+       themselves). Derived classes are compact as well.
     """
 
     __properties__ = {}  # override this
 
+    # pairs (logical property name, parsed path) of the dependencies
+    # of logical properties on properties of other models (see
+    # _calculate_logical_deps)
+    __path_deps = ()
+
+    # instance attributes stored in slots by compact models
+    __compact_slots__ = ("_Model__observers", "_Model__value_notifications",
+                         "_Model__instance_notif_before",
+                         "_Model__instance_notif_after",
+                         "_Model__signal_notif", "_Model__version",
+                         "_Model__prop_versions", "_Model__dirty",
+                         "_Model__log_prop_deps", "_Model__collections",
+                         "_Model__paths",
+                         "_notify_stack")
+
     # these classes are used internally and by metaclass only
     class __setinfo:
         def __init__(self, func, has_args):
@@ -109,6 +197,13 @@ class Model (Observer):
         are the properties (both logical and concrete) which the
         logical property depends on.
 
+        A dependency can also be a path through observable properties
+        holding other models, like ``child.price``. A segment can be
+        followed by ``[*]`` to go through all the models in a list,
+        like ``items[*].qty``. The logical property is then notified
+        when the last property of any of the models on the path
+        changes, and when a model on the path gets replaced.
+
         .. versionadded:: 1.99.1
            Introduced the decorator.
 
@@ -250,8 +345,49 @@ class Model (Observer):
     # ----------------------------------------------------------------------
 
     def __init__(self):
-        Observer.__init__(self)
+        # compact models do not observe
+        if not getattr(self, metaclasses.COMPACT_NAME, False):
+            Observer.__init__(self)
+
+        # these are created when the first observer registers (see
+        # __create_notifications)
+        self.__observers = None
+        self.__value_notifications = None
+        self.__instance_notif_before = None
+        self.__instance_notif_after = None
+        self.__signal_notif = None
+
+        # versions are increased upon changes (see version_of)
+        self.__version = 0
+        self.__prop_versions = {}
+
+        # None when dirty tracking is disabled (see track_dirty)
+        self.__dirty = None
+
+        # collections self is a member of (see ModelCollection)
+        self.__collections = None
+
+        # None when no path dependency goes through self (see
+        # _PathState)
+        self.__paths = None
+
+        # notifications of each property are set up when the property
+        # gets its first observer. Only wrappers shared by instances
+        # through class attributes have to know the model from start.
+        for key in self.__get_shared_wrappers(): self.register_property(key)
+
+        # here OPs dependencies are reversed and pre-calculated
+        self._calculate_logical_deps()
+        if self.__path_deps: self.__subscribe_paths()
+
+        # this stack is used to avoid spurious multiple notifications
+        # which can happen otherwise when logical properties are
+        # involved.
+        self._notify_stack = []
 
+    def __create_notifications(self):
+        """Creates the list of observers, and the maps of
+        notification methods"""
         self.__observers = []
 
         # keys are properties names, values are pairs (method,
@@ -267,20 +403,45 @@ class Model (Observer):
         self.__instance_notif_after = {}
         self.__signal_notif = {}
 
-        for key in self.get_properties(): self.register_property(key)
-
-        # here OPs dependencies are reversed and pre-calculated
-        self._calculate_logical_deps()
-
-        # this stack is used to avoid spurious multiple notifications
-        # which can happen otherwise when logical properties are
-        # involved.
-        self._notify_stack = []
+    def __get_shared_wrappers(self):
+        """Returns the names of the properties whose default value
+        is a wrapper shared by all instances. This depends only on the
+        class, so it is calculated once."""
+        cls = type(self)
+        if "_Model__shared_wrappers" not in cls.__dict__:
+            names = []
+            for name in self.get_properties():
+                val = self.__get_prop_value(name)
+                if isinstance(val, ObsWrapperBase) and not val._cow_template:
+                    names.append(name)
+            cls._Model__shared_wrappers = tuple(names)
+        return cls._Model__shared_wrappers
 
     def _has_observer(self):
-        return bool(count_leaves((self.__value_notifications,
-            self.__instance_notif_before, self.__instance_notif_after,
-            self.__signal_notif)))
+        # called by setters at each assignment, this has to be cheap
+        return bool(self.__observers or self.__collections or self.__paths)
+
+    def _get_observers(self):
+        """Returns the list of the registered observers"""
+        return list(self.__observers or ())
+
+    def _add_collection(self, collection):
+        """Called by a ModelCollection when self is added to it"""
+        if self.__collections is None:
+            self.__collections = []
+        self.__collections.append(collection)
+
+    def _remove_collection(self, collection):
+        """Called by a ModelCollection when self is removed from it"""
+        self.__collections.remove(collection)
+
+    def _get_value_notifications(self, prop_name):
+        """Returns the pairs (method, kwargs|None) to be called upon
+        assignment to the given property (see
+        notify_property_value_change)"""
+        if self.__value_notifications is None:
+            return ()
+        return self.__value_notifications.get(prop_name, ())
 
     def _calculate_logical_deps(self):
         """Internal service which calculates dependencies information
@@ -293,9 +454,16 @@ class Model (Observer):
         the rest is demanded at runtime)
 
         Result is stored inside internal dict __log_prop_deps which
-        represents the dependencies graph.
+        represents the dependencies graph. The graph depends only on
+        the class, so it is calculated once and shared by instances.
         """
+        cls = type(self)
+        if "_Model__log_prop_deps_graph" in cls.__dict__:
+            self.__log_prop_deps = cls._Model__log_prop_deps_graph
+            return
+
         self.__log_prop_deps = {}  # the result goes here
+        path_deps = []
 
         # this is used in messages
         _mod_cls = "%s.%s" % (self.__class__.__module__,
@@ -308,6 +476,16 @@ class Model (Observer):
         # reverses the graph
         for name, deps in logic_ops:
             for dep in deps:
+                if "." in dep or "[" in dep:
+                    path = _parse_path(dep)
+                    if path is None or not self.has_property(path[0][0]):
+                        raise ValueError("In class %s dependencies of "
+                                         "logical property '%s' refer "
+                                         "invalid path '%s'" %
+                                         (_mod_cls, name, dep))
+                    path_deps.append((name, path))
+                    continue
+
                 if not self.has_property(dep):
                     raise ValueError("In class %s dependencies of logical "
                                      "property '%s' refer non-existant "
@@ -318,12 +496,6 @@ class Model (Observer):
                 rdeps.append(name)
                 self.__log_prop_deps[dep] = rdeps
 
-        # emits debugging info about dependencies
-        for name, rdeps in self.__log_prop_deps.items():
-            logger.debug("In class %s changes to OP %s affects "
-                         "logical OPs: %s",
-                         _mod_cls, name, ", ".join(rdeps))
-
         # --------------------------------------------------
         # Here the graph is checked to be a DAG
         # --------------------------------------------------
@@ -352,21 +524,140 @@ class Model (Observer):
                                  % (_mod_cls, ", ".join(graph.keys())))
 
         # here the graph is a DAG
-        return
+        if hooks.enabled:
+            hooks.emit("dependencies", model_class=cls,
+                       graph=self.__log_prop_deps)
+        cls._Model__path_deps = tuple(path_deps)
+        cls._Model__log_prop_deps_graph = self.__log_prop_deps
+
+    def __walk_path(self, path):
+        """Yields the triples (model, property name, True if last on
+        the path) of the properties the given path goes through
+        starting from self"""
+        models = [self]
+        last = len(path) - 1
+        for pos, (prop_name, star) in enumerate(path):
+            values = []
+            for model in models:
+                if prop_name not in model.get_properties(): continue
+                yield model, prop_name, pos == last
+                if pos == last: continue
+                val = getattr(model, prop_name)
+                if star:
+                    values.extend(x for x in val or ()
+                                  if isinstance(x, Model))
+                elif isinstance(val, Model):
+                    values.append(val)
+            models = values
+
+    def __subscribe_paths(self, name=None):
+        """Links the models on the paths of the dependencies of
+        logical property name (all if None) to self, and unlinks
+        those not on the paths anymore"""
+        if self.__paths is None:
+            self.__paths = _PathState()
+        for index, (log_name, path) in enumerate(self.__path_deps):
+            if name is not None and name != log_name: continue
+
+            old = self.__paths.subs.get(index, {})
+            new = {}
+            for model, prop_name, is_leaf in self.__walk_path(path):
+                key = (id(model), prop_name)
+                sub = old.pop(key, None)
+                if sub is None:
+                    # models on the path do not keep self alive
+                    link = (weakref.ref(self,
+                                        _link_callback(model, prop_name)),
+                            log_name, is_leaf)
+                    model._add_path_link(prop_name, link)
+                    sub = (model, prop_name, link)
+                new[key] = sub
+            for model, prop_name, link in old.values():
+                model._remove_path_link(prop_name, link)
+            self.__paths.subs[index] = new
+
+    def _add_path_link(self, prop_name, link):
+        """Called by a model having a logical property which depends
+        on the given property of self through a path"""
+        if self.__paths is None:
+            self.__paths = _PathState()
+        self.__paths.links.setdefault(prop_name, []).append(link)
+
+    def _remove_path_link(self, prop_name, link):
+        """Undoes _add_path_link"""
+        links = self.__paths.links[prop_name]
+        links.remove(link)
+        if not links: self.__drop_path_links(prop_name)
+
+    def _prune_path_links(self, prop_name):
+        """Drops the links to the given property whose owner is
+        gone"""
+        if self.__paths is None or prop_name not in self.__paths.links:
+            return
+        links = self.__paths.links[prop_name]
+        links[:] = [link for link in links if link[0]() is not None]
+        if not links: self.__drop_path_links(prop_name)
+
+    def __drop_path_links(self, prop_name):
+        del self.__paths.links[prop_name]
+        if not self.__paths.links and not self.__paths.subs:
+            self.__paths = None
+
+    def __get_path_olds(self, prop_name):
+        """Returns the triples (model, logical property name,
+        _PathChange) for the logical properties of other models (or
+        self) which depend on prop_name through a path"""
+        if self.__paths is None or prop_name not in self.__paths.links:
+            return ()
+
+        res = []
+        seen = set()
+        # copied, links are dropped when their owner is collected
+        for owner_ref, name, is_leaf in tuple(self.__paths.links[prop_name]):
+            owner = owner_ref()
+            if owner is None: continue
+            if not is_leaf:
+                # the models on the path may change
+                res.insert(0, (owner, name, _PathChange(resubscribe=True)))
+            observed = bool(owner.__observers or owner.__collections)
+            for dep in itertools.chain((name,),
+                                       owner._get_logical_deps(name)):
+                if (id(owner), dep) in seen: continue
+                seen.add((id(owner), dep))
+                res.append((owner, dep,
+                            _PathChange(getattr(owner, dep) if observed
+                                        else None, observed)))
+        return tuple(res)
+
+    def _path_changed(self, name, change):
+        """Called after a change of a property the dependencies of
+        logical property name go through"""
+        if change.resubscribe:
+            self.__subscribe_paths(name)
+            return
+        self._property_changed(name)
+        if change.observed:
+            self.notify_property_value_change(name, change.old,
+                                              getattr(self, name))
 
     def register_property(self, name):
         """Registers an existing property to be monitored, and sets up
         notifiers for notifications."""
 
-        if name not in self.__value_notifications:
-            self.__value_notifications[name] = []
-
         # registers observable wrappers
         prop = self.__get_prop_value(name)
 
-        if isinstance(prop, ObsWrapperBase):
+        # container defaults register their copy when accessed
+        if isinstance(prop, ObsWrapperBase) and not prop._cow_template:
             prop.__add_model__(self, name)
 
+        if self.__value_notifications is None:
+            return  # not observed yet
+
+        if name not in self.__value_notifications:
+            self.__value_notifications[name] = []
+
+        if isinstance(prop, ObsWrapperBase):
             if isinstance(prop, Signal):
                 if name not in self.__signal_notif:
                     self.__signal_notif[name] = []
@@ -381,9 +672,265 @@ class Model (Observer):
         property inside self or inside derived classes."""
         return name in self.get_properties()
 
+    def version_of(self, name=None):
+        """
+        Return the version of an observable property, an integer which
+        is increased every time the property is assigned, or its value
+        is changed through a method call (e.g. appending to a list).
+        Versions of logical properties are increased along with the
+        properties they depend on.
+
+        Comparing versions is a cheap way to know whether a property
+        may have changed since it was last read, e.g. to validate
+        caches. Versions never decrease, and the initial version is 0.
+
+        *name* is a string. If None, the version of the whole model is
+        returned, which is increased upon any change of any property.
+        """
+        if name is None:
+            return self.__version
+        if not self.has_property(name):
+            raise ValueError("Model %s has no observable property '%s'" %
+                             (self.__class__.__name__, name))
+        return self.__prop_versions.get(name, 0)
+
+    def track_dirty(self, enabled=True):
+        """
+        Start or stop tracking which properties change, e.g. to save
+        only what changed since the last save. Tracking is disabled by
+        default. When started, no property is dirty.
+
+        See :meth:`dirty_properties` and :meth:`clear_dirty`.
+        """
+        self.__dirty = {} if enabled else None
+
+    def dirty_properties(self):
+        """
+        Return the properties which changed since dirty tracking was
+        started, or since the last call to :meth:`clear_dirty`.
+
+        :rtype: dict mapping property names to None when the whole
+          value has to be considered changed (e.g. after an
+          assignment), or to a frozenset of the changed keys of maps,
+          indices of lists and arrays, or elements of sets.
+
+        Raises :exc:`RuntimeError` if dirty tracking is not enabled with
+        :meth:`track_dirty`.
+        """
+        if self.__dirty is None:
+            raise RuntimeError("Dirty tracking is not enabled in model %s" %
+                               self.__class__.__name__)
+        return dict((name, None if keys is None else frozenset(keys))
+                    for name, keys in self.__dirty.items())
+
+    def clear_dirty(self):
+        """
+        Forget the changes returned by :meth:`dirty_properties`.
+        """
+        if self.__dirty is not None:
+            self.__dirty.clear()
+
+    def clone(self, deep=False):
+        """
+        Return a new model of the same class, holding the same values.
+        Values are copied directly, without going through ``__init__``
+        or notifications, and observers are not copied.
+
+        Lists, maps, sets and NumPy arrays are copied. If *deep* is
+        True, they and all other values are deeply copied
+        (with :func:`copy.deepcopy`), and sub-models are cloned deeply.
+        Otherwise they are shared. Signals and other observable
+        instances are shared in both cases.
+
+        Models derived from Gtk classes cannot be cloned.
+        """
+        return self.__clone(type(self), deep, {}, {})
+
+    @classmethod
+    def from_prototype(cls, proto, deep=False, **overrides):
+        """
+        Return a new instance of this class, cloned from *proto* (see
+        :meth:`clone`, which *deep* is passed to) and with the
+        observable properties given as keyword arguments set to the
+        given values, without notifications. *proto* has to be an
+        instance of this class, and only concrete properties can be
+        given: :exc:`ValueError` is raised for logical properties.
+        """
+        if not isinstance(proto, cls):
+            raise TypeError("Prototype of %s must be an instance of it, "
+                            "not %s" % (cls.__name__,
+                                        proto.__class__.__name__))
+        for name in overrides:
+            if name not in proto.get_properties():
+                raise TypeError("Model %s has no observable property '%s'" %
+                                (cls.__name__, name))
+            if not isinstance(getattr(cls, name, None),
+                              metaclasses.PropertyMeta.ConcreteOP):
+                raise ValueError("Property '%s' of model %s is logical, "
+                                 "and cannot be given to from_prototype" %
+                                 (name, cls.__name__))
+        return proto.__clone(cls, deep, {}, overrides)
+
+    def __copy__(self):
+        return self.clone()
+
+    def __deepcopy__(self, memo):
+        return self.__clone(type(self), True, memo, {})
+
+    def _init_clone(self):
+        """Initializes the internal state of a clone, which is not
+        copied from the original model. Derived classes with internal
+        state which has to be created without calling their
+        constructor override this."""
+        Model.__init__(self)
+
+    def __get_concrete_vars(self):
+        """Returns a tuple of triples (name, variable name, True if
+        the variable is a slot) for the concrete properties. This
+        depends only on the class, so it is calculated once."""
+        cls = type(self)
+        if "_Model__concrete_vars" not in cls.__dict__:
+            res = []
+            for name in self.get_properties():
+                if isinstance(getattr(cls, name, None),
+                              metaclasses.PropertyMeta.ConcreteOP):
+                    varname = metaclasses.PROP_NAME % {'prop_name' : name}
+                    res.append((name, varname,
+                                isinstance(getattr(cls, varname, None),
+                                           types.MemberDescriptorType)))
+            cls._Model__concrete_vars = tuple(res)
+        return cls._Model__concrete_vars
+
+    def __clone(self, cls, deep, memo, overrides):
+        """Implements clone and from_prototype, returning an instance
+        of cls"""
+        res = cls.__new__(cls)
+        memo[id(self)] = res
+        res._init_clone()
+        if self.__dirty is not None:
+            res.track_dirty()
+
+        state = vars(self)
+        res_state = vars(res)
+        same_class = cls is type(self)
+        # attributes which are not internal to models. Shallow clones
+        # of the same class take the values of the properties as well,
+        # and only observable values are handled one by one below.
+        shallow = same_class and not deep
+        if shallow:
+            res_state.update((name, val) for name, val in state.items()
+                             if name not in res_state)
+        else:
+            for name in state.keys() - res_state.keys():
+                if not name.startswith("_prop_"):
+                    val = state[name]
+                    setattr(res, name,
+                            copy.deepcopy(val, memo) if deep else val)
+
+        for name, varname, is_slot in res.__get_concrete_vars():
+            if name in overrides:
+                setattr(res, varname,
+                        cls.create_value(name, overrides[name], res))
+                continue
+
+            if shallow and not is_slot:
+                val = res_state.get(varname)
+                if not isinstance(val, ObsWrapperBase):
+                    continue  # taken already, or the default is kept
+            else:
+                try: val = state[varname]
+                except KeyError:
+                    if not same_class:
+                        val = getattr(self, name)
+                    elif is_slot:
+                        try: val = getattr(self, varname)
+                        except AttributeError: continue  # default
+                    else: continue  # the clone keeps the default as well
+
+            if isinstance(val, ObsSeqWrapper):
+                # the original is left alone, as other references to
+                # its container may exist
+                val = cls.create_value(name, copy.deepcopy(val._obj, memo)
+                                       if deep else copy.copy(val._obj))
+            elif isinstance(val, ARRAY_TYPES):
+                val = cls.create_value(name, getattr(val, "_obj", val).copy())
+            elif deep and not isinstance(val, ObsWrapperBase):
+                val = copy.deepcopy(val, memo)
+
+            if isinstance(val, ObsWrapperBase):
+                val.__add_model__(res, name)
+            setattr(res, varname, val)
+
+        if res.__path_deps: res.__subscribe_paths()
+        return res
+
+    def _property_changed(self, prop_name, keys=None):
+        """Called when the value of the given property changed, or
+        may have changed. Increases the version of the property and
+        of the logical properties depending on it, and marks the
+        property as dirty if dirty tracking is enabled. keys is None
+        if the whole value changed, or the set of changed keys
+        (indices, elements) when a container changed."""
+        self.__version += 1
+        self.__prop_versions[prop_name] = self.__version
+        for name in self._get_logical_deps(prop_name):
+            self.__prop_versions[name] = self.__version
+
+        if self.__dirty is None:
+            return
+        if keys is None:
+            self.__dirty[prop_name] = None
+        elif prop_name not in self.__dirty:
+            self.__dirty[prop_name] = set(keys)
+        elif self.__dirty[prop_name] is not None:
+            self.__dirty[prop_name] |= keys
+
+    def __get_changed_keys(self, instance, meth_name, args, kwargs, extra):
+        """Returns the set of the keys (indices, elements) changed by
+        calling the given method on instance, or None if the whole
+        instance has to be considered changed. This is called after
+        the method call."""
+        try:
+            if 'region' in extra:  # arrays
+                if extra['region'] is Ellipsis:
+                    return None
+                return set((extra['region'],))
+
+            if isinstance(instance, dict):
+                if meth_name in ("__setitem__", "__delitem__",
+                                 "pop", "setdefault"):
+                    return set(args[:1])
+                if meth_name == "update":
+                    keys = set(kwargs)
+                    if args and hasattr(args[0], "keys"):
+                        keys.update(args[0].keys())
+                    elif args:
+                        return None  # an iterable, possibly consumed
+                    return keys
+
+            elif isinstance(instance, (set, frozenset)):
+                if meth_name in ("add", "discard", "remove"):
+                    return set(args[:1])
+
+            elif isinstance(instance, list):
+                # other methods shift indices
+                if meth_name == "__setitem__" and isinstance(args[0], int):
+                    return set((args[0] % len(instance),))
+                if meth_name == "append":
+                    return set((len(instance) - 1,))
+
+        except TypeError:
+            pass  # unhashable key
+
+        return None
+
     def register_observer(self, observer):
         """Register given observer among those observers which are
         interested in observing the model."""
+        if self.__observers is None:
+            # observed for the first time
+            self.__create_notifications()
+
         if observer in self.__observers: return  # not already registered
 
         assert isinstance(observer, Observer)
@@ -396,7 +943,7 @@ class Model (Observer):
         in observing the model."""
         assert isinstance(observer, Observer)
 
-        if observer not in self.__observers:
+        if not self.__observers or observer not in self.__observers:
             return
         for key in self.get_properties():
             self.__remove_observer_notification(observer, key)
@@ -418,7 +965,7 @@ class Model (Observer):
 
         self.register_property(prop_name)
 
-        for observer in self.__observers:
+        for observer in self.__observers or ():
             self.__remove_observer_notification(observer, prop_name)
             self.__add_observer_notification(observer, prop_name)
 
@@ -458,12 +1005,15 @@ class Model (Observer):
 
         def add_value(notification, kw=None):
             pair = (notification, kw)
-            if pair in self.__value_notifications[prop_name]:
+            notifications = self.__value_notifications.setdefault(prop_name,
+                                                                  [])
+            if pair in notifications:
                 return
-            logger.debug("Will call %s.%s after assignment to %s.%s",
-                observer.__class__.__name__, notification.__name__,
-                self.__class__.__name__, prop_name)
-            self.__value_notifications[prop_name].append(pair)
+            if hooks.enabled:
+                hooks.emit("register", model=self, observer=observer,
+                           prop_name=prop_name, method=notification,
+                           type='assign')
+            notifications.append(pair)
 
         def add_before(notification, kw=None):
             if (not isinstance(value, ObsWrapperBase) or
@@ -471,13 +1021,16 @@ class Model (Observer):
                 return
 
             pair = (notification, kw)
-            if pair in self.__instance_notif_before[prop_name]:
+            notifications = self.__instance_notif_before.setdefault(
+                prop_name, [])
+            if pair in notifications:
                 return
-            logger.debug("Will call %s.%s before mutation of %s.%s",
-                observer.__class__.__name__, notification.__name__,
-                self.__class__.__name__, prop_name)
+            if hooks.enabled:
+                hooks.emit("register", model=self, observer=observer,
+                           prop_name=prop_name, method=notification,
+                           type='before')
 
-            self.__instance_notif_before[prop_name].append(pair)
+            notifications.append(pair)
 
         def add_after(notification, kw=None):
             if (not isinstance(value, ObsWrapperBase) or
@@ -485,26 +1038,31 @@ class Model (Observer):
                 return
 
             pair = (notification, kw)
-            if pair in self.__instance_notif_after[prop_name]:
+            notifications = self.__instance_notif_after.setdefault(
+                prop_name, [])
+            if pair in notifications:
                 return
-            logger.debug("Will call %s.%s after mutation of %s.%s",
-                observer.__class__.__name__, notification.__name__,
-                self.__class__.__name__, prop_name)
+            if hooks.enabled:
+                hooks.emit("register", model=self, observer=observer,
+                           prop_name=prop_name, method=notification,
+                           type='after')
 
-            self.__instance_notif_after[prop_name].append(pair)
+            notifications.append(pair)
 
         def add_signal(notification, kw=None):
             if not isinstance(value, Signal):
                 return
 
             pair = (notification, kw)
-            if pair in self.__signal_notif[prop_name]:
+            notifications = self.__signal_notif.setdefault(prop_name, [])
+            if pair in notifications:
                 return
-            logger.debug("Will call %s.%s after emit on %s.%s",
-                observer.__class__.__name__, notification.__name__,
-                self.__class__.__name__, prop_name)
+            if hooks.enabled:
+                hooks.emit("register", model=self, observer=observer,
+                           prop_name=prop_name, method=notification,
+                           type='signal')
 
-            self.__signal_notif[prop_name].append(pair)
+            notifications.append(pair)
         # ---------------------
 
         try: notification = getmeth("property_%s_signal_emit", 3)
@@ -563,33 +1121,23 @@ class Model (Observer):
                     seq.remove((meth, kw))
                     yield meth
 
-        for meth in side_effect(self.__value_notifications.get(prop_name, ())):
-            logger.debug("Stop calling %s.%s after assignment to %s.%s",
-                observer.__class__.__name__, meth.__name__,
-                self.__class__.__name__, prop_name)
-
-        for meth in side_effect(self.__signal_notif.get(prop_name, ())):
-            logger.debug("Stop calling %s.%s after emit on %s.%s",
-                observer.__class__.__name__, meth.__name__,
-                self.__class__.__name__, prop_name)
-
-        for meth in side_effect(
-                        self.__instance_notif_before.get(prop_name, ())):
-            logger.debug("Stop calling %s.%s before mutation of %s.%s",
-                observer.__class__.__name__, meth.__name__,
-                self.__class__.__name__, prop_name)
-
-        for meth in side_effect(
-                        self.__instance_notif_after.get(prop_name, ())):
-            logger.debug("Stop calling %s.%s after mutation of %s.%s",
-                observer.__class__.__name__, meth.__name__,
-                self.__class__.__name__, prop_name)
+        for _type, notifications in (
+                ("assign", self.__value_notifications),
+                ("signal", self.__signal_notif),
+                ("before", self.__instance_notif_before),
+                ("after", self.__instance_notif_after)):
+            for meth in side_effect(notifications.get(prop_name, ())):
+                if hooks.enabled:
+                    hooks.emit("unregister", model=self, observer=observer,
+                               prop_name=prop_name, method=meth, type=_type)
 
     def __notify_observer__(self, observer, method, *args, **kwargs):
         """This can be overridden by derived class in order to call
         the method in a different manner (for example, in
         multithreading, or a rpc, etc.)  This implementation simply
         calls the given method with the given arguments"""
+        if hooks.enabled:
+            hooks.emit("notify", model=self, observer=observer, method=method)
         return method(*args, **kwargs)
 
     def __before_property_value_change__(self, prop_name):
@@ -606,7 +1154,8 @@ class Model (Observer):
 
         return tuple((self, name, getattr(self, name))
                      for name in self._get_logical_deps(prop_name)
-                     if name not in self._notify_stack)
+                     if name not in self._notify_stack) + \
+            self.__get_path_olds(prop_name)
 
     def _get_logical_deps(self, prop_name):
         """Returns an iterator over a sequence of property names,
@@ -636,7 +1185,11 @@ class Model (Observer):
         __before_property_value_change__. All this procedure is done
         by the setter's code which is generated by the metaclass."""
         for model, name, val in old_vals:
-            model.notify_property_value_change(name, val, getattr(model, name))
+            if isinstance(val, _PathChange):
+                model._path_changed(name, val)
+            else:
+                model.notify_property_value_change(name, val,
+                                                   getattr(model, name))
 
     # -------------------------------------------------------------
     #            Notifiers:
@@ -648,9 +1201,19 @@ class Model (Observer):
 
         *old* the value before the change occured.
         """
+        if hooks.enabled:
+            hooks.emit("property_set", model=self, prop_name=prop_name,
+                       old=old, new=new)
+
+        for collection in self.__collections or ():
+            collection._notify_member(self, 'assign', prop_name,
+                                      old=old, new=new)
 
-        assert prop_name in self.__value_notifications
-        for method, kw in self.__value_notifications[prop_name] :
+        if self.__value_notifications is None:
+            return  # not observed yet
+
+        changed = None  # computed once, only if needed
+        for method, kw in self.__value_notifications.get(prop_name, ()) :
             obs = method.__self__
             # spuriousness (ticket:38) is checked here
             if kw and "spurious" in kw:
@@ -658,8 +1221,11 @@ class Model (Observer):
             else:
                 spurious = obs.accepts_spurious_change()
 
+            if not spurious and changed is None:
+                changed = self.__get_change_detector(prop_name)(old, new)
+
             # notification occurs checking spuriousness of the observer
-            if old != new or spurious:
+            if spurious or changed:
                 if kw is None:  # old style call without name
                     self.__notify_observer__(obs, method,
                                              self, old, new)
@@ -677,17 +1243,37 @@ class Model (Observer):
                     self.__notify_observer__(obs, method,
                                              self, prop_name, info)
 
+    def __get_change_detector(self, prop_name):
+        """Returns the function detecting changes of the given
+        property, as declared in __observables__"""
+        return getattr(self, metaclasses.CHANGE_DETECTORS_MAP_NAME,
+                       {}).get(prop_name,
+                               metaclasses.DEFAULT_CHANGE_DETECTOR)
+
     def notify_method_before_change(self, prop_name, instance, meth_name,
-                                    args, kwargs):
+                                    args, kwargs, **extra):
         """
         Send a notification to all registered observers.
 
         *instance* the object stored in the property.
 
         *meth_name* name of the method we are about to call on *instance*.
+
+        *extra* keyword arguments are added to the :class:`NTInfo` passed
+        to new style notifications, like *region* for NumPy arrays.
         """
-        assert prop_name in self.__instance_notif_before
-        for method, kw in self.__instance_notif_before[prop_name]:
+        for collection in self.__collections or ():
+            collection._notify_member(self, 'before', prop_name,
+                                      instance=instance, method_name=meth_name,
+                                      args=args, kwargs=kwargs, **extra)
+
+        if self.__paths is not None and prop_name in self.__paths.links:
+            self.__paths.olds[prop_name] = self.__get_path_olds(prop_name)
+
+        if self.__instance_notif_before is None:
+            return  # not observed yet
+
+        for method, kw in self.__instance_notif_before.get(prop_name, ()):
             obs = method.__self__
             # notifies the change
             if kw is None:  # old style call without name
@@ -707,21 +1293,45 @@ class Model (Observer):
                               kw,
                               model=self, prop_name=prop_name,
                               instance=instance, method_name=meth_name,
-                              args=args, kwargs=kwargs)
+                              args=args, kwargs=kwargs, **extra)
                 self.__notify_observer__(obs, method,
                                          self, prop_name, info)
 
     def notify_method_after_change(self, prop_name, instance, meth_name,
-                                   res, args, kwargs):
+                                   res, args, kwargs, **extra):
         """
         Send a notification to all registered observers.
 
         *args* the arguments we just passed to *meth_name*.
 
         *res* the return value of the method call.
+
+        *extra* as in :meth:`notify_method_before_change`.
         """
-        assert prop_name in self.__instance_notif_after
-        for method, kw in self.__instance_notif_after[prop_name]:
+        if hooks.enabled:
+            hooks.emit("wrapper_mutation", model=self, prop_name=prop_name,
+                       instance=instance, method_name=meth_name,
+                       args=args, kwargs=kwargs)
+
+        self._property_changed(prop_name,
+                               None if self.__dirty is None else
+                               self.__get_changed_keys(instance, meth_name,
+                                                       args, kwargs, extra))
+
+        for collection in self.__collections or ():
+            collection._notify_member(self, 'after', prop_name,
+                                      instance=instance, method_name=meth_name,
+                                      result=res, args=args, kwargs=kwargs,
+                                      **extra)
+
+        if self.__paths is not None:
+            for model, name, change in self.__paths.olds.pop(prop_name, ()):
+                model._path_changed(name, change)
+
+        if self.__instance_notif_after is None:
+            return  # not observed yet
+
+        for method, kw in self.__instance_notif_after.get(prop_name, ()):
             obs = method.__self__
             # notifies the change
             if kw is None:  # old style call without name
@@ -741,7 +1351,8 @@ class Model (Observer):
                               kw,
                               model=self, prop_name=prop_name,
                               instance=instance, method_name=meth_name,
-                              result=res, args=args, kwargs=kwargs)
+                              result=res, args=args, kwargs=kwargs,
+                              **extra)
                 self.__notify_observer__(obs, method,
                                          self, prop_name, info)
 
@@ -754,8 +1365,17 @@ class Model (Observer):
 
         *arg* one arbitrary argument passed to observing methods.
         """
-        assert prop_name in self.__signal_notif
-        for method, kw in self.__signal_notif[prop_name]:
+        if hooks.enabled:
+            hooks.emit("signal_emit", model=self, prop_name=prop_name,
+                       arg=arg)
+
+        for collection in self.__collections or ():
+            collection._notify_member(self, 'signal', prop_name, arg=arg)
+
+        if self.__signal_notif is None:
+            return  # not observed yet
+
+        for method, kw in self.__signal_notif.get(prop_name, ()):
             obs = method.__self__
             # notifies the signal emit
             if kw is None:  # old style call, without name
@@ -776,8 +1396,23 @@ class Model (Observer):
                                          self, prop_name, info)
 
     def __get_prop_value(self, name):
-        """Returns the property value, given its name."""
-        return getattr(self, "_prop_%s" % name, None)
+        """Returns the property value, given its name. Container
+        defaults which self has not accessed yet are returned
+        without creating the copy for self."""
+        varname = "_prop_%s" % name
+        try: return vars(self)[varname]
+        except KeyError: pass
+
+        val = getattr(type(self), varname, None)
+        if isinstance(val, types.MemberDescriptorType):
+            # compact storage
+            try: return val.__get__(self)
+            except AttributeError:
+                val = getattr(self, metaclasses.COMPACT_DEFAULTS_MAP_NAME)[
+                    varname]
+                if isinstance(val, ObsContainerDefault):
+                    return val.template
+        return val
 
 
 # ----------------------------------------------------------------------
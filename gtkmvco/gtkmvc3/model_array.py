@@ -0,0 +1,485 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+import array
+import numbers
+import operator
+import weakref
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # columns are stored with module array
+
+from gtkmvc3.observer import NTInfo
+from gtkmvc3.support import metaclasses
+from gtkmvc3.support.wrappers import ObsWrapperBase, ObsContainerDefault
+
+
+# kinds of columns holding numbers: type of the values, its name in
+# messages, typecode for module array, numpy dtype, numpy dtype kinds
+# accepted by bulk assignments. Other values are stored in lists.
+_NUMBER_KINDS = ((bool, "bool", "B", "bool", "b"),
+                 (numbers.Integral, "int", "q", "int64", "biu"),
+                 (numbers.Real, "float", "d", "float64", "biuf"))
+
+
+# ----------------------------------------------------------------------
+class _Column (object):
+    """Values of a concrete property for all the rows of a
+    ModelArray"""
+
+    def __init__(self, prop_name, default, size):
+        self.prop_name = prop_name
+
+        for kind, kind_name, typecode, dtype, dtype_kinds in _NUMBER_KINDS:
+            if isinstance(default, kind): break
+        else: kind = kind_name = typecode = dtype = dtype_kinds = None
+
+        self.kind = kind
+        self.kind_name = kind_name
+        self.typecode = typecode
+        self.dtype_kinds = dtype_kinds
+
+        if kind is None:
+            self.data = [default] * size
+            self.get = self.data.__getitem__
+        elif numpy is not None:
+            self.data = numpy.full(size, default, dtype=dtype)
+            self.get = self.data.item  # returns python numbers
+        else:
+            self.data = array.array(typecode, [default]) * size
+            if kind is bool:
+                self.get = lambda index: bool(self.data[index])
+            else: self.get = self.data.__getitem__
+
+    def check(self, value):
+        """Raises TypeError if value cannot be stored"""
+        if isinstance(value, ObsWrapperBase):
+            raise TypeError("Property '%s' of a ModelArray cannot hold "
+                            "observable values" % self.prop_name)
+        if self.kind is not None and not isinstance(value, self.kind):
+            raise TypeError("Property '%s' of a ModelArray holds values of "
+                            "type %s, not %s" % (self.prop_name,
+                                                 self.kind_name,
+                                                 type(value).__name__))
+
+    def set(self, index, value):
+        self.check(value)
+        self.data[index] = value
+
+    def assign(self, key, indices, values, each):
+        """Assigns values to the rows selected by key, which are
+        given by indices as well. If each is False, values is a
+        single value for all rows."""
+        if isinstance(self.data, list) or numpy is None:
+            if not each:
+                self.check(values)
+                values = [values] * len(indices)
+            else:
+                values = list(values)
+                if len(values) != len(indices):
+                    raise ValueError("%d values given for %d rows" %
+                                     (len(values), len(indices)))
+                for value in values: self.check(value)
+
+            if isinstance(key, slice):
+                if self.typecode is not None:
+                    values = array.array(self.typecode, values)
+                self.data[key] = values
+            else:
+                for index, value in zip(indices, values):
+                    self.data[index] = value
+            return
+
+        values = numpy.asarray(values)
+        if values.dtype.kind not in self.dtype_kinds:
+            raise TypeError("Property '%s' of a ModelArray holds values of "
+                            "type %s, not %s" % (self.prop_name,
+                                                 self.kind_name,
+                                                 values.dtype))
+        if each and values.shape != (len(indices),):
+            raise ValueError("%d values given for %d rows" %
+                             (values.size, len(indices)))
+        self.data[key] = values
+
+    def values(self, key, indices):
+        """Returns the list of the values of the rows selected by
+        key, which are given by indices as well"""
+        if numpy is not None and not isinstance(self.data, list):
+            return self.data[key].tolist()
+        if isinstance(key, slice) and isinstance(self.data, list):
+            return self.data[key]
+        return [self.get(index) for index in indices]
+
+
+# ----------------------------------------------------------------------
+class _ColumnVar (object):
+    """Takes the place of the variable holding the value of a
+    concrete property in row proxies, reading and writing the
+    column instead"""
+
+    def __init__(self, prop_name):
+        self.prop_name = prop_name
+
+    def __get__(self, row, cls=None):
+        if row is None:
+            return self
+        return row._row_array._columns[self.prop_name].get(row._row_index)
+
+    def __set__(self, row, value):
+        row._row_array._columns[self.prop_name].set(row._row_index, value)
+
+
+# ----------------------------------------------------------------------
+class _Row (object):
+    """Base class of the row proxies, which are instances of classes
+    derived from the model class as well"""
+
+    def register_observer(self, observer):
+        super(_Row, self).register_observer(observer)
+        self._row_array._row_observed(self)
+
+    def unregister_observer(self, observer):
+        super(_Row, self).unregister_observer(observer)
+        self._row_array._row_observed(self)
+
+    def notify_property_value_change(self, prop_name, old, new):
+        super(_Row, self).notify_property_value_change(prop_name, old, new)
+        self._row_array._row_changed(self, prop_name, old, new)
+
+    def clone(self, deep=False):
+        # clones are models of the original class, holding copies
+        return self._Model__clone(self._row_model_class, deep, {}, {})
+
+    def __repr__(self):
+        return "<%s row %d>" % (self._row_model_class.__name__,
+                                self._row_index)
+
+
+# ----------------------------------------------------------------------
+class ModelArray (object):
+    """
+    Holds *size* models of class *model_class*, storing each concrete
+    observable property in a column: a NumPy array if NumPy is
+    available and the property holds booleans, integers or floats, an
+    :class:`array.array` without NumPy, and a list for other
+    values. The default value of each property decides the kind of
+    its column. Properties holding lists, maps, sets, signals or other
+    observable values are not supported.
+
+    Indexing returns a row proxy, which is an instance of a class
+    derived from *model_class*. Proxies can be read, assigned and
+    observed like any model. Proxies are created when needed, and only
+    observed proxies are kept by the array. The constructor of
+    *model_class* is not called for proxies, and attributes other
+    than concrete observable properties are not kept when proxies are
+    released.
+
+    Use :meth:`assign` and :meth:`assign_each` to change a property of
+    many rows at once. Observers registered with the array itself
+    are notified once for all the rows changed together.
+    """
+
+    # row classes, by model class
+    __row_classes = {}
+
+    def __init__(self, model_class, size):
+        self.__row_class = ModelArray.__get_row_class(model_class)
+        self.__size = size
+        self._columns = dict((name, _Column(name, default, size))
+                             for name, default
+                             in self.__row_class._row_defaults)
+
+        self.__rows = weakref.WeakValueDictionary()
+        self.__observed = {}  # observed rows, by index
+
+        # observers of the whole array, and their methods by property
+        self.__observers = []
+        self.__notifications = {}
+        self.__batch = None  # changes collected by __assign
+
+    @classmethod
+    def __get_row_class(cls, model_class):
+        """Returns the class of the proxies of the rows of the given
+        model class"""
+        res = cls.__row_classes.get(model_class)
+        if res is not None:
+            return res
+
+        proto = model_class.__new__(model_class)
+        proto._init_clone()
+        defaults = []
+        _dict = {"__observables__" : (), "_row_model_class" : model_class}
+        for name in sorted(proto.get_properties()):
+            if not isinstance(getattr(model_class, name, None),
+                              metaclasses.PropertyMeta.ConcreteOP):
+                continue
+            default = getattr(proto, name)
+            if isinstance(default, (ObsWrapperBase, ObsContainerDefault)):
+                raise TypeError("Property '%s' of %s cannot be stored by a "
+                                "ModelArray" % (name, model_class.__name__))
+            defaults.append((name, default))
+            _dict[metaclasses.PROP_NAME % {'prop_name' : name}] = \
+                _ColumnVar(name)
+        _dict["_row_defaults"] = tuple(defaults)
+
+        res = type(model_class)(model_class.__name__, (_Row, model_class),
+                                _dict)
+        cls.__row_classes[model_class] = res
+        return res
+
+    def __len__(self):
+        return self.__size
+
+    def __iter__(self):
+        for index in range(self.__size):
+            yield self[index]
+
+    def __getitem__(self, index):
+        index = range(self.__size)[index]  # checks and normalizes
+        row = self.__rows.get(index)
+        if row is None:
+            row = self.__new_row(index)
+            self.__rows[index] = row
+        return row
+
+    def __new_row(self, index):
+        row = self.__row_class.__new__(self.__row_class)
+        row._row_array = self
+        row._row_index = index
+        row._init_clone()
+        return row
+
+    def column(self, prop_name):
+        """
+        Return the storage of the given property. Changes made
+        directly to it are not notified.
+        """
+        return self.__get_column(prop_name).data
+
+    def assign(self, prop_name, value, rows=None):
+        """
+        Assign *value* to property *prop_name* of the given *rows*,
+        which can be a slice, a sequence of indices or (with NumPy) an
+        array of booleans. All rows are changed if *rows* is None.
+
+        Observers of single rows are notified like for an assignment
+        to the row. Each observer of the array (see
+        :meth:`register_observer`) is notified once for all of
+        them. *info* has key ``rows`` holding the indices of the rows
+        which were changed, and keys ``old`` and ``new`` holding lists
+        of their values. The model passed to the notification is the
+        array.
+        """
+        self.__assign(prop_name, value, rows, False)
+
+    def assign_each(self, prop_name, values, rows=None):
+        """
+        Like :meth:`assign`, but assign each value of sequence *values*
+        to the corresponding row.
+        """
+        self.__assign(prop_name, values, rows, True)
+
+    def register_observer(self, observer):
+        """
+        Register *observer* as an observer of all the rows. Its
+        methods declared with :meth:`Observer.observe` and keyword
+        ``assign`` are notified of the changes of the rows, with
+        *info* like for :meth:`assign`. Other kinds of notification,
+        and methods named after the properties, are ignored.
+        """
+        if observer in self.__observers: return
+        self.__observers.append(observer)
+        for name in getattr(self.__row_class, metaclasses.ALL_OBS_SET):
+            for method in observer.get_observing_methods(name):
+                kw = observer.get_observing_method_kwargs(name, method)
+                if 'assign' in kw:
+                    self.__notifications.setdefault(name, []).append(
+                        (method, kw))
+
+    def unregister_observer(self, observer):
+        """Unregister *observer* registered with
+        :meth:`register_observer`"""
+        if observer not in self.__observers: return
+        self.__observers.remove(observer)
+        for name, notifications in list(self.__notifications.items()):
+            notifications[:] = [pair for pair in notifications
+                                if pair[0].__self__ is not observer]
+            if not notifications:
+                del self.__notifications[name]
+
+    def _row_changed(self, row, prop_name, old, new):
+        """Called by rows when they notify the change of a property"""
+        if prop_name not in self.__notifications:
+            return
+        if self.__batch is not None:
+            changes = self.__batch.setdefault(prop_name, ([], [], []))
+            changes[0].append(row._row_index)
+            changes[1].append(old)
+            changes[2].append(new)
+            return
+        for method, kw in self.__notifications[prop_name]:
+            self.__notify_batch(method, kw, prop_name,
+                                ([row._row_index], [old], [new]))
+
+    def _row_observed(self, row):
+        """Called by rows when they gain or lose observers"""
+        if row._has_observer():
+            self.__observed[row._row_index] = row
+        else:
+            self.__observed.pop(row._row_index, None)
+
+    def __get_column(self, prop_name):
+        try: return self._columns[prop_name]
+        except KeyError:
+            raise ValueError("Model %s has no concrete observable "
+                             "property '%s'" %
+                             (self.__row_class.__name__, prop_name))
+
+    def __get_selection(self, rows):
+        """Returns a key for the columns selecting rows, and the
+        selected indices"""
+        whole = range(self.__size)
+        if rows is None:
+            return slice(None), whole
+        if isinstance(rows, slice):
+            return rows, whole[rows]
+        if (numpy is not None and isinstance(rows, numpy.ndarray) and
+            rows.dtype.kind == "b"):
+            if rows.shape != (self.__size,):
+                raise ValueError("Mask of %d rows given for %d rows" %
+                                 (rows.size, self.__size))
+            indices = numpy.flatnonzero(rows).tolist()
+        else:
+            indices = [whole[operator.index(index)] for index in rows]
+        return indices, indices
+
+    def __assign(self, prop_name, values, rows, each):
+        column = self.__get_column(prop_name)
+        key, indices = self.__get_selection(rows)
+
+        # only live proxies are told as for a single assignment, as
+        # they may have versions, observers or collections. The
+        # observers of the array are told from the columns, without
+        # creating proxies.
+        if len(self.__rows) < len(indices):
+            selected = (indices if isinstance(indices, range)
+                        else set(indices))
+            targets = [row for index, row in sorted(self.__rows.items())
+                       if index in selected]
+        else:
+            rows = self.__rows
+            targets = [row for row in map(rows.get, indices)
+                       if row is not None]
+
+        olds = [(row, column.get(row._row_index),
+                 row.__before_property_value_change__(prop_name)
+                 if row._has_observer() else ())
+                for row in targets]
+        names = [name for name in self.__get_names(prop_name)
+                 if name in self.__notifications]
+        before = self.__get_values(names, key, indices)
+
+        column.assign(key, indices, values, each)
+
+        # changes notified by the proxies, also of other rows when
+        # assigning from their notifications, are collected for the
+        # observers of the array, which are notified once per method.
+        # Changes are lists of indices, old values and new values.
+        outer = self.__batch  # when assigning from a notification
+        batch = self.__batch = {}
+        try:
+            for row, old, dep_olds in olds:
+                row._property_changed(prop_name)
+                row.notify_property_value_change(prop_name, old,
+                                                 column.get(row._row_index))
+                row.__after_property_value_change__(prop_name, dep_olds)
+        finally:
+            self.__batch = outer
+
+        if names:
+            after = self.__get_values(names, key, indices)
+            selected = set(indices) if batch else ()
+            for name in names:
+                # the selected rows are taken from the columns
+                changes = (list(indices), before[name], after[name])
+                for change in zip(*batch.pop(name, ((), (), ()))):
+                    if change[0] not in selected:
+                        for values, value in zip(changes, change):
+                            values.append(value)
+                batch[name] = changes
+
+        for name, changes in sorted(batch.items()):
+            for method, kw in self.__notifications.get(name, ()):
+                self.__notify_batch(method, kw, name, changes)
+
+    def __get_values(self, names, key, indices):
+        """Returns the values of the given properties for the rows
+        selected by key, which are given by indices as well, as a
+        map of lists"""
+        res = {}
+        scratch = None  # a proxy for logical properties, not kept
+        for name in names:
+            if name in self._columns:
+                res[name] = self._columns[name].values(key, indices)
+                continue
+            if scratch is None: scratch = self.__new_row(0)
+            values = res[name] = []
+            for index in indices:
+                scratch._row_index = index
+                values.append(getattr(scratch, name))
+        return res
+
+    def __get_names(self, prop_name):
+        """Returns the given property and the logical properties
+        depending on it"""
+        if not self.__size:
+            return (prop_name,)
+        return (prop_name,) + tuple(self[0]._get_logical_deps(prop_name))
+
+    def __notify_batch(self, method, kw, prop_name, changes):
+        obs = method.__self__
+        if "spurious" in kw:
+            spurious = kw['spurious']
+        else:
+            spurious = obs.accepts_spurious_change()
+
+        if not spurious:
+            detector = getattr(self.__row_class,
+                               metaclasses.CHANGE_DETECTORS_MAP_NAME,
+                               {}).get(prop_name,
+                                       metaclasses.DEFAULT_CHANGE_DETECTOR)
+            changed = list(map(detector, changes[1], changes[2]))
+            if not all(changed):
+                changes = tuple([value for value, keep in zip(values, changed)
+                                 if keep] for values in changes)
+            if not changes[0]:
+                return
+
+        # a row, in case it dispatches differently
+        notifier = self[changes[0][0]]
+        info = NTInfo('assign', kw, model=self, prop_name=prop_name,
+                      old=changes[1], new=changes[2], rows=changes[0])
+        notifier.__notify_observer__(obs, method, self, prop_name, info)
@@ -0,0 +1,163 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+from gtkmvc3.model import Model
+from gtkmvc3.observable import Signal
+from gtkmvc3.observer import NTInfo
+from gtkmvc3.support import metaclasses
+
+
+class ModelCollection (Model):
+    """
+    A set of models observed as a whole. Observers of the collection
+    are notified about changes of any member, without registering
+    with each member. Notifications about members use names made of
+    the name of the class of the member and the name of the property,
+    like ``Row.price``, so observers use patterns like ``*.price``: ::
+
+     class Totals (Observer):
+         @Observer.observe("*.price", assign=True)
+         def price_changed(self, collection, name, info):
+             print(info.member, info.old, info.new)
+
+    All types of notification are available, and *info* has key
+    ``member`` holding the member which changed. Old style
+    notifications (``property_<name>_value_change`` etc.) are not
+    available for members.
+
+    Members are added to and removed from the collection in constant
+    time. Signals ``added`` and ``removed`` are emitted with the
+    member as argument.
+
+    *members* is an iterable of models to be added.
+    """
+
+    added = None
+    removed = None
+    __observables__ = ("added", "removed")
+
+    def __init__(self, members=()):
+        Model.__init__(self)
+        self.added = Signal()
+        self.removed = Signal()
+
+        self.__members = {}  # used as an ordered set
+        self.__member_observers = []
+
+        # (class of member, property name, type of notification) -->
+        # list of pairs (method, kwargs), filled as notifications occur
+        self.__member_notifications = {}
+
+        for member in members: self.add(member)
+
+    def __len__(self):
+        return len(self.__members)
+
+    def __iter__(self):
+        return iter(self.__members)
+
+    def __contains__(self, member):
+        return member in self.__members
+
+    def add(self, member):
+        """
+        Add the given model, if it is not a member already.
+        """
+        if member in self.__members: return
+        self.__members[member] = None
+        member._add_collection(self)
+        self.added.emit(member)
+
+    def remove(self, member):
+        """
+        Remove the given member. Raises :exc:`ValueError` if it is not a
+        member.
+        """
+        try: del self.__members[member]
+        except KeyError:
+            raise ValueError("%s is not a member of the collection" %
+                             member)
+        member._remove_collection(self)
+        self.removed.emit(member)
+
+    def register_observer(self, observer):
+        Model.register_observer(self, observer)
+        if observer not in self.__member_observers:
+            self.__member_observers.append(observer)
+            self.__member_notifications.clear()
+
+    def unregister_observer(self, observer):
+        Model.unregister_observer(self, observer)
+        if observer in self.__member_observers:
+            self.__member_observers.remove(observer)
+            self.__member_notifications.clear()
+
+    def __get_member_notifications(self, cls, prop_name, _type):
+        """Returns the pairs (method, kwargs) to be called when the
+        given type of notification occurs in a member of the given
+        class"""
+        key = (cls, prop_name, _type)
+        res = self.__member_notifications.get(key)
+        if res is None:
+            name = "%s.%s" % (cls.__name__, prop_name)
+            res = []
+            for observer in self.__member_observers:
+                for method in observer.get_observing_methods(name):
+                    kw = observer.get_observing_method_kwargs(name, method)
+                    if kw.get(_type) and 'old_style_call' not in kw:
+                        res.append((method, kw))
+            self.__member_notifications[key] = res
+        return res
+
+    def _notify_member(self, member, _type, prop_name, **kwargs):
+        """Called by members to notify the observers of self"""
+        if not self.__member_observers: return
+
+        notifications = self.__get_member_notifications(type(member),
+                                                        prop_name, _type)
+        if not notifications: return
+
+        name = "%s.%s" % (type(member).__name__, prop_name)
+        changed = None  # computed once, only if needed
+        for method, kw in notifications:
+            obs = method.__self__
+            if _type == 'assign':
+                # spuriousness is checked as by models
+                if "spurious" in kw:
+                    spurious = kw['spurious']
+                else:
+                    spurious = obs.accepts_spurious_change()
+
+                if not spurious and changed is None:
+                    detector = getattr(
+                        member, metaclasses.CHANGE_DETECTORS_MAP_NAME,
+                        {}).get(prop_name,
+                                metaclasses.DEFAULT_CHANGE_DETECTOR)
+                    changed = detector(kwargs['old'], kwargs['new'])
+                if not (spurious or changed):
+                    continue
+
+            info = NTInfo(_type, kw, model=self, prop_name=name,
+                          member=member, **kwargs)
+            self.__notify_observer__(obs, method, self, name, info)
@@ -25,6 +25,7 @@
 
 from gtkmvc3.model import Model
 from gtkmvc3.support import metaclasses
+from gtkmvc3.support import hooks
 from gtkmvc3.support.porting import with_metaclass, add_metaclass
 
 try: import threading as _threading
@@ -46,11 +47,17 @@ class ModelMT (Model):
     used. In this model, the observer is expected to run in the gtk
     main loop thread."""
 
+    # instance attributes stored in slots by compact models
+    __compact_slots__ = ("_ModelMT__observer_threads", "_prop_lock")
+
     def __init__(self):
         Model.__init__(self)
         self.__observer_threads = {}
         self._prop_lock = _threading.Lock()
 
+    def _init_clone(self):
+        ModelMT.__init__(self)
+
     def register_observer(self, observer):
         Model.register_observer(self, observer)
         self.__observer_threads[observer] = _threading.currentThread()
@@ -76,6 +83,8 @@ class ModelMT (Model):
         GLib.idle_add(self.__idle_callback, observer, method, args, kwargs)
 
     def __idle_callback(self, observer, method, args, kwargs):
+        if hooks.enabled:
+            hooks.emit("notify", model=self, observer=observer, method=method)
         method(*args, **kwargs)
         return False
 
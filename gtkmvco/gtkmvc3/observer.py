@@ -304,13 +304,33 @@ class Observer (object):
         self.__METH_TO_PAT = {}  # method --> pattern
         self.__PAT_METH_TO_KWARGS = {}  # (pattern, method) --> info
 
+        for name, pname, ka in type(self).__get_declared_notifications():
+            # WARNING! Here we store the top-level method in the
+            # mro, not the (unbound) method which has been
+            # declared by the user with the decorator.
+            _method = getattr(self, name)  # the most top avail method
+            self.__register_notification(pname, _method, ka)
+
+        if model is not None:
+            self.observe_model(model)
+
+    @classmethod
+    def __get_declared_notifications(cls):
+        """Returns the list of triples (method name, property name,
+        kwargs) declared with the decorator in the class and its
+        bases. This depends only on the class, so it is calculated
+        once."""
+        if "_Observer__declared_notifications" in cls.__dict__:
+            return cls._Observer__declared_notifications
+
+        res = []
         processed_props = set()  # tracks already processed properties
 
         # searches all custom observer methods
-        for cls in inspect.getmro(type(self)):
+        for klass in inspect.getmro(cls):
             # list of (method-name, method-object, list of (prop-name, kwargs))
             meths = [(name, meth, getattr(meth, Observer._CUST_OBS_))
-                     for name, meth in cls.__dict__.items()
+                     for name, meth in klass.__dict__.items()
                      if (inspect.isfunction(meth) and
                          hasattr(meth, Observer._CUST_OBS_))]
 
@@ -321,21 +341,16 @@ class Observer (object):
             # since this is traversed top-bottom in the mro, the
             # first found match is the one to care
             for name, meth, pnames_ka in meths:
-                _method = getattr(self, name)  # the most top avail method
-
-                # WARNING! Here we store the top-level method in the
-                # mro, not the (unbound) method which has been
-                # declared by the user with the decorator.
                 for pname, ka in pnames_ka:
                     if pname not in processed_props:
-                        self.__register_notification(pname, _method, ka)
+                        res.append((name, pname, ka))
                         cls_processed_props.add(pname)
 
             # accumulates props processed in this class
             processed_props |= cls_processed_props
 
-        if model:
-            self.observe_model(model)
+        cls._Observer__declared_notifications = res
+        return res
 
     def observe_model(self, model):
         """Starts observing the given model"""
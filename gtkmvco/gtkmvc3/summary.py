@@ -0,0 +1,446 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+"""
+Aggregates over the members of a
+:class:`~gtkmvc3.model_collection.ModelCollection`, kept up to date
+from the notifications of the members. They are declared as class
+attributes of a :class:`Summary`, which makes them read-only logical
+properties: ::
+
+ class Totals (Summary):
+     amount = Sum("price")
+     rows = Count()
+     cheapest = Min("price")
+     by_status = GroupBy("status", Sum("price"))
+
+ totals = Totals(collection)
+ print(totals.amount, totals.by_status)
+
+Members not having the aggregated property, or holding None in it,
+are ignored. Sums and means of floats are exact (then rounded), so
+they do not drift as values are added and removed.
+"""
+
+import abc
+import collections
+import copy
+import math
+
+from gtkmvc3.model import Model
+from gtkmvc3.observer import Observer
+from gtkmvc3.support import metaclasses
+from gtkmvc3.support.porting import add_metaclass
+
+
+def _get_value(member, prop_name):
+    """Returns the value of the given property of member, None if
+    there is no such property, and True if prop_name is None"""
+    if prop_name is None:
+        return True
+    if prop_name in member.get_properties():
+        return getattr(member, prop_name)
+    return None
+
+
+class _ExactSum (object):
+    """Sum of numbers without rounding errors. Floats are kept as
+    non-overlapping partials, like by :func:`math.fsum`, so that
+    subtracting a value undoes adding it exactly. Other numbers are
+    summed as they are."""
+
+    def __init__(self):
+        self.__partials = []
+        self.__other = 0
+        self.__special = collections.Counter()  # infinities and nans
+
+    def add(self, value, sign=1):
+        if not isinstance(value, float):
+            self.__other += sign * value
+        elif not math.isinf(value) and not math.isnan(value):
+            self.__add_float(sign * value)
+        else:
+            self.__special[repr(value)] += sign
+
+    def __add_float(self, x):
+        partials = []
+        for y in self.__partials:
+            if abs(x) < abs(y): x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo: partials.append(lo)
+            x = hi
+        partials.append(x)
+        self.__partials = partials
+
+    def get(self):
+        special = [float(key) for key, count in self.__special.items()
+                   if count]
+        if special:
+            return sum(special)  # nan, or an infinity
+        if not self.__partials:
+            return self.__other
+        return math.fsum(self.__partials) + self.__other
+
+
+# ----------------------------------------------------------------------
+@add_metaclass(abc.ABCMeta)
+class Aggregate (object):
+    """
+    Abstract base class of aggregates over the members, depending
+    on property *prop_name* of them. Derived classes implement
+    :meth:`get_value`, :meth:`add`, :meth:`remove` and
+    :meth:`change`, and override :meth:`reset` when they have a
+    state.
+    """
+
+    def __init__(self, prop_name=None):
+        self.prop_name = prop_name
+        self.reset()
+
+    def reset(self):
+        """Forgets all members"""
+        pass
+
+    def get_props(self):
+        """Returns the set of names of the properties this depends on"""
+        return set((self.prop_name,))
+
+    @abc.abstractmethod
+    def get_value(self):
+        """Returns the aggregated value"""
+
+    @abc.abstractmethod
+    def add(self, member):
+        """Called when member is added"""
+
+    @abc.abstractmethod
+    def remove(self, member):
+        """Called when member is removed"""
+
+    @abc.abstractmethod
+    def change(self, member, prop_name, old, new):
+        """Called when property prop_name of member changed"""
+
+
+class ValueAggregate (Aggregate):
+    """
+    Abstract base class of aggregates of the values of property
+    *prop_name* alone. Derived classes implement :meth:`add_value`,
+    :meth:`remove_value` and :meth:`get_value`.
+    """
+
+    @abc.abstractmethod
+    def add_value(self, value):
+        """Called when a member holding value is added"""
+
+    @abc.abstractmethod
+    def remove_value(self, value):
+        """Called when a member holding value is removed"""
+
+    def add(self, member):
+        value = _get_value(member, self.prop_name)
+        if value is not None: self.add_value(value)
+
+    def remove(self, member):
+        value = _get_value(member, self.prop_name)
+        if value is not None: self.remove_value(value)
+
+    def change(self, member, prop_name, old, new):
+        if old is not None: self.remove_value(old)
+        if new is not None: self.add_value(new)
+
+
+class Sum (ValueAggregate):
+    """Sum of the values"""
+
+    def reset(self):
+        self.__sum = _ExactSum()
+
+    def get_value(self):
+        return self.__sum.get()
+
+    def add_value(self, value):
+        self.__sum.add(value)
+
+    def remove_value(self, value):
+        self.__sum.add(value, -1)
+
+
+class Count (ValueAggregate):
+    """Number of members, or of members having a value for
+    *prop_name* if given"""
+
+    def reset(self):
+        self.__count = 0
+
+    def get_props(self):
+        return set((self.prop_name,)) - set((None,))
+
+    def get_value(self):
+        return self.__count
+
+    def add_value(self, value):
+        self.__count += 1
+
+    def remove_value(self, value):
+        self.__count -= 1
+
+
+class Mean (ValueAggregate):
+    """Arithmetic mean of the values, None if there are none"""
+
+    def reset(self):
+        self.__sum = _ExactSum()
+        self.__count = 0
+
+    def get_value(self):
+        if not self.__count: return None
+        return self.__sum.get() / self.__count
+
+    def add_value(self, value):
+        self.__sum.add(value)
+        self.__count += 1
+
+    def remove_value(self, value):
+        self.__sum.add(value, -1)
+        self.__count -= 1
+
+
+class Min (ValueAggregate):
+    """Smallest value, None if there are none"""
+
+    # the function selecting the extreme value
+    _select = staticmethod(min)
+
+    def reset(self):
+        self.__counts = collections.Counter()
+        self.__value = None
+
+    def get_value(self):
+        return self.__value
+
+    def add_value(self, value):
+        self.__counts[value] += 1
+        if self.__value is None:
+            self.__value = value
+        else:
+            self.__value = self._select(self.__value, value)
+
+    def remove_value(self, value):
+        self.__counts[value] -= 1
+        if not self.__counts[value]:
+            del self.__counts[value]
+            if value == self.__value:
+                # the only case requiring a scan, of distinct values
+                self.__value = (self._select(self.__counts)
+                                if self.__counts else None)
+
+
+class Max (Min):
+    """Largest value, None if there are none"""
+    _select = staticmethod(max)
+
+
+class GroupBy (Aggregate):
+    """
+    Groups members by the value of property *prop_name*, and
+    calculates *aggregate* (a :class:`ValueAggregate`, by default
+    :class:`Count`) for each group. The value is a dictionary mapping
+    values of *prop_name* to values of the aggregate. Members not
+    having *prop_name* are grouped under None.
+    """
+
+    def __init__(self, prop_name, aggregate=None):
+        self.aggregate = Count() if aggregate is None else aggregate
+        Aggregate.__init__(self, prop_name)
+
+    def reset(self):
+        self.__groups = {}  # key --> [aggregate, size]
+
+    def get_props(self):
+        return set((self.prop_name,)) | self.aggregate.get_props()
+
+    def get_value(self):
+        return dict((key, group[0].get_value())
+                    for key, group in self.__groups.items())
+
+    def __add_to(self, key, value):
+        group = self.__groups.get(key)
+        if group is None:
+            aggregate = copy.copy(self.aggregate)
+            aggregate.reset()
+            group = [aggregate, 0]
+            self.__groups[key] = group
+        if value is not None: group[0].add_value(value)
+        group[1] += 1
+
+    def __remove_from(self, key, value):
+        group = self.__groups[key]
+        if value is not None: group[0].remove_value(value)
+        group[1] -= 1
+        if not group[1]: del self.__groups[key]
+
+    def add(self, member):
+        self.__add_to(_get_value(member, self.prop_name),
+                      _get_value(member, self.aggregate.prop_name))
+
+    def remove(self, member):
+        self.__remove_from(_get_value(member, self.prop_name),
+                           _get_value(member, self.aggregate.prop_name))
+
+    def change(self, member, prop_name, old, new):
+        old_key = new_key = _get_value(member, self.prop_name)
+        if prop_name == self.prop_name:
+            old_key, new_key = old, new
+        old_value = new_value = _get_value(member, self.aggregate.prop_name)
+        if prop_name == self.aggregate.prop_name:
+            old_value, new_value = old, new
+
+        self.__remove_from(old_key, old_value)
+        self.__add_to(new_key, new_value)
+
+
+# ----------------------------------------------------------------------
+class SummaryMeta (metaclasses.ObservablePropertyMeta):
+    """Turns the aggregates declared in the class into logical
+    properties"""
+
+    def __new__(mcs, name, bases, _dict):
+        aggregates = {}
+        for base in reversed(bases):
+            aggregates.update(getattr(base, "_aggregates", {}))
+
+        names = sorted(key for key, val in _dict.items()
+                       if isinstance(val, Aggregate))
+        if names:
+            aggregates.update((key, _dict[key]) for key in names)
+            _dict = dict((key, val) for key, val in _dict.items()
+                         if key not in names)
+            _dict[metaclasses.OBS_TUPLE_NAME] = (
+                tuple(_dict.get(metaclasses.OBS_TUPLE_NAME, ())) +
+                tuple(names))
+
+            # the getters are given to the metaclass in the map of the
+            # new class. Getters declared with decorators in the body
+            # wait in the map of a base, and are moved there as well,
+            # like the metaclass does after using a map.
+            getters = {}
+            for base in bases:
+                pending = getattr(base, metaclasses.LOGICAL_GETTERS_MAP_NAME,
+                                  None)
+                if pending:
+                    getters.update(pending)
+                    pending.clear()
+            getinfo = Model._Model__getinfo
+            getters.update((key, getinfo(_get_aggregate, True))
+                           for key in names)
+            _dict[metaclasses.LOGICAL_GETTERS_MAP_NAME] = getters
+
+        _dict["_aggregates"] = aggregates
+        return super(SummaryMeta, mcs).__new__(mcs, name, bases, _dict)
+
+
+def _get_aggregate(self, name):
+    return self._get_aggregate_value(name)
+
+
+@add_metaclass(SummaryMeta)
+class Summary (Model):
+    """
+    A model whose logical properties are the aggregates declared as
+    class attributes, calculated over the members of *collection*
+    and updated at each change of the members.
+    """
+
+    def __init__(self, collection):
+        Model.__init__(self)
+
+        self.__aggregates = {}
+        self.__by_prop = {}  # property name --> names of aggregates
+        for name, aggregate in self._aggregates.items():
+            aggregate = copy.copy(aggregate)
+            aggregate.reset()
+            self.__aggregates[name] = aggregate
+            for prop_name in aggregate.get_props():
+                self.__by_prop.setdefault(prop_name, []).append(name)
+
+        # member --> values of the properties it was aggregated with
+        self.__values = {}
+        self.__collection = collection
+        for member in collection:
+            self.__remember(member)
+            for aggregate in self.__aggregates.values():
+                aggregate.add(member)
+        self.observe_model(collection)
+
+    def _get_aggregate_value(self, name):
+        return self.__aggregates[name].get_value()
+
+    def __remember(self, member):
+        self.__values[member] = dict(
+            (prop_name, _get_value(member, prop_name))
+            for prop_name in self.__by_prop if prop_name is not None)
+
+    def __update(self, names, meth_name, *args):
+        """Calls the given method of each named aggregate, and
+        notifies the changes"""
+        for name in names:
+            aggregate = self.__aggregates[name]
+            old = aggregate.get_value()
+            old_vals = self.__before_property_value_change__(name)
+            getattr(aggregate, meth_name)(*args)
+            new = aggregate.get_value()
+            if old != new:
+                self._property_changed(name)
+                self.notify_property_value_change(name, old, new)
+                self.__after_property_value_change__(name, old_vals)
+
+    @Observer.observe("added", signal=True)
+    def _member_added(self, model, name, info):
+        if model is self.__collection:
+            self.__remember(info.arg)
+            self.__update(self.__aggregates, "add", info.arg)
+
+    @Observer.observe("removed", signal=True)
+    def _member_removed(self, model, name, info):
+        if model is self.__collection:
+            self.__update(self.__aggregates, "remove", info.arg)
+            del self.__values[info.arg]
+
+    # change detectors of the members may hide changes: aggregates
+    # are kept in sync with the assigned values instead
+    @Observer.observe("*", assign=True, spurious=True)
+    def _member_changed(self, model, name, info):
+        if model is not self.__collection or "member" not in info:
+            return
+        prop_name = name.partition(".")[2]
+        names = self.__by_prop.get(prop_name)
+        if not names: return
+        values = self.__values[info.member]
+        old = values[prop_name]
+        if not metaclasses.DEFAULT_CHANGE_DETECTOR(old, info.new):
+            return
+        values[prop_name] = info.new
+        self.__update(names, "change", info.member, prop_name, old, info.new)
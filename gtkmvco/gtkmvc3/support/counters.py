@@ -0,0 +1,194 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+
+"""
+Counters of the accesses to observable properties. When enabled, the
+reads and writes of each property of each model class are counted,
+as well as the spurious writes (assigning a value which the change
+detector of the property does not tell apart from the current one,
+see :attr:`~gtkmvc3.model.Model.__observables__`) and the mutations
+of the containers held by properties. ::
+
+ from gtkmvc3.support import counters
+
+ counters.enable()
+ ...
+ counters.disable()
+ counters.report(limit=10, sort_by="writes")
+
+Enabling replaces the accessors of the properties of the existing
+model classes, and of those created while enabled, with counting
+ones. Disabling puts back the generated accessors, so that nothing
+is counted and nothing is spent when disabled. Classes do not need
+to be created again.
+"""
+
+import collections
+import sys
+import weakref
+
+from gtkmvc3.support import hooks
+from gtkmvc3.support import metaclasses
+
+# the counts, keyed by (model class, property name)
+_reads = collections.Counter()
+_writes = collections.Counter()
+_spurious = collections.Counter()
+_mutations = collections.Counter()
+
+# class --> {property name: original property}, while enabled
+_originals = weakref.WeakKeyDictionary()
+_enabled = False
+
+_KINDS = ("reads", "writes", "spurious", "mutations")
+
+
+def _make_getter(name, fget):
+    def _getter(self, *args):
+        _reads[(type(self), name)] += 1
+        return fget(self, *args)
+    return _getter
+
+
+def _make_setter(name, fget, fset):
+    varname = metaclasses.PROP_NAME % {'prop_name' : name}
+    def _setter(self, val):
+        key = (type(self), name)
+        _writes[key] += 1
+        # the variable is read like by the setter, the getter may
+        # have side effects
+        try: old = getattr(self, varname)
+        except AttributeError:
+            # logical properties and properties with user accessors
+            # have no variable, and a slot may be unset
+            if varname in getattr(self, metaclasses.COMPACT_DEFAULTS_MAP_NAME,
+                                  ()):
+                old = metaclasses._compact_default(self, varname)
+            elif fget is not None: old = fget(self)
+            else: return fset(self, val)
+        detector = getattr(self, metaclasses.CHANGE_DETECTORS_MAP_NAME,
+                           {}).get(name, metaclasses.DEFAULT_CHANGE_DETECTOR)
+        if not detector(old, val):
+            _spurious[key] += 1
+        return fset(self, val)
+    return _setter
+
+
+def _instrument(cls):
+    """Replaces the properties declared by cls with counting ones"""
+    if cls in _originals: return
+    originals = {}
+    for name, prop in list(cls.__dict__.items()):
+        if isinstance(prop, metaclasses.PropertyMeta.LogicalOP):
+            new = metaclasses.PropertyMeta.LogicalOP(
+                _make_getter(name, prop.fget),
+                prop.fset and _make_setter(name, prop.fget, prop.fset),
+                prop.deps)
+        elif isinstance(prop, metaclasses.PropertyMeta.ConcreteOP):
+            new = metaclasses.PropertyMeta.ConcreteOP(
+                _make_getter(name, prop.fget),
+                prop.fset and _make_setter(name, prop.fget, prop.fset))
+        else: continue
+        originals[name] = prop
+        type.__setattr__(cls, name, new)
+    _originals[cls] = originals
+
+
+def _count_mutation(event, model=None, prop_name=None, **details):
+    if event == "wrapper_mutation":
+        _mutations[(type(model), prop_name)] += 1
+
+
+def is_enabled():
+    """Returns True if counting is enabled"""
+    return _enabled
+
+
+def enable():
+    """Starts counting. The counts taken before are kept, see
+    :func:`reset`."""
+    global _enabled
+    if _enabled: return
+    _enabled = True
+    for cls in list(metaclasses.CLASSES):
+        _instrument(cls)
+    metaclasses.CLASS_HOOKS.append(_instrument)
+    hooks.add_sink(_count_mutation)
+
+
+def disable():
+    """Stops counting"""
+    global _enabled
+    if not _enabled: return
+    _enabled = False
+    hooks.remove_sink(_count_mutation)
+    metaclasses.CLASS_HOOKS.remove(_instrument)
+    for cls, originals in list(_originals.items()):
+        for name, prop in originals.items():
+            type.__setattr__(cls, name, prop)
+    _originals.clear()
+
+
+def reset():
+    """Sets all counts to zero"""
+    for counter in (_reads, _writes, _spurious, _mutations):
+        counter.clear()
+
+
+def get_counts():
+    """
+    Returns a list of dictionaries, one for each property of a model
+    class which was accessed, with keys ``model`` (the class),
+    ``property``, ``reads``, ``writes``, ``spurious`` and
+    ``mutations``.
+    """
+    keys = set(_reads) | set(_writes) | set(_mutations)
+    return [dict(model=cls, property=name, reads=_reads[(cls, name)],
+                 writes=_writes[(cls, name)],
+                 spurious=_spurious[(cls, name)],
+                 mutations=_mutations[(cls, name)])
+            for cls, name in keys]
+
+
+def top(limit=10, sort_by="reads"):
+    """Returns the *limit* entries of :func:`get_counts` with the
+    largest *sort_by*, which is one of ``"reads"``, ``"writes"``,
+    ``"spurious"`` and ``"mutations"``"""
+    if sort_by not in _KINDS:
+        raise ValueError("Cannot sort by '%s'" % sort_by)
+    return sorted(get_counts(), key=lambda x: x[sort_by],
+                  reverse=True)[:limit]
+
+
+def report(limit=20, sort_by="reads", stream=None):
+    """Writes the entries returned by :func:`top` to *stream*, by
+    default the standard output"""
+    if stream is None: stream = sys.stdout
+    stream.write("%10s %10s %10s %10s  %s\n" % (_KINDS + ("model.property",)))
+    for entry in top(limit, sort_by):
+        stream.write("%10d %10d %10d %10d  %s.%s\n" %
+                     (entry["reads"], entry["writes"], entry["spurious"],
+                      entry["mutations"], entry["model"].__name__,
+                      entry["property"]))
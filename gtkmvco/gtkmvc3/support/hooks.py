@@ -0,0 +1,193 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+
+"""
+Instrumentation of the framework. Events are passed to the attached
+*sinks*, which are callables taking the name of the event and its
+details as keyword arguments: ::
+
+ from gtkmvc3.support import hooks
+
+ def sink(event, **details):
+     print(event, details)
+
+ hooks.add_sink(sink)
+
+When no sink is attached, the instrumented code only checks
+:data:`enabled`, and does not build the details of events. These
+events are sent:
+
+``property_set`` (*model*, *prop_name*, *old*, *new*)
+  the value of a property changed, or may have changed. This is also
+  sent for the logical properties depending on it.
+
+``notify`` (*model*, *observer*, *method*)
+  a notification method is about to be called.
+
+``register`` and ``unregister`` (*model*, *observer*, *prop_name*,
+*method*, *type*)
+  a notification method of the given type (``"assign"``,
+  ``"before"``, ``"after"`` or ``"signal"``) starts or stops
+  observing a property.
+
+``wrapper_mutation`` (*model*, *prop_name*, *instance*, *method_name*,
+*args*, *kwargs*)
+  a method changing an observable container was called.
+
+``signal_emit`` (*model*, *prop_name*, *arg*)
+  a signal was emitted.
+
+``adapter_sync`` (*adapter*, *prop_name*, *direction*, *value*)
+  an :class:`~gtkmvc3.adapters.basic.Adapter` wrote *value* to the
+  property (*direction* is ``"model"``) or to the widget (``"widget"``).
+
+``dependencies`` (*model_class*, *graph*)
+  the dependencies of the logical properties of a class were
+  calculated. *graph* maps each property to the logical properties
+  directly depending on it.
+
+``adapt`` (*controller*, *prop_name*, *wid_name*)
+  a controller adapts automatically a property to a widget.
+
+:func:`log_sink` is a sink writing the registrations, dependencies
+and automatic adaptations to the debug log of the framework. ::
+
+ import logging
+ logging.getLogger("gtkmvc3").setLevel(logging.DEBUG)
+ hooks.add_sink(hooks.log_sink)
+
+Tools needing more than events, like the
+:mod:`~gtkmvc3.support.profiler` and the
+:mod:`~gtkmvc3.support.tracer`, wrap methods of the framework with
+:func:`wrap`, which lets several tools wrap the same methods and
+stop in any order.
+"""
+
+from gtkmvc3.support.log import logger
+
+# True when at least one sink is attached. Instrumented code checks this
+# before building the details of an event.
+enabled = False
+
+_sinks = []
+
+# (class, method name) --> (original method, [(owner, make)]), see wrap
+_wrapped = {}
+
+
+def add_sink(sink):
+    """Attaches the given sink, which will receive all events"""
+    global enabled
+    if sink not in _sinks:
+        _sinks.append(sink)
+    enabled = True
+
+
+def remove_sink(sink):
+    """Detaches the given sink. Raises :exc:`ValueError` if it is not
+    attached."""
+    global enabled
+    _sinks.remove(sink)
+    enabled = bool(_sinks)
+
+
+def get_sinks():
+    """Returns the list of the attached sinks"""
+    return list(_sinks)
+
+
+def emit(event, **details):
+    """Passes the given event to all attached sinks"""
+    for sink in tuple(_sinks):
+        sink(event, **details)
+
+
+def wrap(owner, cls, name, make):
+    """
+    Replaces method *name* of class *cls* by the wrapper returned by
+    *make*, which is called with the method being wrapped. Wrappers of
+    the same method are chained in the order they were added, and
+    *owner* (any hashable value) is used to remove them with
+    :func:`unwrap`.
+    """
+    key = (cls, name)
+    if key not in _wrapped:
+        _wrapped[key] = (cls.__dict__[name], [])
+    _wrapped[key][1].append((owner, make))
+    _apply(key)
+
+
+def unwrap(owner):
+    """Removes the wrappers added by *owner*. Methods having no
+    wrappers left get back their original."""
+    for key, (original, makes) in list(_wrapped.items()):
+        makes[:] = [pair for pair in makes if pair[0] != owner]
+        if makes:
+            _apply(key)
+        else:
+            setattr(key[0], key[1], original)
+            del _wrapped[key]
+
+
+def is_wrapping(owner):
+    """Returns True if *owner* has wrappers installed"""
+    return any(pair[0] == owner
+               for original, makes in _wrapped.values() for pair in makes)
+
+
+def _apply(key):
+    """Installs the chain of wrappers of the given method"""
+    method, makes = _wrapped[key]
+    for owner, make in makes:
+        method = make(method)
+    setattr(key[0], key[1], method)
+
+
+_REGISTER_FORMATS = {"assign": "%s %s.%s after assignment to %s.%s",
+                     "before": "%s %s.%s before mutation of %s.%s",
+                     "after": "%s %s.%s after mutation of %s.%s",
+                     "signal": "%s %s.%s after emit on %s.%s"}
+
+def log_sink(event, **details):
+    """Writes the events ``register``, ``unregister``,
+    ``dependencies`` and ``adapt`` to the debug log"""
+    if event in ("register", "unregister"):
+        logger.debug(_REGISTER_FORMATS[details["type"]],
+                     "Will call" if event == "register" else "Stop calling",
+                     details["observer"].__class__.__name__,
+                     details["method"].__name__,
+                     details["model"].__class__.__name__,
+                     details["prop_name"])
+
+    elif event == "dependencies":
+        cls = details["model_class"]
+        for name, rdeps in details["graph"].items():
+            logger.debug("In class %s.%s changes to OP %s affects "
+                         "logical OPs: %s", cls.__module__, cls.__name__,
+                         name, ", ".join(rdeps))
+
+    elif event == "adapt":
+        logger.debug("Auto-adapting property %s and widget %s",
+                     details["prop_name"], details["wid_name"])
@@ -0,0 +1,258 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+
+"""
+Diagnostics of observers which are never relieved from models. These
+keep growing the lists of observers of long-living models, and keep
+their controllers, views and adapters alive. ::
+
+ from gtkmvc3.support import leaks
+
+ before = leaks.snapshot()
+ ... open and close some windows ...
+ after = leaks.snapshot()
+ for kind, name, old, new in before.growth(after):
+     print(kind, name, old, new)
+ leaks.report()
+
+Models are found through the garbage collector, which scans all the
+objects at each call. To check often, e.g. in production, enable
+tracking first: the models created afterwards are then kept in a set
+of weak references, and the garbage collector is used only once. The
+widgets connected to adapters are watched as well, so that their
+destruction is known. Otherwise only destroyed windows are. ::
+
+ leaks.enable()
+ ...
+ stale = leaks.find_stale()
+"""
+
+import collections
+import gc
+import sys
+import weakref
+
+from gi.repository import Gtk
+
+from gtkmvc3.model import Model
+from gtkmvc3.controller import Controller
+from gtkmvc3.adapters.basic import Adapter, Intermediate
+from gtkmvc3.adapters.containers import watch_items_in_tree
+from gtkmvc3.support import hooks
+
+_models = weakref.WeakSet()  # the live models, while enabled
+
+
+def _make_init(init):
+    def __init__(self, *args, **kwargs):
+        _models.add(self)
+        return init(self, *args, **kwargs)
+    return __init__
+
+
+def _on_destroy(widget):
+    widget._gtkmvc3_destroyed = True
+
+
+def _watch(widget):
+    """Records when the widget gets destroyed"""
+    if widget is not None and not hasattr(widget, "_gtkmvc3_destroyed"):
+        widget._gtkmvc3_destroyed = False
+        widget.connect("destroy", _on_destroy)
+
+
+def _make_connect_widget(connect_widget):
+    def connect_widget(self, wid, *args, **kwargs):
+        _watch(wid)
+        return connect_widget(self, wid, *args, **kwargs)
+    return connect_widget
+
+
+def is_enabled():
+    """Returns True if models are tracked"""
+    return hooks.is_wrapping(__name__)
+
+
+def enable():
+    """Starts tracking the models, so that they are not searched
+    among all the objects anymore"""
+    if is_enabled(): return
+    _models.update(_scan())
+    for model in _models:
+        for observer in model._get_observers():
+            if isinstance(observer, Adapter): _watch(observer.get_widget())
+    # clones and rows of a ModelArray are initialized by
+    # Model.__init__ as well
+    hooks.wrap(__name__, Model, "__init__", _make_init)
+    hooks.wrap(__name__, Adapter, "connect_widget", _make_connect_widget)
+
+
+def disable():
+    """Stops tracking the models"""
+    hooks.unwrap(__name__)
+    _models.clear()
+
+
+def _scan():
+    gc.collect()
+    return [obj for obj in gc.get_objects() if isinstance(obj, Model)]
+
+
+def get_models():
+    """Returns the list of the live models. Unless tracking is
+    enabled, the garbage is collected and all the objects are
+    scanned."""
+    if is_enabled(): return list(_models)
+    return _scan()
+
+
+def get_observed_models():
+    """Returns the list of the pairs (model, number of observers) of
+    the live models having observers, the most observed first"""
+    res = []
+    for model in get_models():
+        count = len(model._get_observers())
+        if count: res.append((model, count))
+    res.sort(key=lambda x: x[1], reverse=True)
+    return res
+
+
+def _is_gone(widget):
+    """True if the widget is known to be destroyed. Widgets which are
+    not in a window yet are not gone."""
+    if getattr(widget, "_gtkmvc3_destroyed", False): return True
+    if widget.in_destruction(): return True
+    # windows are listed from their creation until destroyed
+    return (isinstance(widget, Gtk.Window) and
+            widget not in Gtk.Window.list_toplevels())
+
+
+def _get_stale_reason(observer, model):
+    """Returns why observer should not observe model anymore, or None"""
+    if isinstance(observer, Controller):
+        top = observer.view.get_top_widget() if observer.view else None
+        tops = [x for x in (top if isinstance(top, (list, tuple))
+                            else (top,)) if x is not None]
+        if tops and all(map(_is_gone, tops)):
+            return "view destroyed"
+
+    elif isinstance(observer, Adapter):
+        widget = observer.get_widget()
+        if widget is not None and _is_gone(widget):
+            return "widget destroyed"
+
+    elif isinstance(observer, Intermediate):
+        widget = observer.adapter.get_widget()
+        if widget is not None and _is_gone(widget):
+            return "widget of adapter destroyed"
+
+    elif isinstance(observer, watch_items_in_tree):
+        row = observer.rows.get(model)
+        if row is None or not row.valid():
+            return "row removed"
+
+    return None
+
+
+def find_stale():
+    """Returns the list of the triples (observer, model, reason) of
+    the observers still registered with a model, although their view,
+    widget or row is gone"""
+    res = []
+    for model in get_models():
+        for observer in model._get_observers():
+            reason = _get_stale_reason(observer, model)
+            if reason is not None: res.append((observer, model, reason))
+    return res
+
+
+class Snapshot (object):
+    """
+    Counts of the live models and of the observers registered with
+    them, by class name:
+
+    *models* counts the live models.
+
+    *observers* counts the distinct observers registered with at
+    least one model.
+
+    *registrations* counts the observers registered with the models
+    of each class.
+    """
+
+    def __init__(self):
+        self.models = collections.Counter()
+        self.observers = collections.Counter()
+        self.registrations = collections.Counter()
+        self.__observers = weakref.WeakSet()
+
+        for model in get_models():
+            name = type(model).__name__
+            self.models[name] += 1
+            observers = model._get_observers()
+            self.registrations[name] += len(observers)
+            for observer in observers:
+                if observer not in self.__observers:
+                    self.__observers.add(observer)
+                    self.observers[type(observer).__name__] += 1
+
+    def growth(self, later):
+        """Returns the list of the quadruples (kind, class name, count
+        in self, count in *later*) of the counts which grew in
+        snapshot *later*, the largest growth first. kind is
+        ``"models"``, ``"observers"`` or ``"registrations"``."""
+        res = []
+        for kind in ("models", "observers", "registrations"):
+            old, new = getattr(self, kind), getattr(later, kind)
+            res.extend((kind, name, old[name], new[name]) for name in new
+                       if new[name] > old[name])
+        res.sort(key=lambda x: x[3] - x[2], reverse=True)
+        return res
+
+    def new_observers(self, later):
+        """Returns the list of the observers registered in snapshot
+        *later* which were not registered in self, and are still
+        alive"""
+        return [observer for observer in later.__observers
+                if observer not in self.__observers]
+
+
+def snapshot():
+    """Returns a new :class:`Snapshot`"""
+    return Snapshot()
+
+
+def report(limit=20, stream=None):
+    """Writes to *stream* (by default the standard output) the
+    *limit* most observed models, and the stale observers"""
+    if stream is None: stream = sys.stdout
+    stream.write("%10s  %s\n" % ("observers", "model"))
+    for model, count in get_observed_models()[:limit]:
+        stream.write("%10d  %r\n" % (count, model))
+
+    stale = find_stale()
+    stream.write("\n%d stale observers\n" % len(stale))
+    for observer, model, reason in stale[:limit]:
+        stream.write("%r observing %r: %s\n" % (observer, model, reason))
@@ -33,6 +33,11 @@ importing gtkmc. Remember to take it out before shipping your application. ::
 
  import logging
  logging.getLogger("gtkmvc3").setLevel(logging.DEBUG)
+
+Debug messages about the observation of properties, dependencies of
+logical properties and automatic adaptation are sent only if the
+:func:`~gtkmvc3.support.hooks.log_sink` is attached as well (see
+:mod:`gtkmvc3.support.hooks`).
 """
 
 import logging
@@ -25,7 +25,9 @@
 import inspect
 import fnmatch
 import operator
+import textwrap
 import types
+import weakref
 
 import gtkmvc3.support.wrappers as wrappers
 from gtkmvc3.support.log import logger
@@ -34,6 +36,13 @@ from gtkmvc3.support.log import logger
 
 OBS_TUPLE_NAME = "__observables__"
 
+# all the classes created by PropertyMeta and derived metaclasses
+CLASSES = weakref.WeakSet()
+
+# functions called with each class created by PropertyMeta and derived
+# metaclasses, once its properties are created
+CLASS_HOOKS = []
+
 # old name, supported only for backward compatilibity, do not use it
 # anymore in new code
 PROPS_MAP_NAME = "__properties__"
@@ -65,6 +74,217 @@ WILDCARDS = frozenset("[]!*?")
 # name of the keyword argument for logical getters
 KWARG_NAME_DEPS = "deps"
 
+# name of the class attribute mapping property names to the functions
+# used to detect changes of their values
+CHANGE_DETECTORS_MAP_NAME = "__change_detectors__"
+
+# class attribute which, when True, makes the class (and derived
+# classes) store the values of concrete properties in slots
+COMPACT_NAME = "__compact__"
+
+# names of the instance attributes a base class wants stored in slots
+# by compact classes
+COMPACT_SLOTS_NAME = "__compact_slots__"
+
+# name of the class attribute holding the default values of the
+# properties stored in slots
+COMPACT_DEFAULTS_MAP_NAME = "__compact_defaults__"
+
+
+# ----------------------------------------------------------------------
+# Change detectors take the old and the new value of a property, and
+# return True if the assignment changed the value. Assignments not
+# changing the value are notified only to observers accepting spurious
+# notifications.
+def _changed_eq(old, new):
+    # arrays compare element-wise, and objects like them may not
+    # have a truth value for the comparison
+    if (isinstance(old, wrappers.ARRAY_TYPES) or
+        isinstance(new, wrappers.ARRAY_TYPES)):
+        return getattr(old, "_obj", old) is not getattr(new, "_obj", new)
+    try: return bool(old != new)
+    except ValueError: return old is not new
+
+def _changed_identity(old, new):
+    return old is not new
+
+def _changed_hash(old, new):
+    return hash(old) != hash(new)
+
+def _changed_always(old, new):
+    return True
+
+# names usable in __observables__ to select a change detector
+CHANGE_DETECTORS = {
+    "eq" : _changed_eq,
+    "identity" : _changed_identity,
+    "hash" : _changed_hash,
+    "always" : _changed_always,
+    }
+
+# used for properties not declaring a change detector
+DEFAULT_CHANGE_DETECTOR = _changed_eq
+
+# values of these types are never wrapped (see create_value)
+_UNWRAPPED_TYPES = frozenset((type(None), bool, int, float, complex,
+                              str, bytes))
+
+
+# ----------------------------------------------------------------------
+# Source code of the generated accessors. Everything depending on the
+# property (its name, the variable holding its value, whether it is
+# concrete or logical) is resolved once when the class is created, so
+# that accessors do not need to build names or to test the kind of
+# the property at each access.
+GETTER_SOURCE = """
+def _getter(self):
+    return %(get_value)s
+"""
+
+SETTER_SOURCE = """
+def _setter(self, val):
+    %(set_value)s
+"""
+
+OBS_SETTER_SOURCE = """
+def _setter(self, val):
+    stack = self._notify_stack
+    curr_frame = len(stack)
+    if %(prop_name)r not in stack:
+        stack.append(%(prop_name)r)
+
+    old = %(get_old)s
+    new = type(self).create_value(%(prop_name)r, val, self)
+
+    # to track dependencies
+    if self._has_observer():
+        olds = self.__before_property_value_change__(%(prop_name)r)
+        stack.extend(map(itemgetter(1), olds))
+    else: olds = ()
+
+    # this is the unique place where the value is set:
+    %(set_new)s
+    self._property_changed(%(prop_name)r)
+
+    if type(self).check_value_change(old, new):
+        self._reset_property_notification(%(prop_name)r, old)
+
+    self.notify_property_value_change(%(prop_name)r, old, val)
+
+    # to notify dependencies
+    self.__after_property_value_change__(%(prop_name)r, olds)
+
+    del stack[curr_frame:]
+"""
+
+
+def _get_var_source(prop_name):
+    """Returns the source of an expression reading the variable
+    holding the value of the given property"""
+    varname = PROP_NAME % {'prop_name' : prop_name}
+    if varname.isidentifier(): return "self.%s" % varname
+    return "getattr(self, %r)" % varname
+
+def _set_var_source(prop_name, value):
+    """Returns the source of a statement setting the variable
+    holding the value of the given property to the expression value"""
+    varname = PROP_NAME % {'prop_name' : prop_name}
+    if varname.isidentifier(): return "self.%s = %s" % (varname, value)
+    return "setattr(self, %r, %s)" % (varname, value)
+
+COMPACT_GETTER_SOURCE = """
+def _getter(self):
+    try:
+        return self.%(varname)s
+    except AttributeError:
+        # the slot has not been set yet
+        return _compact_default(self, %(varname)r)
+"""
+
+def _compact_default(model, varname):
+    """Returns the default value of a property stored in a slot that
+    model has not set yet"""
+    default = getattr(type(model), COMPACT_DEFAULTS_MAP_NAME)[varname]
+    if isinstance(default, wrappers.ObsContainerDefault):
+        return default.__get__(model, type(model))
+    return default
+
+def _get_container_default(varname, prop_name, val):
+    """Returns the class-level default replacing the wrapper val
+    given as default value, None if val is not shared as it is"""
+    if isinstance(val, wrappers.ObsSeqWrapper):
+        return wrappers.ObsContainerDefault(varname, prop_name, val)
+    if wrappers.ARRAY_TYPES and isinstance(val, wrappers.ObsArrayWrapper):
+        return wrappers.ObsArrayDefault(varname, prop_name, val)
+    return None
+
+def _is_slot(cls, varname):
+    """True if varname is a slot created by cls"""
+    return varname in cls.__dict__.get("__slots__", ())
+
+def _compile_accessor(source, func_name, namespace=None):
+    """Executes the source of a generated accessor, and returns the
+    function named func_name it defines. namespace holds the globals
+    the accessor refers to."""
+    namespace = dict(namespace or {}, _compact_default=_compact_default)
+    exec(compile(source, "<generated %s>" % func_name, "exec"), namespace)
+    return namespace[func_name]
+
+
+def _get_observables_sets(cls_module, cls_name, _dict):
+    """Implements PropertyMeta.__get_observables_sets__ for a class
+    whose name and namespace are given. This is used also before the
+    class is created."""
+    conc_prop_set = set()
+    log_prop_set = set()
+
+    not_found = []
+    names = _dict.get(OBS_TUPLE_NAME, tuple())
+
+    if not isinstance(names, list) and \
+            not isinstance(names, tuple):
+        raise TypeError("In class %s.%s attribute '%s' must "
+                        "be a list or tuple" % \
+                        (cls_module, cls_name, OBS_TUPLE_NAME))
+
+    for name in names:
+        if isinstance(name, tuple) and len(name) == 2:
+            name = name[0]  # (name, change detector)
+        if not isinstance(name, str):
+            raise TypeError("In class %s.%s attribute '%s' must contain"\
+                                " only strings (found %s)" %
+                            (cls_module, cls_name, OBS_TUPLE_NAME,
+                             type(name)))
+        if (name in _dict and
+            not isinstance(_dict[name],
+                           (types.MethodType, types.FunctionType))):
+            conc_prop_set.add(name)
+        else:
+            not_found.append(name)
+
+    # now searches all possible matches for those that have not
+    # been found, and collects all logical properties as well
+    # (those which do not match, and do not contain patterns)
+    concrete_members = [x for x, v in _dict.items()
+                        if (not x.startswith("__") and
+                            not isinstance(v, types.FunctionType) and
+                            not isinstance(v, types.MethodType) and
+                            not isinstance(v, classmethod) and
+                            x not in conc_prop_set)]
+
+    for pat in not_found:
+        if frozenset(pat) & WILDCARDS:
+            matches = fnmatch.filter(concrete_members, pat)
+            if 0 == len(matches):
+                logger.warning("In class %s.%s observable pattern '%s' " \
+                                "did not match any existing attribute",
+                                 cls_module, cls_name, pat)
+            else: conc_prop_set |= set(matches)
+        else:  # here pat has to be a logical property
+            log_prop_set.add(pat)
+
+    return (frozenset(conc_prop_set), frozenset(log_prop_set))
+
 
 class PropertyMeta (type):
     """This is a meta-class that provides auto-property support.
@@ -96,8 +316,8 @@ class PropertyMeta (type):
     To supply your own methods is good for few methods, but can result in a
     very unconfortable way for many methods. In this case you can extend
     the meta-class, and override methods get_[gs]etter_source with your
-    implementation (this can be probably made better).
-    An example is provided in meta-class PropertyMetaVerbose below.
+    implementation. They return the source code of the accessors,
+    which is compiled once when the class is created.
     """
 
     class ConcreteOP (property):
@@ -110,6 +330,34 @@ class PropertyMeta (type):
             property.__init__(self, fget, fset)
             self.deps = deps
 
+    def __new__(mcs, name, bases, _dict):
+        """Compact classes get slots for the values of the concrete
+        properties they declare, and for the attributes listed by
+        their bases in __compact_slots__"""
+        compact_bases = [base for base in bases
+                         if getattr(base, COMPACT_NAME, False)]
+        if _dict.get(COMPACT_NAME, bool(compact_bases)):
+            conc_props, _ = _get_observables_sets(_dict.get("__module__"),
+                                                  name, _dict)
+            slots = [PROP_NAME % {'prop_name' : prop}
+                     for prop in sorted(conc_props)]
+            if not compact_bases:
+                for base in bases:
+                    for klass in reversed(base.__mro__):
+                        slots.extend(x for x in
+                                     klass.__dict__.get(COMPACT_SLOTS_NAME, ())
+                                     if x not in slots)
+
+            _dict = dict(_dict)
+            _dict["__slots__"] = (tuple(slots) +
+                                  tuple(_dict.get("__slots__", ())))
+            defaults = {}
+            for base in reversed(bases):
+                defaults.update(getattr(base, COMPACT_DEFAULTS_MAP_NAME, {}))
+            _dict[COMPACT_DEFAULTS_MAP_NAME] = defaults
+
+        return super(PropertyMeta, mcs).__new__(mcs, name, bases, _dict)
+
     def __init__(cls, name, bases, _dict):
         """class constructor"""
         type.__init__(cls, name, bases, _dict)
@@ -162,6 +410,9 @@ class PropertyMeta (type):
         setattr(cls, ALL_OBS_SET, frozenset(obs))
         logger.debug("class %s.%s has observables: %s" \
                          % (cls.__module__, cls.__name__, obs))
+
+        CLASSES.add(cls)
+        for hook in CLASS_HOOKS: hook(cls)
         return
 
     def __get_observables_sets__(cls):  # @NoSelf
@@ -175,52 +426,8 @@ class PropertyMeta (type):
         which have not been associated with a getter (and
         optionally with a setter).
         """
-        conc_prop_set = set()
-        log_prop_set = set()
-
-        not_found = []
-        names = cls.__dict__.get(OBS_TUPLE_NAME, tuple())
-
-        if not isinstance(names, list) and \
-                not isinstance(names, tuple):
-            raise TypeError("In class %s.%s attribute '%s' must "
-                            "be a list or tuple" % \
-                            (cls.__module__, cls.__name__, OBS_TUPLE_NAME))
-
-        for name in names:
-            if not isinstance(name, str):
-                raise TypeError("In class %s.%s attribute '%s' must contain"\
-                                    " only strings (found %s)" %
-                                (cls.__module__, cls.__name__, OBS_TUPLE_NAME,
-                                 type(name)))
-            if (name in cls.__dict__ and
-                not isinstance(getattr(cls, name), (types.MethodType, types.FunctionType))):
-                conc_prop_set.add(name)
-            else:
-                not_found.append(name)
-
-        # now searches all possible matches for those that have not
-        # been found, and collects all logical properties as well
-        # (those which do not match, and do not contain patterns)
-        concrete_members = [x for x, v in cls.__dict__.items()
-                            if (not x.startswith("__") and
-                                not isinstance(v, types.FunctionType) and
-                                not isinstance(v, types.MethodType) and
-                                not isinstance(v, classmethod) and
-                                x not in conc_prop_set)]
-
-        for pat in not_found:
-            if frozenset(pat) & WILDCARDS:
-                matches = fnmatch.filter(concrete_members, pat)
-                if 0 == len(matches):
-                    logger.warning("In class %s.%s observable pattern '%s' " \
-                                    "did not match any existing attribute",
-                                     cls.__module__, cls.__name__, pat)
-                else: conc_prop_set |= set(matches)
-            else:  # here pat has to be a logical property
-                log_prop_set.add(pat)
-
-        return (frozenset(conc_prop_set), frozenset(log_prop_set))
+        return _get_observables_sets(cls.__module__, cls.__name__,
+                                     cls.__dict__)
 
     def __create_log_props(cls, log_props, _getdict, _setdict):  # @NoSelf
         """Creates all the logical property.
@@ -261,7 +468,8 @@ class PropertyMeta (type):
                     logger.warning("In class %s.%s %s pattern '%s' "
                                    "did not match any existing "
                                    "logical property",
-                                   cls.__module__, cls.__name__, _dict_name, pat)
+                                   cls.__module__, cls.__name__,
+                                   _dict_name, pat)
 
             # now adds the exact matches (no wilcards) which override
             # the pattern-matches
@@ -410,7 +618,12 @@ class PropertyMeta (type):
 
         # creates the underlaying variable if needed
         varname = PROP_NAME % {'prop_name' : prop_name}
-        if varname not in members_names:
+        if _is_slot(cls, varname):
+            # compact storage, the default is kept aside of the slot
+            getattr(cls, COMPACT_DEFAULTS_MAP_NAME)[varname] = \
+                cls.create_value(varname, default_val)
+
+        elif varname not in members_names:
             setattr(cls, varname, cls.create_value(varname, default_val))
 
         else:
@@ -432,7 +645,7 @@ class PropertyMeta (type):
         be called in order to re-register the new property instance
         or type"""
         return (type(old) != type(new) or
-                isinstance(old, wrappers.ObsWrapperBase) and old != new)
+                isinstance(old, wrappers.ObsWrapperBase) and old is not new)
 
     def create_value(cls, prop_name, val, model=None):  # @NoSelf
         """This is used to create a value to be assigned to a
@@ -443,6 +656,9 @@ class PropertyMeta (type):
         changed (a model exists). Otherwise, during property creation
         model is None"""
 
+        if type(val) in _UNWRAPPED_TYPES:
+            return val
+
         if isinstance(val, tuple):
             # this might be a class instance to be wrapped
             # (thanks to Tobias Weber for
@@ -479,6 +695,13 @@ class PropertyMeta (type):
                 res.__add_model__(model, prop_name)
             return res
 
+        elif (wrappers.numpy is not None and
+              isinstance(val, wrappers.numpy.ndarray)):
+            res = wrappers.ObsArrayWrapper(val)
+            if model:
+                res.__add_model__(model, prop_name)
+            return res
+
         return val
 
     # ------------------------------------------------------------
@@ -514,9 +737,8 @@ class PropertyMeta (type):
                 _getter = user_getter
             return _getter
 
-        def _getter(self):  # @DuplicatedSignature
-            return getattr(self, PROP_NAME % {'prop_name' : prop_name})
-        return _getter
+        return _compile_accessor(type(cls).get_getter_source(cls, prop_name),
+                                 "_getter")
 
     def get_setter(cls, prop_name,   # @NoSelf
                    user_setter=None, setter_takes_name=False,
@@ -537,10 +759,22 @@ class PropertyMeta (type):
             else: _setter = user_setter
             return _setter
 
-        def _setter(self, val):  # @DuplicatedSignature
-            setattr(self, PROP_NAME % {'prop_name' : prop_name}, val)
-            return
-        return _setter
+        return _compile_accessor(type(cls).get_setter_source(cls, prop_name),
+                                 "_setter")
+
+    def get_getter_source(cls, prop_name):  # @NoSelf
+        """Returns the source code of a function named '_getter'
+        returning the value of the variable of the given property"""
+        varname = PROP_NAME % {'prop_name' : prop_name}
+        if _is_slot(cls, varname):
+            return COMPACT_GETTER_SOURCE % {'varname' : varname}
+        return GETTER_SOURCE % {'get_value' : _get_var_source(prop_name)}
+
+    def get_setter_source(cls, prop_name):  # @NoSelf
+        """Returns the source code of a function named '_setter'
+        setting the value of the variable of the given property"""
+        return SETTER_SOURCE % {'set_value' :
+                                _set_var_source(prop_name, "val")}
 
 
 # ----------------------------------------------------------------------
@@ -550,8 +784,60 @@ class ObservablePropertyMeta (PropertyMeta):
 
     def __init__(cls, name, bases, _dict):  # @NoSelf
         PropertyMeta.__init__(cls, name, bases, _dict)
+        type(cls).__create_change_detectors(cls, bases)
         return
 
+    def __create_change_detectors(cls, bases):  # @NoSelf
+        """Creates the map from property names to the functions
+        detecting changes of their values. The map is inherited from
+        base classes, and updated with pairs (name, detector) found
+        in __observables__, where name may contain wildcards and
+        detector is either a key of CHANGE_DETECTORS or a callable
+        taking the old and the new value."""
+        detectors = {}
+        for base in reversed(bases):
+            detectors.update(getattr(base, CHANGE_DETECTORS_MAP_NAME, {}))
+
+        conc_props, log_props = type(cls).__get_observables_sets__(cls)
+        for entry in cls.__dict__.get(OBS_TUPLE_NAME, ()):
+            if not isinstance(entry, tuple):
+                continue
+            pat, detector = entry
+            if not callable(detector):
+                if detector not in CHANGE_DETECTORS:
+                    raise ValueError("In class %s.%s unknown change "
+                                     "detector %r for '%s' (expected a "
+                                     "callable or one of: %s)" % \
+                                     (cls.__module__, cls.__name__,
+                                      detector, pat,
+                                      ", ".join(sorted(CHANGE_DETECTORS))))
+                detector = CHANGE_DETECTORS[detector]
+
+            for prop in fnmatch.filter(conc_props | log_props, pat):
+                detectors[prop] = detector
+
+        setattr(cls, CHANGE_DETECTORS_MAP_NAME, detectors)
+
+    def __create_conc_prop_accessors__(cls, prop_name, default_val):  # @NoSelf
+        """Like in PropertyMeta, but containers given as default
+        values are not shared among instances: they are copied on
+        write (see wrappers.ObsContainerDefault), or on first read
+        for arrays (see wrappers.ObsArrayDefault)"""
+        PropertyMeta.__create_conc_prop_accessors__(cls, prop_name,
+                                                    default_val)
+
+        varname = PROP_NAME % {'prop_name' : prop_name}
+        if _is_slot(cls, varname):
+            defaults = getattr(cls, COMPACT_DEFAULTS_MAP_NAME)
+            default = _get_container_default(varname, prop_name,
+                                             defaults[varname])
+            if default is not None: defaults[varname] = default
+            return
+
+        default = _get_container_default(varname, prop_name,
+                                         cls.__dict__.get(varname))
+        if default is not None: setattr(cls, varname, default)
+
     def get_getter(cls, prop_name,  # @NoSelf
                    user_getter=None, getter_takes_name=False):
         """This implementation returns the PROP_NAME value if there
@@ -679,43 +965,45 @@ class ObservablePropertyMeta (PropertyMeta):
                     #user_setter = getattr(cls, SET_GENERIC_NAME)
                     setter_takes_name = True
 
-        # the final setter is a combination of a basic setter, and
-        # the getter (see how inner_{getter,setter} are used in
-        # _setter below)
-        _inner_setter = PropertyMeta.get_setter(cls, prop_name,
-                                        user_setter, setter_takes_name,
-                                        user_getter, getter_takes_name)
-
-        _inner_getter = type(cls).get_getter(cls, prop_name,
-                                             user_getter, getter_takes_name)
-
-        def _setter(self, val):
-            curr_frame = len(self._notify_stack)
-            if prop_name not in self._notify_stack:
-                self._notify_stack.append(prop_name)
-
-            old = _inner_getter(self)
-            new = type(self).create_value(prop_name, val, self)
-
-            # to track dependencies
-            olds = self.__before_property_value_change__(prop_name) if \
-                self._has_observer() else ()
-            self._notify_stack.extend(
-                            map(operator.itemgetter(1), olds))
-
-            # this is the unique place where the value is set:
-            _inner_setter(self, new)
-
-            if type(self).check_value_change(old, new):
-                self._reset_property_notification(prop_name, old)
-
-            self.notify_property_value_change(prop_name, old, val)
-
-            # to notify dependencies
-            self.__after_property_value_change__(prop_name, olds)
+        namespace = {'itemgetter' : operator.itemgetter}
+        if has_prop_variable:
+            # the variable is accessed directly, unless it is a slot
+            # which may be unset
+            get_old = set_new = None
+            if _is_slot(cls, PROP_NAME % {'prop_name' : prop_name}):
+                namespace['_getter'] = type(cls).get_getter(cls, prop_name)
+                get_old = "_getter(self)"
+        else:
+            if user_getter and getter_takes_name:
+                get_old = "_user_getter(self, %r)" % prop_name
+            else:
+                user_getter = type(cls).get_getter(cls, prop_name,
+                                                   user_getter, False)
+                get_old = "_user_getter(self)"
 
-            del self._notify_stack[curr_frame:]
-        return _setter
+            if setter_takes_name:
+                set_new = "_user_setter(self, %r, new)" % prop_name
+            else: set_new = "_user_setter(self, new)"
+
+            namespace.update(_user_getter=user_getter,
+                             _user_setter=user_setter)
+
+        source = type(cls).get_setter_source(cls, prop_name, get_old, set_new)
+        return _compile_accessor(source, "_setter", namespace)
+
+    def get_setter_source(cls, prop_name,  # @NoSelf
+                          get_old=None, set_new=None):
+        """Returns the source code of a function named '_setter'
+        which sets the value of the property and notifies
+        observers. get_old is the source of an expression returning
+        the current value, and set_new the source of a statement
+        setting the value held by 'new'. They default to accessing
+        the variable of the property."""
+        return OBS_SETTER_SOURCE % {
+            'prop_name' : prop_name,
+            'get_old' : get_old or _get_var_source(prop_name),
+            'set_new' : set_new or _set_var_source(prop_name, "new"),
+            }
 
 
 # ----------------------------------------------------------------------
@@ -730,22 +1018,15 @@ class ObservablePropertyMetaMT (ObservablePropertyMeta):
         ObservablePropertyMeta.__init__(cls, name, bases, _dict)
         return
 
-    def get_setter(cls, prop_name,  # @NoSelf
-                   user_setter=None, setter_takes_name=False,
-                   user_getter=None, getter_takes_name=False):
-        """The setter follows the rules of the getter. First search
-          for property variable, then logical custom getter/setter pair
-          methods"""
-
-        _inner_setter = ObservablePropertyMeta.get_setter(cls, prop_name,
-                                            user_setter, setter_takes_name,
-                                            user_getter, getter_takes_name)
-
-        def _setter(self, val):
-            self._prop_lock.acquire()
-            _inner_setter(self, val)
-            self._prop_lock.release()
-        return _setter
+    def get_setter_source(cls, prop_name,  # @NoSelf
+                          get_old=None, set_new=None):
+        """Like in ObservablePropertyMeta, but the body of the
+        setter is executed holding the lock"""
+        source = ObservablePropertyMeta.get_setter_source(cls, prop_name,
+                                                          get_old, set_new)
+        header, body = source.lstrip().split("\n", 1)
+        return "%s\n    with self._prop_lock:\n%s" % (
+            header, textwrap.indent(body, "    "))
 
 
 try:
@@ -782,6 +1063,8 @@ try:
                     _old = getattr(instance, k)
                     _new = kwargs[k]
 
+                    instance._property_changed(k)
+
                     # to track dependencies
                     olds = instance.__before_property_value_change__(k)
                     # to notify the property observer
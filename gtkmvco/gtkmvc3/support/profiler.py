@@ -0,0 +1,282 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+
+"""
+Profiling of the notifications sent by models to observers. When
+enabled, each call of a notification method is timed, and statistics
+are kept for each triple (model class, property, notification
+method). The number of notification methods called for each change of
+a property (the fan-out) is kept as well. ::
+
+ from gtkmvc3.support import profiler
+
+ profiler.enable()
+ ...
+ profiler.disable()
+ profiler.report()
+ profiler.dump("notifications.json")
+
+The profiler wraps the dispatching methods of
+:class:`~gtkmvc3.model.Model` with :func:`gtkmvc3.support.hooks.wrap`
+only while it is enabled, so it costs nothing when disabled. The
+notifications which :class:`~gtkmvc3.model_mt.ModelMT` delivers in
+the main loop are timed as well, and counted in the fan-out of the
+change which sent them.
+"""
+
+import json
+import re
+import sys
+import threading
+import time
+
+from gtkmvc3.model import Model
+from gtkmvc3.model_mt import ModelMT
+from gtkmvc3.observer import NTInfo
+from gtkmvc3.support import hooks
+
+# upper bounds in seconds of the latency histogram buckets. The last
+# bucket holds the calls taking longer.
+BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+# names of the Model methods sending notifications of a change
+_DISPATCHERS = ("notify_property_value_change", "notify_method_before_change",
+                "notify_method_after_change", "notify_signal_emit")
+
+# old style notification methods carry the property in their name
+_OLD_STYLE = re.compile(r"^property_(.+)_(value_change|before_change|"
+                        r"after_change|signal_emit)$")
+
+_lock = threading.Lock()
+_local = threading.local()  # holds the fan-out counters being filled
+
+_calls = {}  # (class name, property, method name) --> _Stat
+_fanouts = {}  # (class name, property) --> _Stat
+
+
+class _Stat (object):
+    """Number, total, maximum and histogram of measured values"""
+    __slots__ = ("count", "total", "max", "hist")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.hist = [0] * (len(BUCKETS) + 1)
+
+    def add(self, value, bucket):
+        self.count += 1
+        self.total += value
+        if value > self.max: self.max = value
+        self.hist[bucket] += 1
+
+
+def _get_bucket(seconds):
+    for index, bound in enumerate(BUCKETS):
+        if seconds <= bound: return index
+    return len(BUCKETS)
+
+
+def _get_method_name(method):
+    func = getattr(method, "__func__", method)
+    owner = getattr(method, "__self__", None)
+    name = getattr(func, "__qualname__", None) or getattr(func, "__name__",
+                                                          repr(func))
+    if owner is not None and "." not in name:
+        name = "%s.%s" % (type(owner).__name__, name)
+    return name
+
+
+def _get_prop_name(method, args):
+    """Returns the name of the notified property, guessed from the
+    arguments of the notification method"""
+    if args and isinstance(args[-1], NTInfo):
+        return args[-1].prop_name
+    match = _OLD_STYLE.match(getattr(method, "__name__", ""))
+    if match:
+        return match.group(1)
+    if len(args) > 1 and isinstance(args[1], str):
+        return args[1]
+    return "?"
+
+
+def _record(method, model, args, elapsed):
+    key = (type(model).__name__, _get_prop_name(method, args),
+           _get_method_name(method))
+    with _lock:
+        stat = _calls.get(key)
+        if stat is None: stat = _calls[key] = _Stat()
+        stat.add(elapsed, _get_bucket(elapsed))
+
+
+def _count():
+    counters = getattr(_local, "counters", None)
+    if counters: counters[-1] += 1
+
+
+def _make_notifier(notify):
+    def _notify_observer(self, observer, method, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return notify(self, observer, method, *args, **kwargs)
+        finally:
+            _record(method, self, args, time.perf_counter() - start)
+            # ModelMT counts the notifications it sends, see below
+            if not isinstance(self, ModelMT): _count()
+    return _notify_observer
+
+
+def _make_mt_notifier(notify):
+    def _notify_observer(self, observer, method, *args, **kwargs):
+        _count()
+        return notify(self, observer, method, *args, **kwargs)
+    return _notify_observer
+
+
+def _make_idle_callback(callback):
+    # notifications sent from other threads, called in the main loop
+    def _idle_callback(self, observer, method, args, kwargs):
+        start = time.perf_counter()
+        try:
+            return callback(self, observer, method, args, kwargs)
+        finally:
+            _record(method, self, args, time.perf_counter() - start)
+    return _idle_callback
+
+
+def _make_dispatcher(dispatch):
+    def _dispatcher(self, prop_name, *args, **kwargs):
+        counters = getattr(_local, "counters", None)
+        if counters is None: counters = _local.counters = []
+        counters.append(0)
+        try:
+            return dispatch(self, prop_name, *args, **kwargs)
+        finally:
+            fanout = counters.pop()
+            key = (type(self).__name__, prop_name)
+            with _lock:
+                stat = _fanouts.get(key)
+                if stat is None: stat = _fanouts[key] = _Stat()
+                stat.add(fanout, min(fanout.bit_length(), len(BUCKETS)))
+    _dispatcher.__name__ = dispatch.__name__
+    return _dispatcher
+
+
+def is_enabled():
+    """Returns True if the profiler is enabled"""
+    return hooks.is_wrapping(__name__)
+
+
+def enable():
+    """Starts profiling notifications. Statistics collected before are
+    kept, see :func:`reset`."""
+    if is_enabled(): return
+    hooks.wrap(__name__, Model, "__notify_observer__", _make_notifier)
+    hooks.wrap(__name__, ModelMT, "__notify_observer__", _make_mt_notifier)
+    hooks.wrap(__name__, ModelMT, "_ModelMT__idle_callback",
+               _make_idle_callback)
+    for name in _DISPATCHERS:
+        hooks.wrap(__name__, Model, name, _make_dispatcher)
+
+
+def disable():
+    """Stops profiling notifications"""
+    hooks.unwrap(__name__)
+
+
+def reset():
+    """Forgets the collected statistics"""
+    with _lock:
+        _calls.clear()
+        _fanouts.clear()
+
+
+def get_stats():
+    """
+    Returns the collected statistics as a dictionary with two lists of
+    dictionaries:
+
+    *calls* has an entry for each notification method called for a
+    property of a model class, with keys ``model``, ``property``,
+    ``observer``, ``count``, ``total`` and ``max`` (times in seconds),
+    and ``histogram``, the number of calls taking at most the
+    corresponding time in :data:`BUCKETS`, or longer for the last
+    one.
+
+    *fanouts* has an entry for each property of a model class which
+    changed, with keys ``model``, ``property``, ``count`` (the number
+    of changes), ``total`` and ``max`` (numbers of notification
+    methods called), and ``histogram``, the number of changes which
+    called no methods, one method, at most 3, 7, 15 and so on.
+    """
+    with _lock:
+        calls = [dict(model=key[0], property=key[1], observer=key[2],
+                      count=stat.count, total=stat.total, max=stat.max,
+                      histogram=list(stat.hist))
+                 for key, stat in _calls.items()]
+        fanouts = [dict(model=key[0], property=key[1],
+                        count=stat.count, total=stat.total, max=stat.max,
+                        histogram=list(stat.hist))
+                   for key, stat in _fanouts.items()]
+    return dict(calls=calls, fanouts=fanouts)
+
+
+def report(limit=20, sort_by="total", stream=None):
+    """
+    Writes to *stream* (by default the standard output) the *limit*
+    notification methods with the largest values of *sort_by*, which
+    can be ``"total"``, ``"max"`` or ``"count"``, followed by the
+    properties with the largest fan-out.
+    """
+    if stream is None: stream = sys.stdout
+    stats = get_stats()
+
+    calls = sorted(stats["calls"], key=lambda x: x[sort_by],
+                   reverse=True)[:limit]
+    stream.write("%8s %10s %10s  %s\n" % ("calls", "total ms", "max ms",
+                                          "model.property -> observer"))
+    for entry in calls:
+        stream.write("%8d %10.3f %10.3f  %s.%s -> %s\n" %
+                     (entry["count"], entry["total"] * 1000,
+                      entry["max"] * 1000, entry["model"],
+                      entry["property"], entry["observer"]))
+
+    fanouts = sorted(stats["fanouts"], key=lambda x: x["max"],
+                     reverse=True)[:limit]
+    stream.write("\n%8s %10s %10s  %s\n" % ("changes", "mean", "max",
+                                            "model.property"))
+    for entry in fanouts:
+        stream.write("%8d %10.1f %10d  %s.%s\n" %
+                     (entry["count"], float(entry["total"]) / entry["count"],
+                      entry["max"], entry["model"], entry["property"]))
+
+
+def dump(filename):
+    """Writes the statistics returned by :func:`get_stats` to the
+    given file, in JSON format"""
+    stats = get_stats()
+    stats["buckets"] = BUCKETS
+    with open(filename, "w") as _file:
+        json.dump(stats, _file, indent=1)
@@ -0,0 +1,289 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+
+"""
+Recording and replaying of the changes of a set of models. While
+recording, the assignments of concrete properties, the mutations of
+observable containers and the emissions of signals are saved, with
+their time and values, and written to a compressed file. Replaying
+the file does the same changes to other models, for example fresh
+ones observed by the controllers under study: ::
+
+ from gtkmvc3.support import recorder
+
+ rec = recorder.Recorder(dict(order=order, shop=shop))
+ rec.start()
+ ...
+ rec.stop()
+ rec.save("session.rec")
+
+ recorder.replay("session.rec", dict(order=Order(), shop=Shop()),
+                 speed=None)
+
+Only changes done outside notifications are recorded, as those done
+by observers are done again by the observers when replaying. Values
+are serialized with :mod:`pickle`, and the recorded models are
+saved by name, so values referring to them refer to the models given
+to :func:`replay`. Changes whose values cannot be pickled, and
+mutations of containers nested in properties, are skipped and
+counted.
+"""
+
+import gzip
+import io
+import pickle
+import sys
+import threading
+import time
+
+from gtkmvc3.model import Model
+from gtkmvc3.model_mt import ModelMT
+from gtkmvc3.observable import Observable
+from gtkmvc3.support import hooks
+from gtkmvc3.support.log import logger
+from gtkmvc3.support.metaclasses import PropertyMeta
+from gtkmvc3.support.wrappers import ObsWrapper
+
+VERSION = 1
+
+# code of the methods calling observers: changes done below them are
+# done by observers
+_NOTIFYING = frozenset((Model.__notify_observer__.__code__,
+                        ModelMT._ModelMT__idle_callback.__code__))
+
+
+def _in_notification(frame):
+    while frame is not None:
+        if frame.f_code in _NOTIFYING: return True
+        frame = frame.f_back
+    return False
+
+
+def _unwrap(value):
+    """Values held by properties may be wrapped"""
+    if isinstance(value, ObsWrapper): return value._obj
+    return value
+
+
+def _is_concrete(model, prop_name):
+    return isinstance(getattr(type(model), prop_name, None),
+                      PropertyMeta.ConcreteOP)
+
+
+class _Pickler (pickle.Pickler):
+    """Saves the recorded models by name"""
+
+    def __init__(self, _file, names):
+        pickle.Pickler.__init__(self, _file, pickle.HIGHEST_PROTOCOL)
+        self.names = names
+
+    def persistent_id(self, obj):
+        return self.names.get(id(obj))
+
+
+class _Unpickler (pickle.Unpickler):
+    """Loads the recorded models as the given ones"""
+
+    def __init__(self, _file, models):
+        pickle.Unpickler.__init__(self, _file)
+        self.models = models
+
+    def persistent_load(self, pid):
+        return self.models[pid]
+
+
+class Recorder (object):
+    """
+    Records the changes of *models*, a dictionary mapping names to
+    models, between :meth:`start` and :meth:`stop`.
+    """
+
+    def __init__(self, models):
+        self.models = dict(models)
+        self.skipped = 0  # changes which could not be recorded
+
+        self.__names = dict((id(model), name)
+                            for name, model in self.models.items())
+        self.__records = []  # pickled records
+        self.__state = None  # pickled values of the properties at start
+        self.__start = None
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """Number of recorded changes"""
+        return len(self.__records)
+
+    def start(self):
+        """Saves the values of the concrete properties, and starts
+        recording"""
+        if self.__start is not None: return
+        self.__state = self.__dumps(dict(
+            (name, self.__get_state(model))
+            for name, model in self.models.items()))
+        self.__records = []
+        self.skipped = 0
+        self.__start = time.time()
+        hooks.add_sink(self.__sink)
+
+    def stop(self):
+        """Stops recording"""
+        if self.__start is None: return
+        hooks.remove_sink(self.__sink)
+        self.__start = None
+
+    def save(self, filename):
+        """Writes the recorded changes to *filename*"""
+        with gzip.open(filename, "wb") as _file:
+            pickle.dump(dict(version=VERSION, models=sorted(self.models)),
+                        _file, pickle.HIGHEST_PROTOCOL)
+            _file.write(self.__state)
+            for record in self.__records:
+                _file.write(record)
+
+    def __get_state(self, model):
+        state = {}
+        for name in model.get_properties():
+            if not _is_concrete(model, name): continue
+            value = _unwrap(getattr(model, name))
+            # signals are not values
+            if isinstance(value, Observable): continue
+            try: self.__dumps(value)
+            except Exception: continue
+            state[name] = value
+        return state
+
+    def __dumps(self, obj):
+        buf = io.BytesIO()
+        _Pickler(buf, self.__names).dump(obj)
+        return buf.getvalue()
+
+    def __record(self, name, kind, prop_name, payload):
+        # pickled now, values may be changed later
+        try:
+            record = self.__dumps((time.time() - self.__start, name, kind,
+                                   prop_name, payload))
+        except Exception as e:
+            logger.warning("Cannot record %s of %s.%s: %s", kind, name,
+                           prop_name, e)
+            self.skipped += 1
+            return
+        with self.__lock:
+            self.__records.append(record)
+
+    def __sink(self, event, **details):
+        if event not in ("property_set", "wrapper_mutation", "signal_emit"):
+            return
+        model = details["model"]
+        name = self.__names.get(id(model))
+        if name is None or self.__start is None: return
+        if _in_notification(sys._getframe(1)): return
+
+        prop_name = details["prop_name"]
+        if event == "property_set":
+            # logical properties follow the concrete ones
+            if _is_concrete(model, prop_name):
+                self.__record(name, "assign", prop_name,
+                              _unwrap(details["new"]))
+
+        elif event == "wrapper_mutation":
+            if _unwrap(getattr(model, prop_name)) is details["instance"]:
+                self.__record(name, "mutation", prop_name,
+                              (details["method_name"], details["args"],
+                               details["kwargs"]))
+            else:
+                self.skipped += 1
+
+        else:
+            self.__record(name, "signal", prop_name, details["arg"])
+
+
+def read(filename, models):
+    """
+    Iterates over the changes recorded in *filename*, as tuples (time
+    since the start in seconds, name of the model, kind, property,
+    value). *kind* is ``"assign"``, ``"mutation"`` (the value is the
+    triple method name, positional and keyword arguments) or
+    ``"signal"`` (the value is the argument of the emission). The
+    first tuple has kind ``"state"``, no time and property, and the
+    dictionary of the values of the properties of each model at the
+    start as value.
+
+    *models* maps the recorded names to the models which values
+    referring to recorded models will refer to.
+    """
+    with gzip.open(filename, "rb") as _file:
+        # records are pickled one by one, so each needs its own memo
+        load = lambda: _Unpickler(_file, models).load()
+        header = load()
+        if header.get("version") != VERSION:
+            raise ValueError("Unsupported version of recording %s: %s" %
+                             (filename, header.get("version")))
+        missing = set(header["models"]) - set(models)
+        if missing:
+            raise KeyError("Models %s of recording %s not given" %
+                           (", ".join(sorted(missing)), filename))
+
+        yield (None, None, "state", None, load())
+        while True:
+            try: yield load()
+            except EOFError: return
+
+
+def replay(filename, models, speed=1.0, restore=True):
+    """
+    Does the changes recorded in *filename* to *models*, a dictionary
+    mapping the recorded names to models, and returns the time taken
+    in seconds.
+
+    *speed* scales the original pace: 2.0 replays twice as fast, and
+    None as fast as possible.
+
+    *restore* denotes whether the properties are first assigned the
+    values they had when recording started. Observers are notified of
+    these assignments as well.
+    """
+    start = time.time()
+    for when, name, kind, prop_name, value in read(filename, models):
+        if kind == "state":
+            if restore:
+                for _name, state in value.items():
+                    for _prop_name, _value in state.items():
+                        setattr(models[_name], _prop_name, _value)
+            start = time.time()
+            continue
+
+        if speed:
+            delay = when / speed - (time.time() - start)
+            if delay > 0: time.sleep(delay)
+
+        model = models[name]
+        if kind == "assign":
+            setattr(model, prop_name, value)
+        elif kind == "mutation":
+            method_name, args, kwargs = value
+            getattr(getattr(model, prop_name), method_name)(*args, **kwargs)
+        else:
+            getattr(model, prop_name).emit(value)
+    return time.time() - start
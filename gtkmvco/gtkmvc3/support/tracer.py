@@ -0,0 +1,234 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+
+"""
+Tracing of notification cascades. When enabled, each change of a
+property (assignment, mutation of a container, emission of a signal)
+opens a span, and so do the notification of the logical properties
+depending on it and each notification method called. Changes done
+by notification methods get nested in their span, so that each
+cascade started by a change outside notifications is recorded as a
+tree of spans. ::
+
+ from gtkmvc3.support import tracer
+
+ tracer.enable()
+ model.x = 1
+ tracer.disable()
+ tracer.export("cascades.json")
+
+The exported file is in the Chrome trace event format, and can be
+loaded by chrome://tracing or other trace viewers. As the
+:mod:`~gtkmvc3.support.profiler`, the tracer wraps the dispatching
+methods of :class:`~gtkmvc3.model.Model` with
+:func:`gtkmvc3.support.hooks.wrap` only while it is enabled. The
+notifications which :class:`~gtkmvc3.model_mt.ModelMT` delivers in
+the main loop, after a change in another thread, start cascades of
+their own.
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+
+from gtkmvc3.model import Model
+from gtkmvc3.model_mt import ModelMT
+from gtkmvc3.support import hooks
+
+_local = threading.local()  # holds the stack of open spans
+_cascades = collections.deque()  # spans of the finished cascades
+
+
+class Span (object):
+    """
+    A step of a cascade. *start* and *end* are in seconds (from
+    :func:`time.perf_counter`), *children* are the spans of the
+    steps caused by this one, and *args* is a dictionary of details.
+    """
+    __slots__ = ("name", "category", "args", "start", "end", "children",
+                 "thread")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = time.perf_counter()
+        self.end = None
+        self.children = []
+        self.thread = threading.current_thread().ident
+
+    def __repr__(self):
+        return "<Span %s %r, %d children>" % (self.category, self.name,
+                                              len(self.children))
+
+    def walk(self, depth=0):
+        """Yields the pairs (depth, span) of this span and of its
+        descendants, depth first"""
+        yield depth, self
+        for child in self.children:
+            for res in child.walk(depth + 1):
+                yield res
+
+
+def _repr(value, limit=80):
+    res = repr(value)
+    if len(res) > limit: res = res[:limit - 3] + "..."
+    return res
+
+
+def _traced(category, get_name, get_args=None):
+    """Returns a function making a wrapper which runs the wrapped
+    method in a span"""
+    def make(method):
+        def wrapper(self, *args, **kwargs):
+            span = Span(get_name(self, *args),
+                        category, get_args(*args) if get_args else {})
+            stack = getattr(_local, "stack", None)
+            if stack is None: stack = _local.stack = []
+            if stack: stack[-1].children.append(span)
+            stack.append(span)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                span.end = time.perf_counter()
+                stack.pop()
+                if not stack: _cascades.append(span)
+        wrapper.__name__ = method.__name__
+        return wrapper
+    return make
+
+
+def _get_method_name(method):
+    func = getattr(method, "__func__", method)
+    return getattr(func, "__qualname__", None) or getattr(func, "__name__",
+                                                          repr(func))
+
+def _prop_name(self, prop_name, *args):
+    return "%s.%s" % (type(self).__name__, prop_name)
+
+def _mutation_name(self, prop_name, instance, meth_name, *args):
+    return "%s.%s.%s" % (type(self).__name__, prop_name, meth_name)
+
+def _deps_name(self, prop_name, old_vals):
+    return "dependencies of %s.%s" % (type(self).__name__, prop_name)
+
+
+def _trace_dependencies(method):
+    traced = _traced("dependencies", _deps_name)(method)
+    def wrapper(self, prop_name, old_vals):
+        # spans only when there are dependencies
+        if not old_vals: return method(self, prop_name, old_vals)
+
+        # the dependencies are notified right after the property, and
+        # their span is nested in the span of the property
+        stack = getattr(_local, "stack", None)
+        siblings = stack[-1].children if stack else _cascades
+        last = siblings[-1] if siblings else None
+        if (last is None or last.category != "assign" or
+            last.name != _prop_name(self, prop_name) or
+            last.thread != threading.current_thread().ident):
+            return traced(self, prop_name, old_vals)
+
+        if stack is None: stack = _local.stack = []
+        stack.append(last)
+        try:
+            return traced(self, prop_name, old_vals)
+        finally:
+            stack.pop()
+            last.end = time.perf_counter()
+    return wrapper
+
+
+# the wrapped methods of Model and ModelMT
+_WRAPPERS = (
+    (Model, "notify_property_value_change",
+     _traced("assign", _prop_name,
+             lambda prop_name, old, new: dict(old=_repr(old),
+                                              new=_repr(new)))),
+    (Model, "notify_method_before_change", _traced("before", _mutation_name)),
+    (Model, "notify_method_after_change", _traced("after", _mutation_name)),
+    (Model, "notify_signal_emit",
+     _traced("signal", _prop_name,
+             lambda prop_name, arg: dict(arg=_repr(arg)))),
+    (Model, "__notify_observer__",
+     _traced("notification",
+             lambda self, observer, method, *args: _get_method_name(method))),
+    (ModelMT, "_ModelMT__idle_callback",
+     _traced("notification",
+             lambda self, observer, method, *args: _get_method_name(method))),
+    (Model, "__after_property_value_change__", _trace_dependencies),
+    )
+
+
+def is_enabled():
+    """Returns True if the tracer is enabled"""
+    return hooks.is_wrapping(__name__)
+
+
+def enable(max_cascades=1000):
+    """
+    Starts tracing. Only the last *max_cascades* cascades are kept,
+    all if None. Cascades recorded before are kept, see
+    :func:`reset`.
+    """
+    global _cascades
+    _cascades = collections.deque(_cascades, max_cascades)
+    if is_enabled(): return
+    for cls, name, make in _WRAPPERS:
+        hooks.wrap(__name__, cls, name, make)
+
+
+def disable():
+    """Stops tracing"""
+    hooks.unwrap(__name__)
+
+
+def reset():
+    """Forgets the recorded cascades"""
+    _cascades.clear()
+
+
+def get_cascades():
+    """Returns the list of the root :class:`Span` of each recorded
+    cascade, oldest first"""
+    return list(_cascades)
+
+
+def export(filename):
+    """Writes the recorded cascades to the given file, as complete
+    events of the Chrome trace event format"""
+    pid = os.getpid()
+    events = []
+    for root in list(_cascades):
+        for depth, span in root.walk():
+            events.append(dict(name=span.name, cat=span.category, ph="X",
+                               ts=span.start * 1e6,
+                               dur=(span.end - span.start) * 1e6,
+                               pid=pid, tid=span.thread,
+                               args=dict(span.args, depth=depth)))
+    with open(filename, "w") as _file:
+        json.dump(dict(traceEvents=events, displayTimeUnit="ms"), _file)
@@ -0,0 +1,218 @@
+#  Author: Roberto Cavada <roboogle@gmail.com>
+#
+#  Copyright (C) 2015 by Roberto Cavada
+#
+#  gtkmvc3 is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public
+#  License as published by the Free Software Foundation; either
+#  version 2 of the License, or (at your option) any later version.
+#
+#  gtkmvc3 is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor,
+#  Boston, MA 02110, USA.
+#
+#  For more information on gtkmvc3 see <https://github.com/roboogle/gtkmvc3>
+#  or email to the author Roberto Cavada <roboogle@gmail.com>.
+#  Please report bugs to <https://github.com/roboogle/gtkmvc3/issues>
+#  or to <roboogle@gmail.com>.
+
+
+"""
+Detection of stalls of the GLib main loop. A :class:`Watchdog` adds a
+timeout to the main loop, and a helper thread checks that the
+timeout keeps being called. When it has not been called for longer
+than a threshold, the stack of the main loop thread is captured and
+reported, together with the activities of the framework it was
+running: ::
+
+ from gtkmvc3.support.watchdog import Watchdog
+
+ watchdog = Watchdog(threshold=200)
+ watchdog.start()
+ Gtk.main()
+ watchdog.stop()
+
+Activities are found in the captured stack, so the watchdog costs
+nothing while there is no stall, apart from its timeout.
+"""
+
+import collections
+import sys
+import threading
+import time
+import traceback
+
+from gi.repository import GLib
+
+from gtkmvc3.model import Model
+from gtkmvc3.model_mt import ModelMT
+from gtkmvc3.controller import Controller
+from gtkmvc3.adapters.basic import Adapter
+from gtkmvc3.support.log import logger
+
+
+class Stall (object):
+    """
+    A stall of the main loop. *start* is the time (from
+    :func:`time.monotonic`) of the last call of the timeout before
+    the stall, and *duration* the seconds the loop was stalled, which
+    grows until the loop runs again (then *ended* is True).
+
+    *stack* is the list of the lines of the stack of the main loop
+    thread when the stall was detected, and *activities* the list of
+    descriptions of the framework activities found in it, outermost
+    first.
+    """
+
+    def __init__(self, start, duration, stack, activities):
+        self.start = start
+        self.duration = duration
+        self.stack = stack
+        self.activities = activities
+        self.ended = False
+
+    def __str__(self):
+        return ("Main loop stalled for %d ms in: %s\n%s" %
+                (self.duration * 1000,
+                 " > ".join(self.activities) or "unknown activity",
+                 "".join(self.stack)))
+
+
+# frames of code in this directory are part of gtkmvc3
+_PACKAGE_DIR = Model.__init__.__code__.co_filename.rpartition("model.py")[0]
+
+
+def _get_name(func):
+    func = getattr(func, "__func__", func)
+    return getattr(func, "__qualname__", None) or getattr(func, "__name__",
+                                                          repr(func))
+
+
+def get_activities(frame):
+    """Returns the descriptions of the framework activities running
+    in the stack of the given frame, outermost first. These are
+    methods of controllers (like signal handlers), notifications to
+    observers, updates of adapters and calls made in the main loop by
+    :class:`~gtkmvc3.model_mt.ModelMT`."""
+    res = []
+    while frame is not None:
+        name = frame.f_code.co_name
+        this = frame.f_locals.get("self")
+
+        if name == "__notify_observer__" and isinstance(this, Model):
+            res.append("notification of %s to %s" %
+                       (type(this).__name__,
+                        _get_name(frame.f_locals.get("method"))))
+
+        elif name == "__idle_callback" and isinstance(this, ModelMT):
+            res.append("idle callback of %s to %s" %
+                       (type(this).__name__,
+                        _get_name(frame.f_locals.get("method"))))
+
+        elif (name in ("update_widget", "update_model") and
+              isinstance(this, Adapter)):
+            res.append("%s of adapter of %s" %
+                       (name, this.get_property_name()))
+
+        elif (isinstance(this, Controller) and
+              not frame.f_code.co_filename.startswith(_PACKAGE_DIR)):
+            # a method of a derived controller, like a signal handler
+            res.append("controller %s.%s" % (type(this).__name__, name))
+
+        frame = frame.f_back
+    res.reverse()
+    return res
+
+
+class Watchdog (object):
+    """
+    Reports the stalls of the main loop longer than *threshold*
+    milliseconds. This has to be created and started in the thread
+    running the main loop.
+
+    *sink* is a callable receiving each :class:`Stall` when it is
+    detected. By default stalls are logged as warnings. The last
+    *history* stalls are kept in :attr:`stalls`.
+    """
+
+    def __init__(self, threshold=200, sink=None, history=50):
+        self.threshold = threshold / 1000.0
+        self.sink = sink
+        self.stalls = collections.deque(maxlen=history)
+
+        self.__last_tick = None
+        self.__stall = None  # the current one
+        self.__source = None
+        self.__thread = None
+        self.__main_ident = None
+        self.__stop = threading.Event()
+
+    def start(self):
+        """Starts watching the main loop"""
+        if self.__thread is not None: return
+        self.__main_ident = threading.current_thread().ident
+        self.__last_tick = time.monotonic()
+        self.__stop.clear()
+        self.__source = GLib.timeout_add(max(1, int(self.threshold * 250)),
+                                         self.__on_timeout)
+        self.__thread = threading.Thread(target=self.__watch,
+                                         name="gtkmvc3 watchdog")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        """Stops watching"""
+        if self.__thread is None: return
+        self.__stop.set()
+        self.__thread.join()
+        self.__thread = None
+        GLib.source_remove(self.__source)
+        self.__source = None
+
+    def tick(self):
+        """Tells that the main loop is running. This is called by the
+        timeout added to the main loop, and can be called by
+        applications running their own loops."""
+        now = time.monotonic()
+        stall = self.__stall
+        if stall is not None:
+            stall.duration = now - stall.start
+            stall.ended = True
+            self.__stall = None
+        self.__last_tick = now
+
+    def __on_timeout(self):
+        self.tick()
+        return True  # keeps the timeout
+
+    def __watch(self):
+        interval = self.threshold / 4
+        while not self.__stop.wait(interval):
+            last_tick = self.__last_tick
+            elapsed = time.monotonic() - last_tick
+            if self.__stall is not None:
+                self.__stall.duration = max(self.__stall.duration, elapsed)
+            elif elapsed > self.threshold:
+                self.__detected(last_tick, elapsed)
+
+    def __detected(self, last_tick, elapsed):
+        frame = sys._current_frames().get(self.__main_ident)
+        if frame is None: return
+        stall = Stall(last_tick, elapsed, traceback.format_stack(frame),
+                      get_activities(frame))
+        del frame
+        if last_tick != self.__last_tick: return  # ticked meanwhile
+
+        self.__stall = stall
+        self.stalls.append(stall)
+        try:
+            if self.sink is None: logger.warning("%s", stall)
+            else: self.sink(stall)
+        except Exception:
+            logger.exception("Stall sink failed")
@@ -24,6 +24,15 @@
 #  or to <roboogle@gmail.com>.
 #  -------------------------------------------------------------------------
 
+import copy
+import types
+
+try:
+    import numpy
+    from numpy.lib.mixins import NDArrayOperatorsMixin
+except ImportError:
+    numpy = None  # arrays are not wrapped
+
 
 # ----------------------------------------------------------------------
 class ObsWrapperBase (object):
@@ -32,6 +41,10 @@ class ObsWrapperBase (object):
     containers like lists, maps, signals, etc.
     """
 
+    # True for the wrapper kept by an ObsContainerDefault, which is
+    # shared by all model instances and never registered with them
+    _cow_template = False
+
     def __init__(self):
 
         # all model instances owning self (can be multiple due to
@@ -48,19 +61,21 @@ class ObsWrapperBase (object):
     def __remove_model__(self, model, prop_name):
         """Unregisters the given model, to release the wrapper. This
         method reverts the effect of __add_model__"""
-        self.__models.remove((model, prop_name))
+        self.__models.discard((model, prop_name))
 
     def __get_models__(self): return self.__models
 
-    def _notify_method_before(self, instance, name, args, kwargs):
+    def _notify_method_before(self, instance, name, args, kwargs,
+                              **extra):
         for m,n in self.__get_models__():
             m.notify_method_before_change(n, instance, name,
-                                          args, kwargs)
+                                          args, kwargs, **extra)
 
-    def _notify_method_after(self, instance, name, res_val, args, kwargs):
+    def _notify_method_after(self, instance, name, res_val, args, kwargs,
+                             **extra):
         for m,n in self.__get_models__():
             m.notify_method_after_change(n, instance, name, res_val,
-                                         args, kwargs)
+                                         args, kwargs, **extra)
 
 
 # ----------------------------------------------------------------------
@@ -69,31 +84,105 @@ class ObsWrapper (ObsWrapperBase):
     Base class for wrappers, like user-classes and sequences.
     """
 
+    # True when the wrapped object is still shared with a container
+    # default, and has to be copied before being changed
+    _cow = False
+
+    # (model, ObsContainerDefault) for a wrapper returned by reading a
+    # default, which the model does not hold until it is changed
+    _owner = None
+
+    # the ObsContainerDefault self was materialized from, if any
+    _default = None
+
+    # names of special methods delegated to the wrapped object (without
+    # underscores)
+    _special_methods = ()
+
+    # names of the methods of the wrapped object which do not change
+    # it. Other methods not wrapped copy a shared object first.
+    _readonly_methods = ()
+
+    # derived classes created by __init__, see below
+    __classes = {}
+
     def __init__(self, obj, method_names):
         ObsWrapperBase.__init__(self)
 
         self._obj = obj
         self.__doc__ = obj.__doc__
 
-        # Creates a derived class which is a singleton which self is
-        # going to be an instance of. All method_names are then
-        # wrapped within it.
+        # self becomes an instance of a derived class, which wraps all
+        # method_names and delegates special methods (which are looked
+        # up in the class only). The class is shared by all wrappers
+        # of the same kind wrapping the same methods.
         # See http://stackoverflow.com/questions/1022499/\
         #emulating-membership-test-in-python-delegating-\
         #contains-to-contained-object
-        d = dict((name, self.__get_wrapper(name)) for name in method_names)
-        self.__class__ = type(self.__class__.__name__, (self.__class__,), d)
+        key = (self.__class__, tuple(method_names))
+        cls = ObsWrapper.__classes.get(key)
+        if cls is None:
+            d = dict((name, self.__get_wrapper(name))
+                     for name in method_names)
+            d.update(("__%s__" % name, self.__get_delegate("__%s__" % name))
+                     for name in self._special_methods)
+            # defining __eq__ would reset it otherwise
+            d["__hash__"] = self.__class__.__hash__
+            cls = type(self.__class__.__name__, (self.__class__,), d)
+            ObsWrapper.__classes[key] = cls
+        self.__class__ = cls
+
+    @staticmethod
+    def __get_delegate(name):
+        def _delegate(self, *args):
+            return getattr(self._obj, name)(*args)
+        return _delegate
 
     def __get_wrapper(self, name):
         def _wrapper_fun(self, *args, **kwargs):
+            if self._cow:
+                target = self._unshare()
+                if target is not self:
+                    return getattr(target, name)(*args, **kwargs)
             self._notify_method_before(self._obj, name, args, kwargs)
             res = getattr(self._obj, name)(*args, **kwargs)
             self._notify_method_after(self._obj, name, res, args, kwargs)
             return res
         return _wrapper_fun
 
+    def _unshare(self):
+        """Called before the first change of a wrapper sharing the
+        object of a container default. Returns the wrapper to change:
+        self after deeply copying the object, so that changes are
+        private to self, or the wrapper another read of the same
+        default already materialized for the model."""
+        if self._owner is not None:
+            model, default = self._owner
+            own = default.get_own(model)
+            if own is None:
+                self._owner = None
+                self._obj = copy.deepcopy(self._obj)
+                self._cow = False
+                self._default = default
+                # the model holds self from now on
+                setattr(model, default.varname, self)
+                self.__add_model__(model, default.prop_name)
+                return self
+            if own._default is default:
+                self._obj = own._obj
+                return own
+            # the property was assigned since self was read
+
+        self._owner = None
+        self._obj = copy.deepcopy(self._obj)
+        self._cow = False
+        return self
+
     # For all fall backs
     def __getattr__(self, name):
+        if self._cow and name not in self._readonly_methods:
+            # may change the object, e.g. list.clear
+            return getattr(self._unshare()._obj, name)
         return getattr(self._obj, name)
 
     def __repr__(self):
@@ -105,22 +194,31 @@ class ObsWrapper (ObsWrapperBase):
 
 # ----------------------------------------------------------------------
 class ObsSeqWrapper (ObsWrapper):
-    def __init__(self, obj, method_names):
-        ObsWrapper.__init__(self, obj, method_names)
 
-        for _m in "lt le eq ne gt ge len iter".split():
-            meth = "__%s__" % _m
-            assert hasattr(self._obj, meth), "Not found method %s in %s" \
-                % (meth, str(type(self._obj)))
-            setattr(self.__class__, meth, getattr(self._obj, meth))
+    # special methods taken directly from the wrapped object
+    _special_methods = "lt le eq ne gt ge len iter".split()
+
+    def __share__(self):
+        """Returns a new wrapper of the same kind, wrapping the same
+        object until the new wrapper is changed for the first time"""
+        # the class of self is the one created by ObsWrapper
+        res = self.__class__.__bases__[0](self._obj)
+        res._cow = True
+        return res
 
     def __setitem__(self, key, val):
+        if self._cow:
+            target = self._unshare()
+            if target is not self: return target.__setitem__(key, val)
         self._notify_method_before(self._obj, "__setitem__", (key,val), {})
         res = self._obj.__setitem__(key, val)
         self._notify_method_after(self._obj, "__setitem__", res, (key,val), {})
         return res
 
     def __delitem__(self, key):
+        if self._cow:
+            target = self._unshare()
+            if target is not self: return target.__delitem__(key)
         self._notify_method_before(self._obj, "__delitem__", (key,), {})
         res = self._obj.__delitem__(key)
         self._notify_method_after(self._obj, "__delitem__", res, (key,), {})
@@ -132,6 +230,9 @@ class ObsSeqWrapper (ObsWrapper):
 
 # ----------------------------------------------------------------------
 class ObsMapWrapper (ObsSeqWrapper):
+
+    _readonly_methods = ("copy", "get", "items", "keys", "values")
+
     def __init__(self, m):
         methods = ("clear", "pop", "popitem", "update",
                    "setdefault")
@@ -140,17 +241,15 @@ class ObsMapWrapper (ObsSeqWrapper):
 
 # ----------------------------------------------------------------------
 class ObsListWrapper (ObsSeqWrapper):
+
+    _special_methods = ObsSeqWrapper._special_methods + "add mul".split()
+    _readonly_methods = ("copy", "count", "index")
+
     def __init__(self, l):
-        methods = ("append", "extend", "insert",
+        methods = ("append", "clear", "extend", "insert",
                    "pop", "remove", "reverse", "sort")
         ObsSeqWrapper.__init__(self, l, methods)
 
-        for _m in "add mul".split():
-            meth = "__%s__" % _m
-            assert hasattr(self._obj, meth), "Not found method %s in %s" % \
-                (meth, str(type(self._obj)))
-            setattr(self.__class__, meth, getattr(self._obj, meth))
-
     def __radd__(self, other):
         return other.__add__(self._obj)
 
@@ -160,8 +259,15 @@ class ObsListWrapper (ObsSeqWrapper):
 
 # ----------------------------------------------------------------------
 class ObsSetWrapper (ObsSeqWrapper):
+
+    _readonly_methods = ("copy", "difference", "intersection",
+                         "isdisjoint", "issubset", "issuperset",
+                         "symmetric_difference", "union")
+
     def __init__(self, s):
-        methods = ("add", "clear", "discard", "pop", "remove",)
+        methods = ("add", "clear", "discard", "pop", "remove", "update",
+                   "difference_update", "intersection_update",
+                   "symmetric_difference_update")
         ObsSeqWrapper.__init__(self, s, methods)
 
     __hash__ = None # unhashable
@@ -171,3 +277,141 @@ class ObsSetWrapper (ObsSeqWrapper):
 class ObsUserClassWrapper (ObsWrapper):
     def __init__(self, user_class_instance, obs_method_names):
         ObsWrapper.__init__(self, user_class_instance, obs_method_names)
+
+
+# ----------------------------------------------------------------------
+if numpy is not None:
+    class ObsArrayWrapper (ObsWrapper, NDArrayOperatorsMixin):
+        """
+        Wrapper for NumPy arrays. Item assignment, in-place operators,
+        ufuncs writing into the array through argument *out*, and
+        in-place methods are notified. Notifications carry the changed
+        region of the array as *region*: the key for item assignment,
+        Ellipsis for changes possibly affecting the whole array.
+
+        Changes made through views (e.g. slices) of the wrapped array
+        are not notified.
+        """
+
+        def __init__(self, a):
+            methods = ("fill", "sort", "partition", "put", "resize")
+            ObsWrapper.__init__(self, a, methods)
+
+        def _notify_method_before(self, instance, name, args, kwargs):
+            ObsWrapper._notify_method_before(self, instance, name,
+                                             args, kwargs,
+                                             region=self.__region(name, args))
+
+        def _notify_method_after(self, instance, name, res_val, args, kwargs):
+            ObsWrapper._notify_method_after(self, instance, name, res_val,
+                                            args, kwargs,
+                                            region=self.__region(name, args))
+
+        def __region(self, name, args):
+            return args[0] if name == "__setitem__" else Ellipsis
+
+        def __setitem__(self, key, val):
+            self._notify_method_before(self._obj, "__setitem__", (key,val), {})
+            res = self._obj.__setitem__(key, val)
+            self._notify_method_after(self._obj, "__setitem__", res,
+                                      (key,val), {})
+            return res
+
+        def __getitem__(self, key):
+            return self._obj.__getitem__(key)
+
+        def __len__(self):
+            return self._obj.__len__()
+
+        def __iter__(self):
+            return self._obj.__iter__()
+
+        def __bool__(self):
+            return self._obj.__bool__()
+
+        def __array__(self, dtype=None, copy=None):
+            if dtype is None:
+                return self._obj
+            return self._obj.astype(dtype, copy=False)
+
+        def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+            inputs = tuple(_unwrap_array(x) for x in inputs)
+            out = kwargs.get("out", ())
+            inplace = any(x is self for x in out)
+            if out:
+                kwargs["out"] = tuple(_unwrap_array(x) for x in out)
+
+            if not inplace:
+                return getattr(ufunc, method)(*inputs, **kwargs)
+
+            self._notify_method_before(self._obj, ufunc.__name__,
+                                       inputs, kwargs)
+            res = getattr(ufunc, method)(*inputs, **kwargs)
+            self._notify_method_after(self._obj, ufunc.__name__, res,
+                                      inputs, kwargs)
+            # in-place operators assign the result to the operand
+            return self if res is self._obj else res
+
+    def _unwrap_array(val):
+        return val._obj if isinstance(val, ObsArrayWrapper) else val
+
+    # used to recognize arrays, wrapped or not
+    ARRAY_TYPES = (numpy.ndarray, ObsArrayWrapper)
+
+else:
+    ARRAY_TYPES = ()
+
+
+# ----------------------------------------------------------------------
+class ObsContainerDefault (object):
+    """
+    Class-level default of an observable property holding a list, set
+    or map. Instances do not share the default: reading the property
+    returns a wrapper of the default, which is kept by the instance
+    only when it is first changed. The wrapped container is then
+    deeply copied, so that nested containers are not shared either.
+    """
+
+    def __init__(self, varname, prop_name, template):
+        self.varname = varname
+        self.prop_name = prop_name
+        self.template = template
+        template._cow_template = True
+
+    def __get__(self, model, cls=None):
+        if model is None:
+            return self.template
+
+        res = self.template.__share__()
+        res._owner = (model, self)
+        return res
+
+    def get_own(self, model):
+        """Returns the value model holds instead of the default, None
+        if it holds none"""
+        slot = getattr(type(model), self.varname, None)
+        if isinstance(slot, types.MemberDescriptorType):
+            try: return slot.__get__(model)
+            except AttributeError: return None
+        return vars(model).get(self.varname)
+
+
+# ----------------------------------------------------------------------
+class ObsArrayDefault (ObsContainerDefault):
+    """
+    Class-level default of an observable property holding a NumPy
+    array. Arrays can be changed through views and ufuncs which are
+    not wrapped, so instead of being copied on write the default is
+    copied the first time an instance reads it, and the instance
+    holds the copy from then on.
+    """
+
+    def __get__(self, model, cls=None):
+        if model is None:
+            return self.template
+
+        res = ObsArrayWrapper(self.template._obj.copy())
+        res._default = self
+        setattr(model, self.varname, res)
+        res.__add_model__(model, self.prop_name)
+        return res
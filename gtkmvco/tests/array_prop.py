@@ -0,0 +1,99 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    class WaveModel(Model):
+        wave = numpy.zeros(4)
+        __observables__ = ("wave",)
+
+    class CompactWaveModel(WaveModel):
+        __compact__ = True
+
+class ArrayObserver(Observer):
+    def __init__(self, model, spurious=False):
+        Observer.__init__(self, model, spurious)
+        self.assigns = 0
+        self.regions = []
+
+    @Observer.observe("wave", assign=True)
+    def assign(self, model, name, info):
+        self.assigns += 1
+
+    @Observer.observe("wave", before=True, after=True)
+    def change(self, model, name, info):
+        if "after" in info:
+            self.regions.append((info.method_name, info.region))
+
+@unittest.skipIf(numpy is None, "NumPy not available")
+class ArrayProperty(unittest.TestCase):
+    def setUp(self):
+        self.m = WaveModel()
+        self.m.wave = numpy.arange(4.0)
+        self.o = ArrayObserver(self.m)
+
+    def testSetItem(self):
+        self.m.wave[1:3] = 7
+        self.assertEqual(list(self.m.wave), [0, 7, 7, 3])
+        self.assertEqual(self.o.regions, [("__setitem__", slice(1, 3))])
+
+    def testInPlace(self):
+        self.m.wave += 1
+        numpy.multiply(self.m.wave, 2, out=self.m.wave)
+        self.assertEqual(list(self.m.wave), [2, 4, 6, 8])
+        self.assertEqual(self.o.regions, [("add", Ellipsis),
+                                          ("multiply", Ellipsis)])
+        # in-place operator assigns the same array back
+        self.assertEqual(self.o.assigns, 0)
+
+    def testMethod(self):
+        self.m.wave.fill(5)
+        self.assertEqual(self.o.regions, [("fill", Ellipsis)])
+
+    def testNotInPlace(self):
+        res = self.m.wave * 2
+        self.assertTrue(isinstance(res, numpy.ndarray))
+        self.assertEqual(self.o.regions, [])
+
+    def testAssign(self):
+        self.m.wave = numpy.arange(4.0)
+        self.m.wave = self.m.wave
+        self.assertEqual(self.o.assigns, 1)
+        self.m.wave[0] = 1
+        self.assertEqual(len(self.o.regions), 1)
+
+    def testSpurious(self):
+        o = ArrayObserver(self.m, spurious=True)
+        self.m.wave = self.m.wave
+        self.assertEqual(o.assigns, 1)
+
+    def testDefault(self):
+        for cls in (WaveModel, CompactWaveModel):
+            a, b = cls(), cls()
+            o = ArrayObserver(b)
+            a.wave[0] = 5
+            self.assertEqual(list(b.wave), [0, 0, 0, 0])
+            self.assertEqual(o.regions, [])
+            b.wave[1] = 2
+            self.assertEqual(o.regions, [("__setitem__", 1)])
+            self.assertEqual(list(cls().wave), [0, 0, 0, 0])
+
+    def testCloneDefault(self):
+        a = WaveModel()
+        c = a.clone()
+        c.wave[1] = 3
+        self.assertEqual(list(a.wave), [0, 0, 0, 0])
+        a.wave[0] = 5
+        d = a.clone()
+        d.wave[2] = 1
+        self.assertEqual(list(a.wave), [5, 0, 0, 0])
+        self.assertEqual(list(d.wave), [5, 0, 1, 0])
+
+if __name__ == "__main__":
+    unittest.main()
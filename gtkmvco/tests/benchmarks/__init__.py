@@ -0,0 +1,129 @@
+"""
+Benchmarks of the notification core, run over sweeps of parameters
+(number of observers, of properties, depth of dependencies). Run
+from the tests directory: ::
+
+ python -m benchmarks run -o before.json
+ ... change something ...
+ python -m benchmarks run -o after.json
+ python -m benchmarks compare before.json after.json
+
+Results are saved as JSON. Comparing flags the cases which got slower
+than a threshold, and exits with status 1 if there are any. The
+memory footprint is measured likewise by the :mod:`benchmarks.memory`
+cases, run by ``python -m benchmarks memory``. Adapters and
+controllers are measured with the stand-ins of widgets of
+:mod:`benchmarks.widgets`, which need no display. Cases which
+cannot run here, like those needing the GLib main loop, are reported
+as skipped with the reason.
+"""
+
+import itertools
+import json
+import platform
+import timeit
+
+# name --> (function, sweeps), filled by the benchmark decorator
+CASES = {}
+
+
+class Skip (Exception):
+    """Raised by a case which cannot run here, with the reason"""
+
+
+def benchmark(**sweeps):
+    """Registers the decorated function as a benchmark, run for each
+    combination of the values of the given parameters. The function
+    receives the parameters as keyword arguments, and returns a pair
+    (function to time, number of operations done by each call), or
+    raises :exc:`Skip`."""
+    def decorator(func):
+        CASES[func.__name__] = (func, sweeps)
+        return func
+    return decorator
+
+
+def _combinations(sweeps, quick):
+    names = sorted(sweeps)
+    values = [sweeps[name][:2] if quick else sweeps[name] for name in names]
+    for combination in itertools.product(*values):
+        yield dict(zip(names, combination))
+
+
+def run(names=None, quick=False, repeat=5, report=None):
+    """Runs the named cases (all by default), and returns the results
+    as a dictionary. If *quick* only the two smallest values of each
+    parameter are used. *report* is called with each result. Cases
+    raising :exc:`Skip` have the reason as result, under key
+    ``skipped``."""
+    import gtkmvc3
+    results = []
+    for name in sorted(names or CASES):
+        func, sweeps = CASES[name]
+        for params in _combinations(sweeps, quick):
+            try: stmt, ops = func(**params)
+            except Skip as e:
+                result = dict(name=name, params=params, skipped=str(e))
+                results.append(result)
+                if report: report(result)
+                continue
+            stmt()  # warms up
+            seconds = min(timeit.repeat(stmt, number=1, repeat=repeat))
+            result = dict(name=name, params=params, ops=ops,
+                          seconds=seconds / ops)
+            results.append(result)
+            if report: report(result)
+    return dict(python=platform.python_version(),
+                gtkmvc3=".".join(map(str, gtkmvc3.get_version())),
+                results=results)
+
+
+def _key(result):
+    return (result["name"], tuple(sorted(result["params"].items())))
+
+
+def _metric(result):
+    """Memory results have bytes per object instead of seconds per
+    operation"""
+    return "bytes" if "bytes" in result else "seconds"
+
+
+def compare(old, new, threshold=0.1):
+    """Returns the list of the triples (result in *new*, seconds per
+    operation or bytes per object in *old*, ratio new/old) of the
+    cases run in both, and the list of those slower or bigger by more
+    than *threshold* (a fraction)"""
+    old_results = dict((_key(result), result) for result in old["results"])
+    res = []
+    for result in new["results"]:
+        before = old_results.get(_key(result))
+        if (before is None or "skipped" in before or "skipped" in result or
+            _metric(before) != _metric(result)): continue
+        metric = _metric(result)
+        if not before[metric]: continue
+        res.append((result, before[metric],
+                    result[metric] / before[metric]))
+    return res, [x for x in res if x[2] > 1 + threshold]
+
+
+def format_result(result):
+    params = ", ".join("%s=%s" % item for item in sorted(
+        result["params"].items()))
+    if "skipped" in result:
+        return "%-24s %-36s skipped: %s" % (result["name"], params,
+                                            result["skipped"])
+    if _metric(result) == "bytes":
+        return "%-24s %-36s %10.1f B " % (result["name"], params,
+                                          result["bytes"])
+    return "%-24s %-36s %10.3f us" % (result["name"], params,
+                                      result["seconds"] * 1e6)
+
+
+def load(filename):
+    with open(filename) as _file:
+        return json.load(_file)
+
+
+def save(results, filename):
+    with open(filename, "w") as _file:
+        json.dump(results, _file, indent=1)
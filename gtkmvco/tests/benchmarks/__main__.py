@@ -0,0 +1,85 @@
+import argparse
+import logging
+import sys
+
+import _importer
+# _importer enables debugging messages, which would be measured
+logging.getLogger("gtkmvc3").setLevel(logging.ERROR)
+
+import benchmarks
+from benchmarks import cases
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="run benchmarks")
+    run.add_argument("names", nargs="*",
+                     help="cases to run (default all): %s" %
+                     ", ".join(sorted(benchmarks.CASES)))
+    run.add_argument("-o", "--output", help="save results to this file")
+    run.add_argument("-q", "--quick", action="store_true",
+                     help="use only the smallest parameters")
+    run.add_argument("-r", "--repeat", type=int, default=5)
+
+    memory = commands.add_parser("memory", help="measure memory footprint")
+    memory.add_argument("names", nargs="*",
+                        help="cases to run (default all)")
+    memory.add_argument("-o", "--output", help="save results to this file")
+    memory.add_argument("-q", "--quick", action="store_true",
+                        help="use only the smallest parameters")
+    memory.add_argument("-s", "--sites", action="store_true",
+                        help="show the lines allocating most")
+
+    compare = commands.add_parser("compare", help="compare two runs")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    compare.add_argument("-t", "--threshold", type=float, default=0.1,
+                         help="slowdown or growth flagged as regression "
+                         "(0.1 = 10%%)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        for name in args.names:
+            if name not in benchmarks.CASES:
+                parser.error("unknown case '%s'" % name)
+        def report(result):
+            print(benchmarks.format_result(result))
+            sys.stdout.flush()
+        results = benchmarks.run(args.names, args.quick, args.repeat, report)
+        if args.output: benchmarks.save(results, args.output)
+
+    elif args.command == "memory":
+        # tracemalloc is not available everywhere
+        from benchmarks import memory
+        for name in args.names:
+            if name not in memory.CASES:
+                parser.error("unknown case '%s'" % name)
+        def report(result):
+            print(benchmarks.format_result(result))
+            if args.sites:
+                for site, size in result["sites"]:
+                    print("    %10d B  %s" % (size, site))
+            sys.stdout.flush()
+        results = memory.run(args.names, args.quick, report)
+        if args.output: benchmarks.save(results, args.output)
+
+    elif args.command == "compare":
+        res, regressions = benchmarks.compare(benchmarks.load(args.old),
+                                              benchmarks.load(args.new),
+                                              args.threshold)
+        for result, before, ratio in res:
+            print("%s  %5.2fx%s" % (benchmarks.format_result(result), ratio,
+                                    "  REGRESSION" if (result, before, ratio)
+                                    in regressions else ""))
+        if regressions:
+            print("%d regressions" % len(regressions))
+            return 1
+
+    else:
+        parser.print_help()
+    return 0
+
+
+sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+The benchmarks of the notification core. Each returns a function
+doing a batch of operations, and the number of operations.
+"""
+
+import threading
+
+from gi.repository import GLib
+
+from gtkmvc3 import Model, ModelMT, Observer, Controller
+from gtkmvc3.adapters import Adapter
+from gtkmvc3.observable import Signal
+from benchmarks import Skip, benchmark, widgets
+
+widgets.install()
+
+OBSERVERS = (0, 1, 10, 100, 1000, 10000)
+PROPERTIES = (1, 10, 100, 1000)
+DEPTHS = (1, 2, 5, 10, 20)
+
+
+def make_model_class(props, base=Model):
+    """Returns a model class with the given number of concrete
+    properties, named p0, p1, ..."""
+    names = ["p%d" % i for i in range(props)]
+    _dict = dict((name, 0) for name in names)
+    _dict.update(__observables__=tuple(names), __module__=__name__)
+    return type(base)("M%d" % props, (base,), _dict)
+
+
+def make_chain_class(depth):
+    """Returns a model class with a concrete property p0, and logical
+    properties p1 ... p<depth> each depending on the previous one"""
+    _dict = dict(p0=0, __module__=__name__,
+                 __observables__=tuple("p%d" % i for i in range(depth + 1)))
+    for i in range(1, depth + 1):
+        # the getter decorator is applied by the metaclass of the class
+        Model.getter("p%d" % i, deps=["p%d" % (i - 1)])(
+            lambda self, name: getattr(self, "p%d" % (int(name[1:]) - 1)) + 1)
+    return type(Model)("Chain%d" % depth, (Model,), _dict)
+
+
+class Watcher(Observer):
+    """Observes all properties"""
+    @Observer.observe("*", assign=True, after=True, signal=True)
+    def changed(self, model, name, info):
+        pass
+
+
+def require_main_loop():
+    """Raises Skip unless the default main context runs idle
+    callbacks, which cases going through the main loop need"""
+    ran = []
+    def callback():
+        ran.append(True)
+        return False
+    try:
+        GLib.idle_add(callback)
+        widgets.flush()
+    except Exception as e:
+        raise Skip("no GLib main loop available (%s)" % e)
+    if not ran:
+        raise Skip("the GLib main loop does not run idle callbacks")
+
+
+def batch(observers):
+    """Number of operations done per call, fewer when each is costly"""
+    return max(10, 10000 // max(1, observers))
+
+
+@benchmark(observers=OBSERVERS)
+def get_set(observers):
+    model = make_model_class(1)()
+    for i in range(observers): Watcher(model)
+    n = batch(observers)
+    def stmt():
+        for i in range(n): model.p0 = model.p0 + 1
+    return stmt, n
+
+
+@benchmark(properties=PROPERTIES)
+def instantiate(properties):
+    cls = make_model_class(properties)
+    n = max(10, 10000 // properties)
+    def stmt():
+        for i in range(n): cls()
+    return stmt, n
+
+
+@benchmark(observers=OBSERVERS[1:-1], properties=PROPERTIES)
+def register(observers, properties):
+    # each registration is linear in the number of properties, and
+    # unregistering in the number of observers too
+    observers = min(observers, max(1, 100000 // properties))
+    model = make_model_class(properties)()
+    watchers = [Watcher() for i in range(observers)]
+    def stmt():
+        for watcher in watchers: model.register_observer(watcher)
+        for watcher in watchers: model.unregister_observer(watcher)
+    return stmt, observers
+
+
+@benchmark(depth=DEPTHS, observers=(0, 1, 10))
+def dependencies(depth, observers):
+    model = make_chain_class(depth)()
+    for i in range(observers): Watcher(model)
+    n = 1000
+    def stmt():
+        for i in range(n): model.p0 = i
+    return stmt, n
+
+
+@benchmark(method=("construct", "prototype"), properties=(10, 100))
+def prototype(method, properties):
+    """Creating models holding given values, by constructing them and
+    assigning all properties, or from a prototype holding the values
+    with one property changed"""
+    cls = make_model_class(properties)
+    names = sorted(cls().get_properties())
+    def configure(model):
+        for name in names: setattr(model, name, 1)
+        return model
+    proto = configure(cls())
+    n = max(10, 10000 // properties)
+    if method == "construct":
+        def stmt():
+            for i in range(n): configure(cls()).p0 = i
+    else:
+        def stmt():
+            for i in range(n): cls.from_prototype(proto, p0=i)
+    return stmt, n
+
+
+@benchmark(observers=(0, 1, 10, 100))
+def mutation(observers):
+    model = type(Model)("Listed", (Model,),
+                        dict(items=[], __observables__=("items",),
+                             __module__=__name__))()
+    for i in range(observers): Watcher(model)
+    n = batch(observers)
+    def stmt():
+        for i in range(n): model.items.append(i)
+        del model.items[:]
+    return stmt, n
+
+
+class Emitter(Model):
+    signal = None
+    __observables__ = ("signal",)
+
+    def __init__(self):
+        Model.__init__(self)
+        self.signal = Signal()
+
+
+@benchmark(observers=OBSERVERS)
+def signal(observers):
+    model = Emitter()
+    for i in range(observers): Watcher(model)
+    n = batch(observers)
+    def stmt():
+        for i in range(n): model.signal.emit(i)
+    return stmt, n
+
+
+@benchmark(observers=(1, 10, 100))
+def cross_thread(observers):
+    """Assignments in a thread, delivered by the main loop. This needs
+    a working GLib main loop."""
+    require_main_loop()
+    model = make_model_class(1, ModelMT)()
+    for i in range(observers): Watcher(model)
+    context = GLib.MainContext.default()
+    n = 100
+    def assign():
+        for i in range(n): model.p0 = i
+    def stmt():
+        thread = threading.Thread(target=assign)
+        thread.start()
+        thread.join()
+        while context.pending(): context.iteration(False)
+    return stmt, n * observers
+
+
+@benchmark(direction=("model", "widget"))
+def adapter_sync(direction):
+    """Changes going through an adapter connected to an entry, from
+    the model to the widget or back"""
+    model = type(Model)("Named", (Model,),
+                        dict(name="", __observables__=("name",),
+                             __module__=__name__))()
+    entry = widgets.Entry()
+    Adapter(model, "name").connect_widget(entry)
+    n = 1000
+    values = [str(i) for i in range(n)]
+    if direction == "model":
+        def stmt():
+            for value in values: model.name = value
+    else:
+        def stmt():
+            for value in values: entry.set_text(value)
+    return stmt, n
+
+
+@benchmark(properties=(1, 10, 100))
+def auto_adapt(properties):
+    """Registering a view of as many entries as properties with a
+    controller adapting them all, per property. This includes making
+    the entries. This needs a working GLib main loop."""
+    require_main_loop()
+    model = make_model_class(properties)()
+    names = model.get_properties()
+    def stmt():
+        view = widgets.HeadlessView(**dict(("entry_%s" % name,
+                                            widgets.Entry())
+                                           for name in names))
+        Controller(model, view, auto_adapt=True, handlers="class")
+        widgets.flush()
+    return stmt, properties
@@ -0,0 +1,168 @@
+"""
+Memory footprint of the objects of the core, measured with
+tracemalloc over workloads of many objects. Each case builds the
+objects to be measured, after having prepared what they need, and the
+difference between the snapshots taken around the building is divided
+by the number of objects. Run from the tests directory: ::
+
+ python -m benchmarks memory -o before.json
+ python -m benchmarks compare before.json after.json
+
+Results are compared like timings, growing by more than the threshold
+is flagged as a regression.
+"""
+
+import gc
+import platform
+import tracemalloc
+
+from gtkmvc3.adapters import Adapter
+from gtkmvc3.observer import NTInfo
+from gtkmvc3.support.wrappers import ObsListWrapper
+from benchmarks import widgets
+from benchmarks.cases import make_model_class, Watcher
+
+# name --> (function, sweeps), filled by the footprint decorator
+CASES = {}
+
+
+def footprint(**sweeps):
+    """Registers the decorated function as a memory case, run for each
+    combination of the values of the given parameters. The function
+    receives the parameters as keyword arguments, and returns a pair
+    (function building the objects and returning them, number of
+    objects)."""
+    def decorator(func):
+        CASES[func.__name__] = (func, sweeps)
+        return func
+    return decorator
+
+
+def measure(build, sites=3):
+    """Calls *build*, and returns the number of bytes it allocated and
+    kept alive, and the list of the *sites* lines (as pairs
+    "file:line", bytes) allocating most"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        objects = build()
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, __file__))
+    stats = after.filter_traces(ignore).compare_to(
+        before.filter_traces(ignore), "lineno")
+    del objects
+    top = sorted(stats, key=lambda stat: stat.size_diff, reverse=True)
+    return (sum(stat.size_diff for stat in stats),
+            [("%s:%d" % (stat.traceback[0].filename,
+                         stat.traceback[0].lineno), stat.size_diff)
+             for stat in top[:sites]])
+
+
+def run(names=None, quick=False, report=None):
+    """Runs the named cases (all by default), and returns the results
+    as a dictionary, in the format of :func:`benchmarks.run`. If
+    *quick* only the two smallest values of each parameter are
+    used. *report* is called with each result."""
+    import gtkmvc3
+    from benchmarks import _combinations
+    results = []
+    for name in sorted(names or CASES):
+        func, sweeps = CASES[name]
+        for params in _combinations(sweeps, quick):
+            build, count = func(**params)
+            size, sites = measure(build)
+            result = dict(name=name, params=params, ops=count,
+                          bytes=float(size) / count, sites=sites)
+            results.append(result)
+            if report: report(result)
+    return dict(python=platform.python_version(),
+                gtkmvc3=".".join(map(str, gtkmvc3.get_version())),
+                results=results)
+
+
+# ----------------------------------------------------------------------
+@footprint(rows=(1000, 10000, 100000), properties=(1, 10, 100))
+def model(rows, properties):
+    """Model instances"""
+    cls = make_model_class(properties)
+    rows = min(rows, 1000000 // properties)
+    cls()  # the class is prepared by the first instance
+    return lambda: [cls() for i in range(rows)], rows
+
+
+@footprint(rows=(1000, 10000), properties=(1, 10, 100, 1000))
+def observed_property(rows, properties):
+    """Registering an observer of all properties, per property"""
+    rows = min(rows, 100000 // properties)
+    cls = make_model_class(properties)
+    models = [cls() for i in range(rows)]
+    watcher = Watcher()
+    def build():
+        for model in models: model.register_observer(watcher)
+    return build, rows * properties
+
+
+@footprint(observers=(1000, 10000))
+def observer(observers):
+    """Observers registered with one model of one property"""
+    model = make_model_class(1)()
+    watchers = [Watcher() for i in range(observers)]
+    def build():
+        for watcher in watchers: model.register_observer(watcher)
+    return build, observers
+
+
+@footprint(adapters=(10, 100, 1000))
+def adapter(adapters):
+    """Adapters connecting entries, not counting the entries"""
+    model = make_model_class(adapters)()
+    entries = [widgets.Entry() for i in range(adapters)]
+    def build():
+        res = []
+        for i, entry in enumerate(entries):
+            ad = Adapter(model, "p%d" % i)
+            ad.connect_widget(entry)
+            res.append(ad)
+        return res
+    return build, adapters
+
+
+@footprint(rows=(1000, 10000, 100000))
+def list_wrapper(rows):
+    """Wrappers of lists, their class already existing"""
+    lists = [[] for i in range(rows)]
+    ObsListWrapper([])
+    return lambda: [ObsListWrapper(l) for l in lists], rows
+
+
+class _FreshWrapper (ObsListWrapper):
+    """Its derived class does not exist until the first instance"""
+
+
+@footprint()
+def wrapper_class():
+    """The derived class created for the first wrapper of a kind,
+    with that wrapper"""
+    return lambda: _FreshWrapper([]), 1
+
+
+@footprint(kind=("assign", "before", "after", "signal"))
+def ntinfo(kind):
+    """Notifications as delivered to observers"""
+    model = make_model_class(1)()
+    kw = {kind: True}
+    extra = dict(assign=dict(old=0, new=1),
+                 before=dict(instance=[], method_name="append",
+                             args=(1,), kwargs={}),
+                 after=dict(instance=[], method_name="append",
+                            args=(1,), kwargs={}, result=None),
+                 signal=dict(arg=1))[kind]
+    n = 100000
+    return (lambda: [NTInfo(kind, kw, model=model, prop_name="p0", **extra)
+                     for i in range(n)], n)
@@ -0,0 +1,312 @@
+"""
+Lightweight stand-ins of GTK widgets, implementing in plain Python
+the getters, setters and signals used by the adapters in
+:mod:`gtkmvc3.adapters.default`. They need no display, so adapters
+and :meth:`Controller.adapt` can be measured on build machines: ::
+
+ widgets.install()
+ view = widgets.HeadlessView(entry_name=widgets.Entry())
+ ctrl = Controller(model, view, auto_adapt=True)
+ widgets.flush()
+
+Signals are emitted synchronously when a setter changes the value,
+like GTK does.
+"""
+
+from gi.repository import GLib
+
+from gtkmvc3 import View
+from gtkmvc3.adapters import default
+
+
+class Widget (object):
+    """Base of the stand-ins: named, with signals and properties"""
+
+    def __init__(self, **props):
+        self.__handlers = {}  # signal --> [(id, handler, args)]
+        self.__next_id = 1
+        self.__props = props
+        self.__name = None
+
+    def connect(self, signal, handler, *args):
+        handler_id = self.__next_id
+        self.__next_id += 1
+        self.__handlers.setdefault(signal, []).append(
+            (handler_id, handler, args))
+        return handler_id
+
+    def disconnect(self, handler_id):
+        for handlers in self.__handlers.values():
+            for i, (_id, handler, args) in enumerate(handlers):
+                if _id == handler_id:
+                    del handlers[i]
+                    return
+
+    def emit(self, signal, *args):
+        # copied, handlers may disconnect
+        for _id, handler, extra in list(self.__handlers.get(signal, ())):
+            handler(self, *(args + extra))
+
+    def get_property(self, name):
+        return self.__props.get(name)
+
+    def set_property(self, name, value):
+        if self.__props.get(name) != value:
+            self.__props[name] = value
+            self.emit("notify::%s" % name, name)
+
+    def get_name(self):
+        return self.__name
+
+    def set_name(self, name):
+        self.__name = name
+
+    def show(self): pass
+    def show_all(self): pass
+    def hide(self): pass
+    def destroy(self): pass
+
+    def get_toplevel(self):
+        return self
+
+
+class Label (Widget):
+    def __init__(self, text=""):
+        Widget.__init__(self)
+        self.__text = text
+
+    def get_text(self):
+        return self.__text
+
+    def set_text(self, text):
+        self.__text = text
+
+
+# not derived from Label, which would be matched first by the default
+# adapters
+class Entry (Widget):
+    def __init__(self, text=""):
+        Widget.__init__(self)
+        self.__text = text
+
+    def get_text(self):
+        return self.__text
+
+    def set_text(self, text):
+        if text != self.__text:
+            self.__text = text
+            self.emit("changed")
+
+
+class ToggleButton (Widget):
+    def __init__(self, active=False):
+        Widget.__init__(self)
+        self.__active = active
+
+    def get_active(self):
+        return self.__active
+
+    def set_active(self, active):
+        if bool(active) != self.__active:
+            self.__active = bool(active)
+            self.emit("toggled")
+
+
+class Adjustment (Widget):
+    def __init__(self, value=0.0, lower=0.0, upper=100.0):
+        Widget.__init__(self)
+        self.__value = value
+        self.lower = lower
+        self.upper = upper
+
+    def get_value(self):
+        return self.__value
+
+    def set_value(self, value):
+        value = min(max(value, self.lower), self.upper)
+        if value != self.__value:
+            self.__value = value
+            self.emit("value-changed")
+
+
+class SpinButton (Widget):
+    """Holds an :class:`Adjustment`, like GTK does"""
+
+    def __init__(self, adjustment=None):
+        Widget.__init__(self)
+        self.__adjustment = adjustment or Adjustment()
+        self.__adjustment.connect("value-changed",
+                                  lambda adj: self.emit("value-changed"))
+
+    def get_adjustment(self):
+        return self.__adjustment
+
+    def get_value(self):
+        return self.__adjustment.get_value()
+
+    def set_value(self, value):
+        self.__adjustment.set_value(value)
+
+
+class ListStore (Widget):
+    """
+    Rows are lists of values. Iterators are the rows themselves, and
+    paths are indexes (or objects having :meth:`get_indices`).
+    """
+
+    def __init__(self, *column_types):
+        Widget.__init__(self)
+        self.__columns = len(column_types)
+        self.__rows = []
+
+    def __len__(self):
+        return len(self.__rows)
+
+    def __iter__(self):
+        return iter(self.__rows)
+
+    def __getitem__(self, path):
+        return self.__rows[self.__index(path)]
+
+    @staticmethod
+    def __index(path):
+        if hasattr(path, "get_indices"): return path.get_indices()[0]
+        if isinstance(path, (tuple, list)): return path[0]
+        return int(path)
+
+    def get_n_columns(self):
+        return self.__columns
+
+    def get_iter(self, path):
+        return self.__rows[self.__index(path)]
+
+    def get_path(self, it):
+        # identity, rows may be equal
+        for i, row in enumerate(self.__rows):
+            if row is it: return i
+        raise ValueError("iterator not in the store")
+
+    def get_value(self, it, column):
+        return it[column]
+
+    def set_value(self, it, column, value):
+        it[column] = value
+        self.row_changed(self.get_path(it), it)
+
+    def insert(self, position, row=None):
+        it = list(row) if row is not None else [None] * self.__columns
+        if position < 0: position = len(self.__rows)
+        self.__rows.insert(position, it)
+        self.emit("row-inserted", position, it)
+        return it
+
+    def append(self, row=None):
+        return self.insert(-1, row)
+
+    def remove(self, it):
+        path = self.get_path(it)
+        del self.__rows[path]
+        self.emit("row-deleted", path)
+        return path < len(self.__rows)
+
+    def clear(self):
+        while self.__rows: self.remove(self.__rows[-1])
+
+    def row_changed(self, path, it):
+        self.emit("row-changed", path, it)
+
+    def foreach(self, func, *args):
+        for path, it in enumerate(list(self.__rows)):
+            if func(self, path, it, *args): return
+
+
+class ComboBox (Widget):
+    def __init__(self, model=None):
+        Widget.__init__(self)
+        self.__model = model
+        self.__active = -1
+
+    def get_model(self):
+        return self.__model
+
+    def set_model(self, model):
+        self.__model = model
+
+    def get_active(self):
+        return self.__active
+
+    def set_active(self, index):
+        if index != self.__active:
+            self.__active = index
+            self.emit("changed")
+
+
+class TreeView (Widget):
+    """Selects one row at a time, with :meth:`set_cursor`"""
+
+    def __init__(self, model=None):
+        Widget.__init__(self)
+        self.__model = model
+        self.__cursor = None
+
+    def get_model(self):
+        return self.__model
+
+    def set_model(self, model):
+        self.__model = model
+        self.__cursor = None
+
+    def get_columns(self):
+        return []
+
+    def get_cursor(self):
+        return self.__cursor, None
+
+    def set_cursor(self, path, column=None, start_editing=False):
+        if path != self.__cursor:
+            self.__cursor = path
+            self.emit("cursor-changed")
+
+
+class HeadlessView (View):
+    """A view holding the given widgets, by name"""
+
+    def __init__(self, **widgets):
+        View.__init__(self)
+        for name, wid in widgets.items():
+            wid.set_name(name)
+            self[name] = wid
+
+
+# class, default signal, getter, setter, value type, like in
+# gtkmvc3.adapters.default
+ADAPTERS = (
+    (Entry, "changed", Entry.get_text, Entry.set_text, str),
+    (Label, None, Label.get_text, Label.set_text, str),
+    (ToggleButton, "toggled", ToggleButton.get_active,
+     ToggleButton.set_active, bool),
+    (SpinButton, "value-changed", SpinButton.get_value, SpinButton.set_value,
+     float),
+    (Adjustment, "value-changed", Adjustment.get_value, Adjustment.set_value,
+     float),
+    (ComboBox, "changed", ComboBox.get_active, ComboBox.set_active, int),
+    )
+
+
+def install():
+    """Makes the stand-ins known to the default adapters"""
+    for info in ADAPTERS:
+        default.add_adapter(*info)
+
+
+def uninstall():
+    """Undoes :func:`install`"""
+    for info in ADAPTERS:
+        default.remove_adapter(info[0])
+
+
+def flush():
+    """Runs the pending callbacks of the main loop, like the view
+    registration of controllers, without blocking"""
+    context = GLib.MainContext.default()
+    while context.pending(): context.iteration(False)
@@ -0,0 +1,97 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+
+class Ambiguous(object):
+    """Like arrays and data frames, comparisons have no truth value"""
+    def __ne__(self, other):
+        return self
+    def __bool__(self):
+        raise ValueError("ambiguous")
+
+class DetectorsModel(Model):
+    by_eq = 0
+    by_identity = ()
+    by_hash = ()
+    by_always = 0
+    by_custom = 0.0
+    amb = None
+    __observables__ = ("by_eq",
+                       ("by_identity", "identity"),
+                       ("by_hash", "hash"),
+                       ("by_alw*", "always"),
+                       ("by_custom", lambda old, new: abs(old - new) > 0.5),
+                       "amb")
+
+    @Model.getter(deps=["by_eq"])
+    def log(self):
+        return self.by_eq // 10
+
+    __observables__ += (("log", "always"),)
+
+class Derived(DetectorsModel):
+    other = 0
+    __observables__ = ("other",)
+
+class Counter(Observer):
+    def __init__(self, model):
+        Observer.__init__(self, model)
+        self.names = []
+
+    @Observer.observe("*", assign=True)
+    def assign(self, model, name, info):
+        self.names.append(name)
+
+class ChangeDetectors(unittest.TestCase):
+    def setUp(self):
+        self.m = DetectorsModel()
+        self.o = Counter(self.m)
+
+    def testEq(self):
+        self.m.by_eq = 0
+        self.assertEqual(self.o.names, ["log"])
+
+    def testIdentity(self):
+        t = (1, 2)
+        self.m.by_identity = t
+        self.m.by_identity = t
+        self.m.by_identity = tuple([1, 2])
+        self.assertEqual(self.o.names, ["by_identity"] * 2)
+
+    def testHash(self):
+        self.m.by_hash = (1, 2)
+        self.m.by_hash = tuple([1, 2])
+        self.assertEqual(self.o.names, ["by_hash"])
+
+    def testAlways(self):
+        self.m.by_always = 0
+        self.assertEqual(self.o.names, ["by_always"])
+
+    def testCustom(self):
+        self.m.by_custom = 0.3
+        self.m.by_custom = 1.0
+        self.assertEqual(self.o.names, ["by_custom"])
+
+    def testAmbiguous(self):
+        a = Ambiguous()
+        self.m.amb = a
+        self.m.amb = a
+        self.assertEqual(self.o.names, ["amb"])
+
+    def testInherited(self):
+        d = Derived()
+        o = Counter(d)
+        d.by_always = 0
+        d.other = 0
+        self.assertEqual(o.names, ["by_always"])
+
+    def testUnknown(self):
+        def make():
+            class Wrong(Model):
+                x = 0
+                __observables__ = (("x", "nope"),)
+        self.assertRaises(ValueError, make)
+
+if __name__ == "__main__":
+    unittest.main()
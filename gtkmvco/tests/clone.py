@@ -0,0 +1,102 @@
+import copy
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+
+class Part(Model):
+    name = ""
+    __observables__ = ("name",)
+
+class Item(Model):
+    price = 1.0
+    qty = 0
+    tags = []
+    part = None
+    __observables__ = ("price", "qty", "tags", "part", "total")
+
+    def __init__(self):
+        Model.__init__(self)
+        self.note = ["not observable"]
+
+    @Model.getter(deps=["price", "qty"])
+    def total(self):
+        return self.price * self.qty
+
+class Counter(Observer):
+    def __init__(self, model):
+        Observer.__init__(self, model)
+        self.names = []
+
+    @Observer.observe("*", assign=True, after=True)
+    def changed(self, model, name, info):
+        self.names.append(name)
+
+class Clone(unittest.TestCase):
+    def setUp(self):
+        self.proto = Item()
+        self.proto.price = 2.0
+        self.proto.tags = ["a"]
+        self.proto.part = Part()
+
+    def testValues(self):
+        c = self.proto.clone()
+        self.assertTrue(type(c) is Item)
+        self.assertEqual((c.price, c.qty, c.tags, c.total), (2.0, 0, ["a"], 0))
+        self.assertTrue(c.part is self.proto.part)
+        self.assertTrue(c.note is self.proto.note)
+
+    def testContainers(self):
+        c = self.proto.clone()
+        c.tags.append("b")
+        self.proto.tags.append("c")
+        self.assertEqual(c.tags, ["a", "b"])
+        self.assertEqual(self.proto.tags, ["a", "c"])
+
+    def testOriginalUntouched(self):
+        tags = self.proto.tags._obj
+        self.proto.clone()
+        self.proto.tags.append("b")
+        self.assertTrue(self.proto.tags._obj is tags)
+        self.assertEqual(tags, ["a", "b"])
+
+    def testObservers(self):
+        o = Counter(self.proto)
+        c = self.proto.clone()
+        c.qty = 1
+        c.tags.append("b")
+        self.assertEqual(o.names, [])
+        oc = Counter(c)
+        c.qty = 2
+        c.tags.append("c")
+        self.assertEqual(oc.names, ["qty", "total", "tags"])
+
+    def testDeep(self):
+        c = copy.deepcopy(self.proto)
+        self.assertFalse(c.part is self.proto.part)
+        self.assertEqual(c.part.name, "")
+        self.assertFalse(c.note is self.proto.note)
+        self.assertEqual(c.note, self.proto.note)
+
+    def testPrototype(self):
+        c = Item.from_prototype(self.proto, qty=3, tags=["x"])
+        self.assertEqual((c.price, c.qty, c.total), (2.0, 3, 6.0))
+        self.assertEqual(c.tags, ["x"])
+        self.assertTrue(c.part is self.proto.part)
+        o = Counter(c)
+        c.tags.append("y")
+        self.assertEqual(o.names, ["tags"])
+
+        c = Item.from_prototype(self.proto, deep=True, qty=3)
+        self.assertFalse(c.part is self.proto.part)
+        self.assertEqual(c.tags, ["a"])
+        self.assertFalse(c.tags is self.proto.tags)
+
+    def testPrototypeErrors(self):
+        self.assertRaises(TypeError, Item.from_prototype, Part())
+        self.assertRaises(TypeError, Item.from_prototype, self.proto, nope=1)
+        self.assertRaises(ValueError, Item.from_prototype, self.proto,
+                          total=10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""
+Compares creating pre-configured models by constructing and
+assigning, with cloning a prototype.
+"""
+
+import timeit
+
+import _importer
+from gtkmvc3 import Model
+
+N = 10000
+
+
+class Part(Model):
+    name = ""
+    __observables__ = ("name",)
+
+
+class Item(Model):
+    name = ""
+    price = 0.0
+    qty = 0
+    tags = []
+    part = None
+    __observables__ = ("name", "price", "qty", "tags", "part", "total")
+
+    @Model.getter(deps=["price", "qty"])
+    def total(self):
+        return self.price * self.qty
+
+
+def configure(item):
+    item.name = "bolt"
+    item.price = 0.25
+    item.qty = 100
+    item.tags = ["metal", "small"]
+    item.part = Part()
+    item.part.name = "thread"
+    return item
+
+proto = configure(Item())
+
+for label, stmt in (("construct+assign", "configure(Item())"),
+                    ("clone", "proto.clone()"),
+                    ("deep clone", "proto.clone(deep=True)"),
+                    ("from_prototype", "Item.from_prototype(proto, qty=5)")):
+    t = timeit.Timer(stmt, "from __main__ import configure, Item, proto")
+    print("%-18s %.3f" % (label, t.timeit(N)))
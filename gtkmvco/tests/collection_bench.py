@@ -0,0 +1,57 @@
+"""
+Compares observing many models by registering with each of them,
+with observing a ModelCollection holding them.
+"""
+
+import timeit
+
+import _importer
+from gtkmvc3 import Model, ModelCollection, Observer
+
+N = 10000
+
+
+class Row(Model):
+    price = 0.0
+    __observables__ = ("price",)
+
+
+class PerRow(Observer):
+    @Observer.observe("price", assign=True)
+    def changed(self, model, name, info):
+        pass
+
+
+class Whole(Observer):
+    @Observer.observe("*.price", assign=True)
+    def changed(self, model, name, info):
+        pass
+
+
+rows = [Row() for i in range(N)]
+per_row = PerRow()
+whole = Whole()
+collection = ModelCollection()
+collection.register_observer(whole)
+
+def register():
+    for row in rows: per_row.observe_model(row)
+
+def add():
+    for row in rows: collection.add(row)
+
+def assign():
+    for row in rows: row.price += 1
+
+print("observe:  per row %.3f  collection %.3f" % (timeit.timeit(register,
+                                                                 number=1),
+                                                   timeit.timeit(add,
+                                                                 number=1)))
+
+for row in rows: row.unregister_observer(per_row)
+only_collection = timeit.timeit(assign, number=1)
+register()
+for row in rows: collection.remove(row)
+only_rows = timeit.timeit(assign, number=1)
+print("assign:   per row %.3f  collection %.3f" % (only_rows,
+                                                   only_collection))
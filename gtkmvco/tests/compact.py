@@ -0,0 +1,73 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+
+class Row(Model):
+    __compact__ = True
+    price = 1.0
+    qty = 0
+    items = []
+    __observables__ = ("price", "qty", "items", "total")
+
+    @Model.getter(deps=["price", "qty"])
+    def total(self):
+        return self.price * self.qty
+
+class Derived(Row):
+    tag = ""
+    __observables__ = ("tag",)
+
+class Counter(Observer):
+    def __init__(self, model):
+        Observer.__init__(self, model)
+        self.names = []
+
+    @Observer.observe("*", assign=True, after=True)
+    def changed(self, model, name, info):
+        self.names.append(name)
+
+class Compact(unittest.TestCase):
+    def setUp(self):
+        self.m = Row()
+
+    def testSlots(self):
+        self.assertTrue("_prop_price" in Row.__slots__)
+        self.assertTrue("_notify_stack" in Row.__slots__)
+        self.assertEqual(vars(self.m), {})
+        self.assertEqual(Derived.__slots__, ("_prop_tag",))
+
+    def testDefaults(self):
+        self.assertEqual(self.m.price, 1.0)
+        self.assertEqual(self.m.total, 0)
+        self.m.items.append(1)
+        self.assertEqual(Row().items, [])
+        self.assertEqual(Derived().qty, 0)
+
+    def testAssign(self):
+        self.m.qty = 3
+        self.assertEqual(self.m.total, 3.0)
+        self.assertEqual(self.m.version_of("total"), 1)
+
+    def testObserved(self):
+        self.m.items.append(1)
+        o = Counter(self.m)
+        self.m.qty = 2
+        self.m.items.append(2)
+        self.m.qty = 2
+        self.assertEqual(o.names, ["qty", "total", "items"])
+        self.assertEqual(self.m.items, [1, 2])
+        self.m.unregister_observer(o)
+        self.m.qty = 3
+        self.assertEqual(len(o.names), 3)
+
+    def testDerived(self):
+        d = Derived()
+        d.qty = 1
+        o = Counter(d)
+        d.tag = "x"
+        d.price = 2.0
+        self.assertEqual(o.names, ["tag", "price", "total"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Memory used by each instance of a model, with and without compact
+storage (see Model.__compact__), and by each row of a ModelArray.
+Also compares assigning a property of all rows of a ModelArray with
+assigning it row by row.
+"""
+
+import timeit
+import tracemalloc
+
+import _importer
+from gtkmvc3 import Model, ModelArray
+
+N = 10000
+
+
+class Row(Model):
+    name = ""
+    price = 0.0
+    qty = 0
+    __observables__ = ("name", "price", "qty")
+
+
+class CompactRow(Model):
+    __compact__ = True
+    name = ""
+    price = 0.0
+    qty = 0
+    __observables__ = ("name", "price", "qty")
+
+
+for cls in (Row, CompactRow):
+    cls()  # class-level data is created once
+    tracemalloc.start()
+    rows = [cls() for i in range(N)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print("%-12s %d bytes per instance" % (cls.__name__, size // N))
+
+ModelArray(Row, 1)  # row class is created once
+tracemalloc.start()
+rows = ModelArray(Row, N)
+size = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+print("%-12s %d bytes per row" % ("ModelArray", size // N))
+
+def by_row():
+    for row in rows: row.price = 1.0
+
+print("assign to all rows: bulk %.4f  row by row %.4f" % (
+        timeit.timeit(lambda: rows.assign("price", 1.0), number=10),
+        timeit.timeit(by_row, number=10)))
@@ -0,0 +1,99 @@
+import io
+import unittest
+
+import _importer
+from gtkmvc3 import Model
+from gtkmvc3.support import counters
+
+class Item(Model):
+    qty = 0
+    names = []
+    __observables__ = ("qty", "names", "double")
+
+    @Model.getter(deps=["qty"])
+    def double(self):
+        return self.qty * 2
+
+    @Model.setter
+    def double(self, value):
+        self.qty = value // 2
+
+class Tagged(Model):
+    tag = None
+    key = ""
+    __observables__ = (("tag", "identity"), ("key", "hash"))
+
+class Compact(Model):
+    __compact__ = True
+    qty = 0
+    __observables__ = ("qty",)
+
+class CountersTest(unittest.TestCase):
+    def setUp(self):
+        counters.reset()
+        counters.enable()
+
+    def tearDown(self):
+        counters.disable()
+        counters.reset()
+
+    def counts(self):
+        return dict(((x["model"].__name__, x["property"]),
+                     (x["reads"], x["writes"], x["spurious"],
+                      x["mutations"]))
+                    for x in counters.get_counts())
+
+    def testCounts(self):
+        m = Item()
+        m.qty = 1
+        m.qty = 1
+        m.qty
+        m.double = 4
+        m.names.append("a")
+        # the getter of double reads qty for the old value twice: in
+        # the setter, and to detect spurious writes
+        self.assertEqual(self.counts(), {("Item", "qty"): (3, 3, 1, 0),
+                                         ("Item", "double"): (0, 1, 0, 0),
+                                         ("Item", "names"): (1, 0, 0, 1)})
+
+    def testDetectors(self):
+        m = Tagged()
+        m.tag = []
+        m.tag = []  # equal, but not the same
+        m.key = "a"
+        m.key = "a"
+        c = Compact()
+        c.qty = 0
+        self.assertEqual(self.counts(), {("Tagged", "tag"): (0, 2, 0, 0),
+                                         ("Tagged", "key"): (0, 2, 1, 0),
+                                         ("Compact", "qty"): (0, 1, 1, 0)})
+
+    def testNewClass(self):
+        class Other(Model):
+            x = 0
+            __observables__ = ("x",)
+        Other().x = 1
+        self.assertEqual(self.counts(), {("Other", "x"): (0, 1, 0, 0)})
+
+    def testDisable(self):
+        counters.disable()
+        self.assertFalse(counters.is_enabled())
+        m = Item()
+        m.qty = 2
+        m.names.append("a")
+        self.assertEqual(counters.get_counts(), [])
+        self.assertEqual(m.double, 4)
+
+    def testReport(self):
+        m = Item()
+        for i in range(3): m.qty
+        m.double
+        self.assertEqual([x["property"] for x in counters.top(2)],
+                         ["qty", "double"])
+        self.assertRaises(ValueError, counters.top, 2, "size")
+        stream = io.StringIO()
+        counters.report(stream=stream)
+        self.assertTrue("Item.qty" in stream.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
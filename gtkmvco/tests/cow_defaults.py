@@ -0,0 +1,93 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+
+class RowModel(Model):
+    items = []
+    tags = set()
+    attrs = {}
+    nested = [[]]
+    __observables__ = ("items", "tags", "attrs", "nested")
+
+class Counter(Observer):
+    def __init__(self, model):
+        Observer.__init__(self, model)
+        self.calls = []
+
+    @Observer.observe("items", after=True)
+    @Observer.observe("tags", after=True)
+    @Observer.observe("attrs", after=True)
+    def after(self, model, name, info):
+        self.calls.append((model, name))
+
+class CopyOnWrite(unittest.TestCase):
+    def setUp(self):
+        self.m1 = RowModel()
+        self.m2 = RowModel()
+
+    def testNothingAllocated(self):
+        self.assertFalse("_prop_items" in vars(self.m1))
+        self.assertFalse("_prop_items" in vars(self.m2))
+
+    def testReadShares(self):
+        self.assertEqual(self.m1.items, [])
+        self.assertEqual(len(self.m1.tags), 0)
+        self.assertTrue(self.m1.items._obj is RowModel._prop_items._obj)
+        self.assertFalse("_prop_items" in vars(self.m1))
+        self.assertFalse("_prop_tags" in vars(self.m1))
+
+    def testTwoReads(self):
+        o = Counter(self.m1)
+        a, b = self.m1.items, self.m1.items
+        a.append(1)
+        b.append(2)
+        self.assertEqual(self.m1.items, [1, 2])
+        self.assertTrue(self.m1.items is a)
+        self.assertEqual(o.calls, [(self.m1, "items")] * 2)
+
+    def testNotWrapped(self):
+        self.m1.items.clear()
+        self.m1.items.__iadd__([1])  # not wrapped
+        self.assertEqual(self.m1.items, [1])
+        self.assertEqual(self.m2.items, [])
+        self.assertEqual(RowModel._prop_items, [])
+
+    def testNested(self):
+        self.m1.nested.append([2])
+        self.m1.nested[0].append(1)
+        self.assertEqual(self.m1.nested, [[1], [2]])
+        self.assertEqual(self.m2.nested, [[]])
+        self.assertEqual(RowModel._prop_nested, [[]])
+
+    def testPrivate(self):
+        self.m1.items.append(1)
+        self.m1.tags.add("a")
+        self.m1.attrs["k"] = 2
+        self.m1.attrs.update(j=3)
+        self.assertEqual(self.m1.items, [1])
+        self.assertEqual(len(self.m1.tags), 1)
+        self.assertEqual(dict(self.m1.attrs), {"k": 2, "j": 3})
+        self.assertEqual(self.m2.items, [])
+        self.assertEqual(len(self.m2.tags), 0)
+        self.assertEqual(dict(self.m2.attrs), {})
+        self.assertEqual(RowModel._prop_items, [])
+
+    def testNotifications(self):
+        o1 = Counter(self.m1)
+        o2 = Counter(self.m2)
+        self.m1.items.append(1)
+        self.m2.attrs["k"] = 1
+        self.assertEqual(o1.calls, [(self.m1, "items")])
+        self.assertEqual(o2.calls, [(self.m2, "attrs")])
+
+    def testAssign(self):
+        o = Counter(self.m1)
+        self.m1.items = [1, 2]
+        self.m1.items.append(3)
+        self.assertEqual(self.m1.items, [1, 2, 3])
+        self.assertEqual(o.calls, [(self.m1, "items")])
+        self.assertFalse(RowModel._prop_items.__get_models__())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model
+
+class RowModel(Model):
+    name = ""
+    items = []
+    attrs = {}
+    tags = set()
+    __observables__ = ("name", "items", "attrs", "tags", "upper")
+
+    @Model.getter(deps=["name"])
+    def upper(self):
+        return self.name.upper()
+
+class Dirty(unittest.TestCase):
+    def setUp(self):
+        self.m = RowModel()
+        self.m.track_dirty()
+
+    def testDisabled(self):
+        m = RowModel()
+        m.name = "a"
+        self.assertRaises(RuntimeError, m.dirty_properties)
+        m.track_dirty()
+        self.assertEqual(m.dirty_properties(), {})
+        m.track_dirty(False)
+        self.assertRaises(RuntimeError, m.dirty_properties)
+
+    def testAssign(self):
+        self.m.name = "a"
+        self.m.items = [1]
+        self.assertEqual(self.m.dirty_properties(),
+                         {"name": None, "items": None})
+
+    def testClear(self):
+        self.m.name = "a"
+        self.m.clear_dirty()
+        self.assertEqual(self.m.dirty_properties(), {})
+        self.m.attrs["k"] = 1
+        self.assertEqual(self.m.dirty_properties(),
+                         {"attrs": frozenset(["k"])})
+
+    def testKeys(self):
+        self.m.attrs["a"] = 1
+        self.m.attrs.update({"b": 2}, c=3)
+        self.m.attrs.pop("a")
+        self.m.tags.add("x")
+        self.m.items.append(1)
+        self.m.items.append(2)
+        self.m.items[-2] = 5
+        self.assertEqual(self.m.dirty_properties(),
+                         {"attrs": frozenset("abc"),
+                          "tags": frozenset("x"),
+                          "items": frozenset([0, 1])})
+
+    def testWhole(self):
+        self.m.items.append(1)
+        self.m.items.insert(0, 2)
+        self.m.items.append(3)
+        self.m.attrs.update([("a", 1)])
+        self.assertEqual(self.m.dirty_properties(),
+                         {"items": None, "attrs": None})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import logging
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+from gtkmvc3.support import hooks
+from gtkmvc3.support.log import logger
+
+class Item(Model):
+    qty = 0
+    names = []
+    __observables__ = ("qty", "names", "double")
+
+    @Model.getter(deps=["qty"])
+    def double(self):
+        return self.qty * 2
+
+class Watcher(Observer):
+    @Observer.observe("qty", assign=True)
+    def changed(self, model, name, info):
+        pass
+
+    @Observer.observe("names", after=True)
+    def mutated(self, model, name, info):
+        pass
+
+class Recorder(object):
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, **details):
+        self.events.append((event, details))
+
+    def names(self):
+        return [event for event, details in self.events]
+
+class Messages(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+class HooksTest(unittest.TestCase):
+    def setUp(self):
+        self.sink = Recorder()
+        hooks.add_sink(self.sink)
+
+    def tearDown(self):
+        for sink in hooks.get_sinks(): hooks.remove_sink(sink)
+
+    def testEvents(self):
+        class Fresh(Item):
+            pass  # its dependencies are calculated on first instance
+        m = Fresh()
+        o = Watcher()
+        o.observe_model(m)
+        m.qty = 1
+        m.names.append("a")
+        o.relieve_model(m)
+        self.assertEqual(self.sink.names(), [
+            "dependencies",
+            "register", "register",
+            "property_set", "notify", "property_set",
+            "wrapper_mutation", "notify",
+            "unregister", "unregister"])
+        event, details = self.sink.events[0]
+        self.assertEqual(details, dict(model_class=Fresh,
+                                       graph={"qty": ["double"]}))
+        event, details = self.sink.events[3]
+        self.assertEqual(details, dict(model=m, prop_name="qty",
+                                       old=0, new=1))
+        self.assertEqual(set((details["prop_name"], details["type"],
+                              details["method"])
+                             for event, details in self.sink.events[-2:]),
+                         set((("qty", "assign", o.changed),
+                              ("names", "after", o.mutated))))
+
+    def testDisabled(self):
+        self.assertTrue(hooks.enabled)
+        hooks.remove_sink(self.sink)
+        self.assertFalse(hooks.enabled)
+        self.assertRaises(ValueError, hooks.remove_sink, self.sink)
+        m = Item()
+        m.qty = 1
+        self.assertEqual(self.sink.events, [])
+
+    def testWrap(self):
+        calls = []
+        def make(tag):
+            def wrapping(method):
+                def wrapper(self, *args):
+                    calls.append(tag)
+                    return method(self, *args)
+                return wrapper
+            return wrapping
+        original = Recorder.__dict__["names"]
+        hooks.wrap("a", Recorder, "names", make("a"))
+        hooks.wrap("b", Recorder, "names", make("b"))
+        Recorder().names()
+        self.assertEqual(calls, ["b", "a"])
+        self.assertTrue(hooks.is_wrapping("a"))
+        hooks.unwrap("a")
+        del calls[:]
+        Recorder().names()
+        self.assertEqual(calls, ["b"])
+        self.assertFalse(hooks.is_wrapping("a"))
+        hooks.unwrap("b")
+        self.assertTrue(Recorder.__dict__["names"] is original)
+
+    def testLogSink(self):
+        hooks.remove_sink(self.sink)
+        hooks.add_sink(hooks.log_sink)
+        handler = Messages()
+        level = logger.level
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        try:
+            Watcher(Item())
+            m = Item()
+            m.qty = 1
+        finally:
+            logger.setLevel(level)
+            logger.removeHandler(handler)
+        self.assertEqual(sorted(handler.messages), [
+            "Will call Watcher.changed after assignment to Item.qty",
+            "Will call Watcher.mutated after mutation of Item.names"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model, ModelCollection, Observer
+from gtkmvc3.index import Index
+
+class Row(Model):
+    ident = 0
+    status = "new"
+    price = 0.0
+    __observables__ = ("ident", "status", "price", "label")
+
+    @Model.getter(deps=["ident"])
+    def label(self):
+        return "row%d" % self.ident
+
+    def __init__(self, ident, price=0.0):
+        Model.__init__(self)
+        self.ident = ident
+        self.price = price
+
+class Coarse(Model):
+    price = 0.0
+    __observables__ = (("price", lambda old, new: abs(old - new) > 0.5),)
+
+class Names(Observer):
+    def __init__(self, model):
+        Observer.__init__(self, model)
+        self.calls = []
+
+    @Observer.observe("*", assign=True)
+    def changed(self, model, name, info):
+        self.calls.append(name)
+
+class IndexTest(unittest.TestCase):
+    def setUp(self):
+        self.rows = [Row(i, price=10.0 - i) for i in range(5)]
+        self.c = ModelCollection(self.rows)
+
+    def testUnique(self):
+        index = Index(self.c, "ident", unique=True)
+        self.assertTrue(index.get(3) is self.rows[3])
+        self.assertEqual(index.get(7), None)
+        self.rows[3].ident = 7
+        self.assertTrue(index.get(7) is self.rows[3])
+        self.assertFalse(3 in index)
+
+        self.assertRaises(ValueError, index.check, 1)
+        self.assertRaises(ValueError, index.check, 1, self.rows[0])
+        index.check(1, self.rows[1])
+        index.check(8)
+
+        # not refused when notified, and the other observers still are
+        names = Names(self.c)
+        self.rows[0].ident = 1
+        self.assertEqual(len(index.find(1)), 2)
+        self.assertEqual(index.conflicts(), [1])
+        self.assertEqual(names.calls, ["Row.ident", "Row.label"])
+        self.assertRaises(ValueError, Index, self.c, "ident", True)
+
+        self.rows[0].ident = 5
+        self.assertEqual(index.conflicts(), [])
+        self.rows[0].ident = 6
+        self.assertEqual(names.calls[-1], "Row.label")
+
+    def testMulti(self):
+        index = Index(self.c, "status")
+        self.assertEqual(index.find("new"), self.rows)
+        self.rows[1].status = "done"
+        self.rows[2].status = "done"
+        self.assertEqual(index.find("done"), self.rows[1:3])
+        self.c.remove(self.rows[1])
+        self.assertEqual(index.find("done"), [self.rows[2]])
+        self.c.add(Row(9))
+        self.assertEqual(len(index.find("new")), 4)
+        self.assertEqual(sorted(index.values()), ["done", "new"])
+
+    def testOrdered(self):
+        index = Index(self.c, "price", ordered=True)
+        self.assertEqual(index.values(), [6.0, 7.0, 8.0, 9.0, 10.0])
+        self.assertEqual(list(index.range(7.0, 9.0)), self.rows[2:4][::-1])
+        self.rows[0].price = 1.0
+        self.assertEqual(list(index.range(high=7.0)), [self.rows[0],
+                                                       self.rows[4]])
+        self.assertEqual(list(index.range(9.5)), [])
+        self.assertRaises(ValueError, list,
+                          Index(self.c, "status").range())
+
+    def testRelieve(self):
+        index = Index(self.c, "ident")
+        index.relieve_model(self.c)
+        self.rows[0].ident = 10
+        self.assertTrue(index.get(0) is self.rows[0])
+
+    def testDetector(self):
+        rows = [Coarse(), Coarse()]
+        index = Index(ModelCollection(rows), "price", ordered=True)
+        rows[0].price = 0.3
+        self.assertEqual(index.find(0.0), [rows[1]])
+        self.assertEqual(index.find(0.3), [rows[0]])
+        self.assertEqual(index.values(), [0.0, 0.3])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+"""
+Compares finding a model by the value of a property by scanning a
+collection, with finding it through an Index.
+"""
+
+import timeit
+
+import _importer
+from gtkmvc3 import Model, ModelCollection
+from gtkmvc3.index import Index
+
+N = 10000
+
+
+class Row(Model):
+    ident = 0
+    __observables__ = ("ident",)
+
+
+collection = ModelCollection()
+for i in range(N):
+    row = Row()
+    row.ident = i
+    collection.add(row)
+index = Index(collection, "ident", unique=True)
+
+def scan():
+    for row in collection:
+        if row.ident == N // 2: return row
+
+def assign():
+    row.ident += N
+
+print("lookup: scan %.6f  index %.6f" % (
+        timeit.timeit(scan, number=10) / 10,
+        timeit.timeit(lambda: index.get(N // 2), number=10) / 10))
+print("assign to an indexed property %.6f" % (
+        timeit.timeit(assign, number=1000) / 1000))
@@ -0,0 +1,57 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+from gtkmvc3.observable import Signal
+
+class Lazy(Model):
+    value = 0
+    items = []
+    sig = Signal()
+    __observables__ = ("value", "items", "sig")
+
+class Recorder(Observer):
+    def __init__(self, model=None):
+        Observer.__init__(self, model)
+        self.calls = []
+
+    @Observer.observe("value", assign=True)
+    @Observer.observe("items", after=True)
+    @Observer.observe("sig", signal=True)
+    def record(self, model, name, info):
+        self.calls.append((model, name))
+
+class LazyRegistration(unittest.TestCase):
+    def testUnobserved(self):
+        m = Lazy()
+        m.value = 1
+        m.items.append(1)
+        m.sig.emit()
+        self.assertEqual(m.version_of("items"), 2)
+
+    def testSharedSignal(self):
+        m1 = Lazy()
+        m2 = Lazy()
+        o = Recorder(m2)
+        m1.sig.emit()
+        self.assertEqual(o.calls, [(m2, "sig")])
+
+    def testObservedLater(self):
+        m = Lazy()
+        m.items.append(1)
+        m.value = 1
+        o = Recorder(m)
+        m.items.append(2)
+        m.value = 2
+        self.assertEqual(o.calls, [(m, "items"), (m, "value")])
+
+    def testDeclarationsPerClass(self):
+        o1 = Recorder()
+        o2 = Recorder()
+        self.assertEqual(o1.get_observing_methods("value"),
+                         set([o1.record]))
+        self.assertEqual(o2.get_observing_methods("items"),
+                         set([o2.record]))
+
+if __name__ == "__main__":
+    unittest.main()
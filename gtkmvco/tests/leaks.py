@@ -0,0 +1,68 @@
+import gc
+import io
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+from gtkmvc3.support import leaks
+
+class Document(Model):
+    title = ""
+    __observables__ = ("title",)
+
+class Panel(Observer):
+    @Observer.observe("title", assign=True)
+    def changed(self, model, name, info):
+        pass
+
+class LeaksTest(unittest.TestCase):
+    def setUp(self):
+        self.doc = Document()
+
+    def testSnapshots(self):
+        before = leaks.snapshot()
+        panels = [Panel(self.doc) for i in range(3)]
+        other = Document()
+        after = leaks.snapshot()
+        self.assertEqual(before.growth(after), [
+            ("observers", "Panel", 0, 3),
+            ("registrations", "Document", 0, 3),
+            ("models", "Document", 1, 2)])
+        self.assertEqual(set(before.new_observers(after)), set(panels))
+
+        for panel in panels: panel.relieve_model(self.doc)
+        self.assertEqual(after.growth(leaks.snapshot()), [])
+
+    def testObserved(self):
+        panels = [Panel(self.doc) for i in range(2)]
+        self.assertTrue((self.doc, 2) in leaks.get_observed_models())
+        self.assertEqual(leaks.find_stale(), [])
+        stream = io.StringIO()
+        leaks.report(stream=stream)
+        self.assertTrue("0 stale observers" in stream.getvalue())
+
+    def testTracking(self):
+        leaks.enable()
+        try:
+            self.assertTrue(leaks.is_enabled())
+            self.assertTrue(self.doc in leaks.get_models())
+            other = Document()
+            clone = other.clone()
+            models = leaks.get_models()
+            self.assertTrue(other in models and clone in models)
+            before = leaks.snapshot()
+            panel = Panel(other)
+            self.assertEqual(before.growth(leaks.snapshot()), [
+                ("observers", "Panel", 0, 1),
+                ("registrations", "Document", 0, 1)])
+            del models, other, clone, panel
+            gc.collect()
+            self.assertEqual(
+                [m for m in leaks.get_models() if isinstance(m, Document)],
+                [self.doc])
+        finally:
+            leaks.disable()
+        self.assertFalse(leaks.is_enabled())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import random
+import unittest
+
+import _importer
+from gtkmvc3 import Model, ModelCollection, Observer
+from gtkmvc3.live_list import LiveList, _Flags
+
+class Row(Model):
+    price = 0
+    name = ""
+    __observables__ = ("price", "name")
+
+class Coarse(Model):
+    price = 0.0
+    __observables__ = (("price", lambda old, new: abs(old - new) > 0.5),)
+
+class Holder(Model):
+    items = []
+    __observables__ = ("items",)
+
+class Replica(Observer):
+    """Applies the deltas of a live list to a copy of it"""
+    def __init__(self, live):
+        Observer.__init__(self, live)
+        self.live = live
+        self.items = list(live)
+        self.deltas = []
+
+    @Observer.observe("changed", signal=True)
+    def changed(self, model, name, info):
+        delta = info.arg
+        self.deltas.append(delta[0])
+        if delta[0] == "insert":
+            self.items.insert(delta[1], delta[2])
+        elif delta[0] == "remove":
+            assert self.items.pop(delta[1]) == delta[2]
+        elif delta[0] == "replace":
+            assert self.items[delta[1]] == delta[2]
+            self.items[delta[1]] = delta[3]
+        elif delta[0] == "update":
+            assert self.items[delta[1]] is delta[2]
+        elif delta[0] == "move":
+            self.items.insert(delta[2], self.items.pop(delta[1]))
+        else:
+            self.items = list(self.live)
+
+class LiveListTest(unittest.TestCase):
+    def testProperty(self):
+        h = Holder()
+        source = LiveList.from_property(h, "items")
+        views = [
+            (source, lambda l: l),
+            (source.filtered(lambda x: x % 2 == 0),
+             lambda l: [x for x in l if x % 2 == 0]),
+            (source.sorted(reverse=True), lambda l: sorted(l, reverse=True)),
+            (source.filtered(lambda x: x > 10).sorted().mapped(str),
+             lambda l: [str(x) for x in sorted(l) if x > 10]),
+            (source.sliced(2, 5), lambda l: l[2:5]),
+            ]
+        replicas = [Replica(view) for view, expected in views]
+
+        rnd = random.Random(1)
+        for step in range(1000):
+            items, op = h.items, rnd.randrange(8)
+            if op == 0 or len(items) < 3: items.append(rnd.randrange(30))
+            elif op == 1:
+                items.insert(rnd.randrange(-5, len(items) + 5),
+                             rnd.randrange(30))
+            elif op == 2: items.pop(rnd.randrange(-len(items), len(items)))
+            elif op == 3: items.remove(rnd.choice(items[:]))
+            elif op == 4:
+                items[rnd.randrange(len(items))] = rnd.randrange(30)
+            elif op == 5: del items[rnd.randrange(len(items))]
+            elif op == 6 and step % 50 == 0: items.sort()
+            elif op == 7 and step % 100 == 0: h.items = [1, 2, 3]
+
+            for (view, expected), replica in zip(views, replicas):
+                self.assertEqual(list(view), expected(list(h.items)))
+                self.assertEqual(replica.items, list(view))
+
+    def testCollection(self):
+        rows = [Row() for i in range(5)]
+        collection = ModelCollection(rows)
+        cheap = LiveList.from_collection(collection).filtered(
+            lambda row: row.price < 10).sorted(key=lambda row: row.name)
+        replica = Replica(cheap)
+
+        rows[0].name = "z"
+        self.assertEqual(cheap[-1], rows[0])
+        self.assertEqual(replica.deltas, ["move", "update"])
+        rows[0].price = 20
+        self.assertEqual(len(cheap), 4)
+        collection.remove(rows[1])
+        collection.add(Row())
+        self.assertEqual(len(cheap), 4)
+        self.assertEqual(replica.items, list(cheap))
+
+    def testDetector(self):
+        rows = [Coarse() for i in range(3)]
+        positive = LiveList.from_collection(ModelCollection(rows)).filtered(
+            lambda row: row.price > 0)
+        replica = Replica(positive)
+        rows[1].price = 0.3
+        self.assertEqual(list(positive), [rows[1]])
+        rows[1].price = 0.3
+        self.assertEqual(replica.deltas, ["insert"])
+
+    def testSliced(self):
+        proto = Row()
+        rows = [Row.from_prototype(proto, price=i) for i in range(8)]
+        collection = ModelCollection(rows)
+        source = LiveList.from_collection(collection).sorted(
+            key=lambda row: row.price)
+        views = [(source.sliced(2, 6), lambda l: l[2:6]),
+                 (source.sliced(3), lambda l: l[3:]),
+                 (source.sliced(0, 1), lambda l: l[0:1]),
+                 (source.sliced(4, 2), lambda l: [])]
+        replicas = [Replica(view) for view, expected in views]
+
+        rnd = random.Random(3)
+        for step in range(1000):
+            op = rnd.randrange(4)
+            if op == 0 or len(rows) < 3:
+                rows.append(Row.from_prototype(proto,
+                                               price=rnd.randrange(20)))
+                collection.add(rows[-1])
+            elif op == 1:
+                collection.remove(rows.pop(rnd.randrange(len(rows))))
+            else: rnd.choice(rows).price = rnd.randrange(20)
+
+            for (view, expected), replica in zip(views, replicas):
+                self.assertEqual(list(view), expected(list(source)))
+                self.assertEqual(replica.items, list(view))
+
+    def testPredicate(self):
+        h = Holder()
+        h.items = list(range(100))
+        view = LiveList.from_property(h, "items").filtered(
+            lambda x: x < 50)
+        replica = Replica(view)
+        view.set_predicate(lambda x: x < 48)
+        self.assertEqual(list(view), list(range(48)))
+        self.assertEqual(replica.deltas, ["remove", "remove"])
+        self.assertEqual(replica.items, list(range(48)))
+        view.set_predicate(lambda x: x < 46 or x == 49)
+        self.assertEqual(replica.deltas[2:], ["remove", "remove", "insert"])
+        self.assertEqual(replica.items, list(range(46)) + [49])
+
+        # changing many items resets
+        view.set_predicate(lambda x: x % 2 == 0)
+        self.assertEqual(replica.deltas[5:], ["reset"])
+        self.assertEqual(replica.items, list(range(0, 100, 2)))
+
+    def testFlags(self):
+        class Flags(_Flags):
+            BLOCK = 4
+        rnd = random.Random(2)
+        expected = [rnd.random() < 0.5 for i in range(30)]
+        flags = Flags(expected)
+        for step in range(500):
+            index = rnd.randrange(len(expected) + 1)
+            if rnd.random() < 0.5 or not expected:
+                flag = rnd.random() < 0.5
+                expected.insert(index, flag)
+                flags.insert(index, flag)
+            elif index < len(expected):
+                self.assertEqual(flags.pop(index), expected.pop(index))
+            self.assertEqual(len(flags), len(expected))
+            self.assertEqual(list(flags), expected)
+            self.assertEqual(flags.count(index), sum(expected[:index]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+"""
+Compares building a filtered and sorted copy of a list property again
+at each change, with keeping live lists updated.
+"""
+
+import timeit
+
+import _importer
+from gtkmvc3 import Model
+from gtkmvc3.live_list import LiveList
+
+N = 100000
+
+
+class Holder(Model):
+    items = []
+    __observables__ = ("items",)
+
+
+holder = Holder()
+holder.items = list(range(N))
+shown = LiveList.from_property(holder, "items").filtered(
+    lambda x: x % 3 == 0).sorted(key=lambda x: -x)
+
+def rebuild():
+    return sorted((x for x in holder.items if x % 3 == 0), key=lambda x: -x)
+
+def append():
+    holder.items.append(N)
+
+print("rebuild %.4f  change with live lists %.4f" % (
+        timeit.timeit(rebuild, number=10) / 10,
+        timeit.timeit(append, number=10) / 10))
@@ -0,0 +1,138 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model, ModelArray, ModelCollection, Observer
+
+class Row(Model):
+    price = 1.0
+    qty = 0
+    done = False
+    name = ""
+    __observables__ = ("price", "qty", "done", "name", "total")
+
+    @Model.getter(deps=["price", "qty"])
+    def total(self):
+        return self.price * self.qty
+
+class WithList(Model):
+    items = []
+    __observables__ = ("items",)
+
+class Counter(Observer):
+    def __init__(self, *models):
+        Observer.__init__(self)
+        self.calls = []
+        for model in models: self.observe_model(model)
+
+    @Observer.observe("*", assign=True)
+    def changed(self, model, name, info):
+        self.calls.append((model, name, info.get("rows"), info.old, info.new))
+
+class ModelArrayTest(unittest.TestCase):
+    def setUp(self):
+        self.a = ModelArray(Row, 10)
+
+    def testDefaults(self):
+        row = self.a[3]
+        self.assertTrue(isinstance(row, Row))
+        self.assertEqual(row.price, 1.0)
+        self.assertTrue(row.done is False)
+        self.assertEqual(row.total, 0)
+        self.assertEqual(len(self.a), 10)
+        self.assertEqual(len(list(self.a)), 10)
+
+    def testRows(self):
+        self.a[-1].qty = 3
+        self.assertEqual(self.a[9].qty, 3)
+        self.assertEqual(self.a[9].total, 3.0)
+        self.assertEqual(list(self.a.column("qty")), [0] * 9 + [3])
+        self.assertRaises(IndexError, lambda: self.a[10])
+        clone = self.a[9].clone()
+        self.assertEqual(type(clone), Row)
+        self.assertEqual(clone.qty, 3)
+
+    def testTypes(self):
+        def assign(): self.a[0].qty = 1.5
+        self.assertRaises(TypeError, assign)
+        self.assertRaises(TypeError, self.a.assign, "qty", "x")
+        self.assertRaises(ValueError, self.a.assign, "total", 1)
+        self.assertRaises(TypeError, ModelArray, WithList, 3)
+
+    def testObserveRow(self):
+        o = Counter(self.a[2])
+        self.a[2].qty = 2
+        self.assertEqual([call[1] for call in o.calls], ["qty", "total"])
+        self.a[2].unregister_observer(o)
+        self.a.assign("qty", 5)
+        self.assertEqual(len(o.calls), 2)
+
+    def testBulk(self):
+        o = Counter(self.a)
+        self.a.assign("price", 2.0, rows=slice(0, 6))
+        self.assertEqual(o.calls, [
+            (self.a, "price", [0, 1, 2, 3, 4, 5], [1.0] * 6, [2.0] * 6)])
+        self.assertEqual(self.a[4].price, 2.0)
+        self.assertEqual(self.a[6].price, 1.0)
+
+        del o.calls[:]
+        self.a.assign_each("qty", [1, 2], rows=[5, 3])
+        self.assertEqual(sorted(call[1] for call in o.calls),
+                         ["qty", "total"])
+        self.assertEqual(o.calls[0][2:], ([5, 3], [0, 0], [1, 2]))
+
+        # single assignments are notified as well
+        del o.calls[:]
+        self.a[7].qty = 4
+        self.assertEqual(o.calls[0], (self.a, "qty", [7], [0], [4]))
+
+        # spurious changes are not notified
+        del o.calls[:]
+        self.a.assign("name", "")
+        self.assertEqual(o.calls, [])
+
+        o.relieve_model(self.a)
+        self.a.assign("qty", 3)
+        self.assertEqual(o.calls, [])
+
+    def testBulkProxies(self):
+        a = ModelArray(Row, 1000)
+        o = Counter(a)
+        a.assign("qty", 2, rows=slice(0, 1000, 2))
+        self.assertEqual(len(o.calls), 2)
+        self.assertEqual(o.calls[1][1:], ("total", list(range(0, 1000, 2)),
+                                          [0.0] * 500, [2.0] * 500))
+        # at most the row passed to the notifier
+        self.assertTrue(len(a._ModelArray__rows) <= 1)
+
+    def testBulkRows(self):
+        o = Counter(self.a[5], self.a[1])
+        self.a.assign("price", 2.0, rows=slice(0, 6))
+        self.assertEqual(o.calls, [
+            (self.a[1], "price", None, 1.0, 2.0),
+            (self.a[5], "price", None, 1.0, 2.0)])
+
+        # live proxies nobody observes are changed as well
+        row = self.a[8]
+        row.track_dirty()
+        version = row.version_of("qty")
+        self.a.assign("qty", 1)
+        self.assertTrue(row.version_of("qty") > version)
+        self.assertTrue(row.version_of("total") > version)
+        self.assertEqual(row.dirty_properties(), {"qty": None})
+
+    def testBulkCollection(self):
+        coll = ModelCollection([self.a[2]])
+        o = Counter(coll)
+        self.a.assign("qty", 1, rows=[2, 4])
+        self.assertEqual([call[1] for call in o.calls],
+                         ["Row.qty", "Row.total"])
+
+    def testMask(self):
+        try: import numpy
+        except ImportError: return
+        a = ModelArray(Row, 4)
+        a.assign("done", True, rows=numpy.array([True, False, True, False]))
+        self.assertEqual([row.done for row in a], [True, False, True, False])
+
+if __name__ == "__main__":
+    unittest.main()
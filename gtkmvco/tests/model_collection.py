@@ -0,0 +1,93 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model, ModelCollection, Observer
+
+class Row(Model):
+    price = 1.0
+    qty = 0
+    items = []
+    __observables__ = ("price", "qty", "items", "total")
+
+    @Model.getter(deps=["price", "qty"])
+    def total(self):
+        return self.price * self.qty
+
+class Other(Model):
+    price = 0
+    __observables__ = ("price",)
+
+class Watcher(Observer):
+    def __init__(self, model):
+        Observer.__init__(self, model)
+        self.calls = []
+        self.members = []
+
+    @Observer.observe("*.price", assign=True)
+    def price_changed(self, model, name, info):
+        self.calls.append((name, info.member, info.old, info.new))
+
+    @Observer.observe("Row.total", assign=True)
+    def total_changed(self, model, name, info):
+        self.calls.append((name, info.member, info.old, info.new))
+
+    @Observer.observe("Row.items", after=True)
+    def items_changed(self, model, name, info):
+        self.calls.append((name, info.member, info.method_name, info.args))
+
+    @Observer.observe("added", signal=True)
+    @Observer.observe("removed", signal=True)
+    def membership(self, model, name, info):
+        self.members.append((name, info.arg))
+
+class ModelCollectionTest(unittest.TestCase):
+    def setUp(self):
+        self.c = ModelCollection()
+        self.o = Watcher(self.c)
+        self.r = Row()
+        self.c.add(self.r)
+
+    def testMembers(self):
+        other = Other()
+        self.c.add(other)
+        self.c.add(other)
+        self.assertEqual(len(self.c), 2)
+        self.assertEqual(list(self.c), [self.r, other])
+        self.c.remove(other)
+        self.assertFalse(other in self.c)
+        self.assertRaises(ValueError, self.c.remove, other)
+        self.assertEqual(self.o.members, [("added", self.r),
+                                          ("added", other),
+                                          ("removed", other)])
+
+    def testAssign(self):
+        self.r.price = 2.0
+        self.r.price = 2.0  # spurious
+        self.r.qty = 3
+        self.assertEqual(self.o.calls, [
+            ("Row.price", self.r, 1.0, 2.0),
+            ("Row.total", self.r, 0.0, 6.0)])
+
+    def testPattern(self):
+        other = Other()
+        self.c.add(other)
+        other.price = 4
+        self.assertEqual(self.o.calls, [("Other.price", other, 0, 4)])
+
+    def testMutation(self):
+        self.r.items.append(1)
+        self.assertEqual(self.o.calls, [("Row.items", self.r, "append",
+                                         (1,))])
+
+    def testRelease(self):
+        self.c.remove(self.r)
+        self.r.price = 2.0
+        other = ModelCollection([self.r])
+        self.c.unregister_observer(self.o)
+        self.c.add(self.r)
+        self.r.price = 3.0
+        self.assertEqual(self.o.calls, [])
+        self.assertEqual(len(other), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import gc
+import unittest
+import weakref
+
+import _importer
+from gtkmvc3 import Model, Observer
+
+class Item(Model):
+    qty = 1
+    price = 1.0
+    __observables__ = ("qty", "price")
+
+class Order(Model):
+    child = None
+    items = []
+    discount = 0.0
+    __observables__ = ("child", "items", "discount", "price", "count",
+                       "net")
+
+    @Model.getter(deps=["child.price"])
+    def price(self):
+        return self.child.price if self.child else None
+
+    @Model.getter(deps=["items[*].qty"])
+    def count(self):
+        return sum(item.qty for item in self.items)
+
+    @Model.getter(deps=["count", "discount"])
+    def net(self):
+        return self.count - self.discount
+
+class Shop(Model):
+    order = None
+    __observables__ = ("order", "first")
+
+    @Model.getter(deps=["order.child.price"])
+    def first(self):
+        return self.order.child.price if self.order and self.order.child \
+            else None
+
+class Watcher(Observer):
+    def __init__(self, model):
+        Observer.__init__(self, model)
+        self.calls = []
+
+    @Observer.observe("price", assign=True)
+    @Observer.observe("count", assign=True)
+    @Observer.observe("net", assign=True)
+    @Observer.observe("first", assign=True)
+    def changed(self, model, name, info):
+        self.calls.append((name, info.old, info.new))
+
+class PathDepsTest(unittest.TestCase):
+    def setUp(self):
+        self.m = Order()
+        self.o = Watcher(self.m)
+
+    def testChild(self):
+        a = Item()
+        self.m.child = a
+        a.price = 2.0
+        self.m.child = Item()
+        a.price = 3.0  # not on the path anymore
+        self.assertEqual(self.o.calls, [("price", None, 1.0),
+                                        ("price", 1.0, 2.0),
+                                        ("price", 2.0, 1.0)])
+
+    def testItems(self):
+        a, b = Item(), Item()
+        self.m.items = [a]
+        self.m.items.append(b)
+        b.qty = 3
+        a.price = 2.0  # not a dependency
+        self.m.items.remove(a)
+        a.qty = 5
+        self.assertEqual([c for c in self.o.calls if c[0] == "count"],
+                         [("count", 0, 1), ("count", 1, 2),
+                          ("count", 2, 4), ("count", 4, 3)])
+        self.assertEqual([c for c in self.o.calls if c[0] == "net"],
+                         [("net", 0, 1), ("net", 1, 2),
+                          ("net", 2, 4), ("net", 4, 3)])
+
+    def testVersions(self):
+        m = Order()
+        a = Item()
+        m.child = a
+        version = m.version_of("price")
+        a.price = 5.0
+        self.assertTrue(m.version_of("price") > version)
+        self.assertEqual(m.version_of("count"), 0)
+
+    def testDeepPath(self):
+        shop = Shop()
+        o = Watcher(shop)
+        shop.order = self.m
+        self.m.child = Item()
+        self.m.child.price = 4.0
+        shop.order = Order()
+        self.m.child.price = 6.0
+        self.assertEqual(o.calls, [("first", None, 1.0),
+                                   ("first", 1.0, 4.0),
+                                   ("first", 4.0, None)])
+
+    def testClone(self):
+        a = Item()
+        self.m.child = a
+        clone = self.m.clone()
+        o = Watcher(clone)
+        a.price = 7.0
+        self.assertEqual(o.calls, [("price", 1.0, 7.0)])
+
+    def testTransientOwners(self):
+        a = Item()
+        for i in range(100):
+            order = Order()
+            order.child = a
+        ref = weakref.ref(order)
+        del order
+        gc.collect()
+        # the child does not keep its owners, nor links to them
+        self.assertEqual(ref(), None)
+        self.assertEqual(a._Model__paths, None)
+        a.price = 2.0
+
+    def testInvalid(self):
+        class Bad(Model):
+            child = None
+            __observables__ = ("child", "total")
+
+            @Model.getter(deps=["child.items[*]"])
+            def total(self):
+                return 0
+        self.assertRaises(ValueError, Bad)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import _importer
+from gtkmvc3 import Model, ModelMT, Observer
+from gtkmvc3.support import profiler, tracer
+
+class Item(Model):
+    qty = 0
+    names = []
+    __observables__ = ("qty", "names", "double")
+
+    @Model.getter(deps=["qty"])
+    def double(self):
+        return self.qty * 2
+
+class ItemMT(ModelMT):
+    qty = 0
+    __observables__ = ("qty",)
+
+class Watcher(Observer):
+    @Observer.observe("qty", assign=True)
+    @Observer.observe("double", assign=True)
+    def changed(self, model, name, info):
+        pass
+
+    @Observer.observe("names", after=True)
+    def mutated(self, model, name, info):
+        pass
+
+    def property_qty_value_change(self, model, old, new):
+        pass
+
+class ProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.m = Item()
+        Watcher(self.m)
+        Watcher(self.m)
+        profiler.reset()
+        profiler.enable()
+
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+
+    def testCalls(self):
+        self.m.qty = 1
+        self.m.qty = 2
+        self.m.names.append("a")
+        stats = profiler.get_stats()
+        calls = dict(((x["property"], x["observer"]), x["count"])
+                     for x in stats["calls"])
+        self.assertEqual(calls, {
+            ("qty", "Watcher.changed"): 4,
+            ("qty", "Watcher.property_qty_value_change"): 4,
+            ("double", "Watcher.changed"): 4,
+            ("names", "Watcher.mutated"): 2})
+        for entry in stats["calls"]:
+            self.assertEqual(sum(entry["histogram"]), entry["count"])
+            self.assertTrue(entry["max"] <= entry["total"])
+
+    def testFanout(self):
+        self.m.qty = 1
+        fanouts = dict((x["property"], (x["count"], x["max"]))
+                       for x in profiler.get_stats()["fanouts"])
+        self.assertEqual(fanouts, {"qty": (1, 4), "double": (1, 2)})
+
+    def testDisable(self):
+        profiler.disable()
+        self.assertFalse(profiler.is_enabled())
+        self.assertEqual(Model.__notify_observer__.__qualname__,
+                         "Model.__notify_observer__")
+        self.m.qty = 1
+        self.assertEqual(profiler.get_stats()["calls"], [])
+
+    def testTracer(self):
+        # stopped in any order, the methods get back their originals
+        for first, second in ((profiler, tracer), (tracer, profiler)):
+            tracer.enable()
+            self.assertTrue(profiler.is_enabled())
+            self.m.qty += 1
+            self.assertEqual(len(tracer.get_cascades()), 1)
+            first.disable()
+            second.disable()
+            self.assertFalse(profiler.is_enabled())
+            self.assertFalse(tracer.is_enabled())
+            for name in ("__notify_observer__", "notify_signal_emit"):
+                self.assertEqual(getattr(Model, name).__qualname__,
+                                 "Model.%s" % name)
+            profiler.enable()
+            tracer.reset()
+
+    def testIdleCallback(self):
+        m = ItemMT()
+        o = Watcher(m)
+        # as called by the main loop for a change in another thread
+        m._ModelMT__idle_callback(o, o.changed, (m, "qty", None), {})
+        calls = dict((x["observer"], x["count"])
+                     for x in profiler.get_stats()["calls"])
+        self.assertEqual(calls, {"Watcher.changed": 1})
+
+        m.qty = 1
+        fanouts = dict((x["property"], x["max"])
+                       for x in profiler.get_stats()["fanouts"])
+        self.assertEqual(fanouts, {"qty": 2})
+
+    def testOutput(self):
+        self.m.qty = 1
+        stream = io.StringIO()
+        profiler.report(stream=stream)
+        self.assertTrue("Item.qty -> Watcher.changed" in stream.getvalue())
+
+        fd, filename = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            profiler.dump(filename)
+            with open(filename) as _file:
+                stats = json.load(_file)
+        finally:
+            os.remove(filename)
+        self.assertEqual(len(stats["calls"]), 3)
+
+if __name__ == "__main__":
+    unittest.main()
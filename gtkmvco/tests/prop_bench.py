@@ -0,0 +1,69 @@
+"""
+Compares reading and writing observable properties with plain
+attributes. Accessors are generated by the metaclass, so the overhead
+left is that of the notification machinery.
+"""
+
+import timeit
+
+import _importer
+from gtkmvc3 import Model, ModelMT, Observer
+
+N = 100000
+
+
+class Plain(object):
+    def __init__(self):
+        self.x = 0
+
+
+class Observed(Model):
+    x = 0
+    __observables__ = ("x",)
+
+
+class ObservedMT(ModelMT):
+    x = 0
+    __observables__ = ("x",)
+
+
+class Logical(Model):
+    _x = 0
+    __observables__ = ("x",)
+
+    @Model.getter
+    def x(self):
+        return self._x
+
+    @Model.setter
+    def x(self, value):
+        self._x = value
+
+
+class Watcher(Observer):
+    @Observer.observe("x", assign=True)
+    def changed(self, model, name, info):
+        pass
+
+
+plain = Plain()
+observed = Observed()
+observed_mt = ObservedMT()
+logical = Logical()
+watched = Observed()
+watcher = Watcher(watched)
+
+for label, name in (("plain attribute", "plain"),
+                    ("observable", "observed"),
+                    ("observable MT", "observed_mt"),
+                    ("logical", "logical"),
+                    ("observed", "watched")):
+    read = timeit.Timer("m.x", "from __main__ import %s as m" % name)
+    write = timeit.Timer("m.x = 1", "from __main__ import %s as m" % name)
+    print("%-16s read %.3f  write %.3f" % (label, read.timeit(N),
+                                           write.timeit(N)))
+
+# construction of unobserved instances
+for label, cls in (("plain object", Plain), ("model", Observed),
+                   ("model MT", ObservedMT)):
+    print("%-16s new  %.3f" % (label, timeit.timeit(cls, number=N)))
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+from gtkmvc3.observable import Signal
+from gtkmvc3.support import recorder
+
+class Item(Model):
+    qty = 0
+    names = []
+    other = None
+    ping = None
+    __observables__ = ("qty", "names", "other", "ping", "double")
+
+    def __init__(self):
+        Model.__init__(self)
+        self.ping = Signal()
+
+    @Model.getter(deps=["qty"])
+    def double(self):
+        return self.qty * 2
+
+class Doubler(Observer):
+    """Changes done by observers are not recorded"""
+    def __init__(self, model, target):
+        Observer.__init__(self, model)
+        self.target = target
+
+    @Observer.observe("qty", assign=True)
+    def changed(self, model, name, info):
+        self.target.qty = info.new * 2
+
+class Watcher(Observer):
+    def __init__(self, model):
+        Observer.__init__(self, model)
+        self.calls = []
+
+    @Observer.observe("qty", assign=True)
+    @Observer.observe("other", assign=True)
+    def assigned(self, model, name, info):
+        self.calls.append((name, info.new))
+
+    @Observer.observe("names", after=True)
+    def mutated(self, model, name, info):
+        self.calls.append((name, info.method_name, info.args))
+
+    @Observer.observe("ping", signal=True)
+    def pinged(self, model, name, info):
+        self.calls.append((name, info.arg))
+
+class RecorderTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def record(self):
+        a, b = Item(), Item()
+        a.qty = 3
+        Doubler(a, b)
+        rec = recorder.Recorder(dict(a=a, b=b))
+        rec.start()
+        a.qty = 5
+        a.names.append("x")
+        a.names[0] = "y"
+        a.other = b
+        a.ping.emit(7)
+        rec.stop()
+        a.qty = 6  # not recorded anymore
+        rec.save(self.filename)
+        return rec
+
+    def testRecord(self):
+        rec = self.record()
+        self.assertEqual(len(rec), 5)
+        self.assertEqual(rec.skipped, 0)
+
+        a, b = Item(), Item()
+        records = list(recorder.read(self.filename, dict(a=a, b=b)))
+        self.assertEqual(records[0][2], "state")
+        self.assertEqual(records[0][4]["a"]["qty"], 3)
+        self.assertEqual([r[1:4] for r in records[1:]],
+                         [("a", "assign", "qty"), ("a", "mutation", "names"),
+                          ("a", "mutation", "names"), ("a", "assign", "other"),
+                          ("a", "signal", "ping")])
+        self.assertTrue(records[4][4] is b)
+        times = [r[0] for r in records[1:]]
+        self.assertEqual(times, sorted(times))
+
+    def testReplay(self):
+        self.record()
+        a, b = Item(), Item()
+        Doubler(a, b)
+        o = Watcher(a)
+        recorder.replay(self.filename, dict(a=a, b=b), speed=None)
+        self.assertEqual(o.calls, [("qty", 3), ("qty", 5),
+                                   ("names", "append", ("x",)),
+                                   ("names", "__setitem__", (0, "y")),
+                                   ("other", b), ("ping", 7)])
+        self.assertEqual(b.qty, 10)
+        self.assertEqual(a.names, ["y"])
+
+    def testMissing(self):
+        self.record()
+        self.assertRaises(KeyError, recorder.replay, self.filename,
+                          dict(a=Item()))
+
+if __name__ == "__main__":
+    unittest.main()
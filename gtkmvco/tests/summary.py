@@ -0,0 +1,134 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model, ModelCollection, Observer
+from gtkmvc3.summary import (Summary, ValueAggregate, Sum, Count, Min, Max,
+                             Mean, GroupBy)
+
+class Row(Model):
+    price = 1.0
+    status = "new"
+    __observables__ = ("price", "status")
+
+class Other(Model):
+    name = ""
+    __observables__ = ("name",)
+
+class Totals(Summary):
+    amount = Sum("price")
+    rows = Count()
+    priced = Count("price")
+    cheapest = Min("price")
+    dearest = Max("price")
+    average = Mean("price")
+    by_status = GroupBy("status", Sum("price"))
+
+class MoreTotals(Totals):
+    statuses = GroupBy("status")
+
+class Coarse(Model):
+    price = 0.0
+    __observables__ = (("price", lambda old, new: abs(old - new) > 0.5),)
+
+class Labelled(Summary):
+    amount = Sum("price")
+    __observables__ = ("label",)
+
+    @Model.getter(deps=["amount"])
+    def label(self):
+        return "%.1f" % self.amount
+
+class Watcher(Observer):
+    def __init__(self, model):
+        Observer.__init__(self, model)
+        self.changes = {}
+
+    @Observer.observe("*", assign=True)
+    def changed(self, model, name, info):
+        self.changes[name] = (info.old, info.new)
+
+class SummaryTest(unittest.TestCase):
+    def setUp(self):
+        self.rows = [Row() for i in range(3)]
+        self.c = ModelCollection(self.rows)
+        self.t = Totals(self.c)
+
+    def check(self, amount, rows, priced, cheapest, dearest, average,
+              by_status):
+        self.assertEqual((self.t.amount, self.t.rows, self.t.priced,
+                          self.t.cheapest, self.t.dearest, self.t.average,
+                          self.t.by_status),
+                         (amount, rows, priced, cheapest, dearest, average,
+                          by_status))
+
+    def testInitial(self):
+        self.check(3.0, 3, 3, 1.0, 1.0, 1.0, {"new": 3.0})
+        self.assertEqual(Totals(ModelCollection()).average, None)
+
+    def testAssign(self):
+        w = Watcher(self.t)
+        self.rows[0].price = 4.0
+        self.rows[1].status = "done"
+        self.check(6.0, 3, 3, 1.0, 4.0, 2.0, {"new": 5.0, "done": 1.0})
+        self.assertEqual(w.changes["dearest"], (1.0, 4.0))
+        self.assertEqual(w.changes["by_status"],
+                         ({"new": 6.0}, {"new": 5.0, "done": 1.0}))
+        self.assertFalse("rows" in w.changes)
+
+    def testMembers(self):
+        self.rows[0].price = 0.5
+        self.c.remove(self.rows[0])
+        self.check(2.0, 2, 2, 1.0, 1.0, 1.0, {"new": 2.0})
+        self.c.add(Other())
+        self.rows[1].price = None
+        self.check(1.0, 3, 1, 1.0, 1.0, 1.0, {"new": 1.0, None: 0})
+
+    def testInherited(self):
+        t = MoreTotals(self.c)
+        self.rows[2].status = "done"
+        self.assertEqual(t.statuses, {"new": 2, "done": 1})
+        self.assertEqual(t.amount, 3.0)
+
+    def testReadOnly(self):
+        def assign(): self.t.amount = 1
+        self.assertRaises(Exception, assign)
+
+    def testDrift(self):
+        for i in range(1000):
+            self.rows[0].price = 0.1 * i + 1e16 * (i % 2)
+            self.rows[1].price = 1.0 / (i + 1)
+        self.rows[0].price = 1.0
+        self.rows[1].price = 1.0
+        self.assertEqual(self.t.amount, 3.0)
+        self.assertEqual(self.t.average, 1.0)
+        self.rows[2].price = float("inf")
+        self.assertEqual(self.t.amount, float("inf"))
+        self.rows[2].price = 2.0
+        self.assertEqual(self.t.amount, 4.0)
+
+    def testAbstract(self):
+        class Incomplete(ValueAggregate):
+            def get_value(self): return None
+        self.assertRaises(TypeError, Incomplete, "price")
+
+    def testGetters(self):
+        t = Labelled(self.c)
+        self.assertEqual((t.amount, t.label), (3.0, "3.0"))
+        w = Watcher(t)
+        self.rows[0].price = 2.0
+        self.assertEqual(w.changes["label"], ("3.0", "4.0"))
+        # getters were not left in the maps of the bases
+        self.assertFalse(getattr(Summary, "_getdict", None))
+        self.assertFalse(getattr(Model, "_getdict", None))
+
+    def testDetector(self):
+        rows = [Coarse(), Coarse()]
+        t = Totals(ModelCollection(rows))
+        rows[0].price = 0.3
+        self.assertEqual((t.amount, t.cheapest, t.dearest), (0.3, 0.0, 0.3))
+        rows[0].price = 0.3
+        rows[1].price = 0.2
+        self.assertEqual(t.amount, 0.5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+
+import _importer
+from gtkmvc3 import Model, ModelMT, Observer
+from gtkmvc3.support import tracer
+
+class Item(Model):
+    qty = 0
+    total = 0
+    __observables__ = ("qty", "total", "double")
+
+    @Model.getter(deps=["qty"])
+    def double(self):
+        return self.qty * 2
+
+class ItemMT(ModelMT):
+    qty = 0
+    __observables__ = ("qty",)
+
+class Summer(Observer):
+    @Observer.observe("qty", assign=True)
+    def qty_changed(self, model, name, info):
+        model.total += info.new - info.old
+
+    @Observer.observe("double", assign=True)
+    @Observer.observe("total", assign=True)
+    def changed(self, model, name, info):
+        pass
+
+class TracerTest(unittest.TestCase):
+    def setUp(self):
+        self.m = Item()
+        Summer(self.m)
+        tracer.reset()
+        tracer.enable()
+
+    def tearDown(self):
+        tracer.disable()
+        tracer.reset()
+
+    def testTree(self):
+        self.m.qty = 2
+        cascades = tracer.get_cascades()
+        self.assertEqual(len(cascades), 1)
+        self.assertEqual([(depth, span.category, span.name)
+                          for depth, span in cascades[0].walk()], [
+            (0, "assign", "Item.qty"),
+            (1, "notification", "Summer.qty_changed"),
+            (2, "assign", "Item.total"),
+            (3, "notification", "Summer.changed"),
+            (1, "dependencies", "dependencies of Item.qty"),
+            (2, "assign", "Item.double"),
+            (3, "notification", "Summer.changed")])
+        for depth, span in cascades[0].walk():
+            self.assertTrue(span.start <= span.end)
+            for child in span.children:
+                self.assertTrue(span.start <= child.start)
+                self.assertTrue(child.end <= span.end)
+
+    def testIdleCallback(self):
+        m = ItemMT()
+        o = Summer(m)
+        # as called by the main loop for a change in another thread
+        m._ModelMT__idle_callback(o, o.changed, (m, "qty", None), {})
+        self.assertEqual([(span.category, span.name)
+                          for span in tracer.get_cascades()],
+                         [("notification", "Summer.changed")])
+
+    def testLimit(self):
+        tracer.enable(max_cascades=2)
+        for i in range(5): self.m.total = i
+        self.assertEqual(len(tracer.get_cascades()), 2)
+        tracer.disable()
+        self.m.total = 10
+        self.assertEqual(len(tracer.get_cascades()), 2)
+
+    def testExport(self):
+        self.m.qty = 1
+        fd, filename = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        try:
+            tracer.export(filename)
+            with open(filename) as _file:
+                events = json.load(_file)["traceEvents"]
+        finally:
+            os.remove(filename)
+        self.assertEqual(len(events), 7)
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["args"], dict(old="0", new="1", depth=0))
+
+if __name__ == "__main__":
+    unittest.main()
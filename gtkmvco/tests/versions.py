@@ -0,0 +1,65 @@
+import unittest
+
+import _importer
+from gtkmvc3 import Model
+
+class VersionedModel(Model):
+    price = 0
+    qty = 1
+    items = []
+    __observables__ = ("price", "qty", "items", "total", "count")
+
+    @Model.getter(deps=["price", "qty"])
+    def total(self):
+        return self.price * self.qty
+
+    @Model.getter(deps=["items"])
+    def count(self):
+        return len(self.items)
+
+class Versions(unittest.TestCase):
+    def setUp(self):
+        self.m = VersionedModel()
+
+    def testInitial(self):
+        self.assertEqual(self.m.version_of(), 0)
+        for name in self.m.get_properties():
+            self.assertEqual(self.m.version_of(name), 0)
+
+    def testAssign(self):
+        self.m.price = 10
+        v = self.m.version_of("price")
+        self.assertTrue(v > 0)
+        self.assertEqual(self.m.version_of("qty"), 0)
+        # spurious assignments increase versions too
+        self.m.price = 10
+        self.assertTrue(self.m.version_of("price") > v)
+
+    def testLogical(self):
+        self.m.qty = 2
+        self.assertEqual(self.m.version_of("total"),
+                         self.m.version_of("qty"))
+        self.m.price = 3
+        self.assertEqual(self.m.version_of("total"),
+                         self.m.version_of("price"))
+        self.assertTrue(self.m.version_of("total") >
+                        self.m.version_of("qty"))
+
+    def testMutation(self):
+        self.m.items.append(1)
+        v = self.m.version_of("items")
+        self.assertTrue(v > 0)
+        self.assertEqual(self.m.version_of("count"), v)
+        self.m.items.pop()
+        self.assertTrue(self.m.version_of("items") > v)
+
+    def testModel(self):
+        self.m.price = 1
+        self.m.items.append(1)
+        self.assertEqual(self.m.version_of(), self.m.version_of("items"))
+
+    def testUnknown(self):
+        self.assertRaises(ValueError, self.m.version_of, "nope")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import time
+import unittest
+
+import _importer
+from gtkmvc3 import Model, Observer
+from gtkmvc3.support.watchdog import Watchdog
+
+class Item(Model):
+    qty = 0
+    __observables__ = ("qty",)
+
+class Slow(Observer):
+    @Observer.observe("qty", assign=True)
+    def changed(self, model, name, info):
+        time.sleep(0.3)
+
+class WatchdogTest(unittest.TestCase):
+    def setUp(self):
+        self.reported = []
+        self.w = Watchdog(threshold=50, sink=self.reported.append,
+                          history=1)
+        self.w.start()
+
+    def tearDown(self):
+        self.w.stop()
+
+    def testStall(self):
+        m = Item()
+        Slow(m)
+        self.w.tick()
+        m.qty = 1
+        self.assertEqual(len(self.reported), 1)
+        stall = self.reported[0]
+        self.assertEqual(stall.activities,
+                         ["notification of Item to Slow.changed"])
+        self.assertTrue(any("time.sleep" in line for line in stall.stack))
+        self.assertFalse(stall.ended)
+
+        self.w.tick()
+        self.assertTrue(stall.ended)
+        self.assertTrue(stall.duration >= 0.25)
+        self.assertEqual(list(self.w.stalls), [stall])
+
+    def testNoStall(self):
+        for i in range(10):
+            self.w.tick()
+            time.sleep(0.01)
+        self.assertEqual(self.reported, [])
+
+if __name__ == "__main__":
+    unittest.main()